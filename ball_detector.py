@@ -9,12 +9,15 @@ en utilisant l'API Roboflow et des modèles d'intelligence artificielle.
 
 import cv2
 import numpy as np
-import os
-import tempfile
+import time
 import logging
+from collections import deque
 from typing import List, Optional, Tuple, Dict, Any
-from roboflow import Roboflow
-from tennis_hawkeye import BallDetection, ConfigManager
+from tennis_hawkeye import BallDetection, ConfigManager, FrameBufferPool
+from inference_client import (
+    ResilientInferenceClient, HostedInferenceTransport, CircuitBreaker,
+    InferenceError, HOSTED_API_URL
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,94 +26,160 @@ class RoboflowBallDetector:
     
     def __init__(self, config: ConfigManager):
         self.config = config
-        self.model = None
-        self.temp_dir = tempfile.mkdtemp()
-        self._initialize_model()
+        self.client: Optional[ResilientInferenceClient] = None
+        self._initialized = False
+    
+    def has_api_key(self) -> bool:
+        """Vérifie la présence d'une clé API sans accès réseau"""
+        api_key = self.config.get('roboflow.api_key')
+        return bool(api_key) and api_key != "YOUR_API_KEY_HERE"
+    
+    def _ensure_initialized(self) -> None:
+        """Initialise le modèle au premier appel plutôt qu'à la construction"""
+        if not self._initialized:
+            self._initialized = True
+            self._initialize_model()
     
     def _initialize_model(self) -> None:
-        """Initialise le modèle Roboflow"""
+        """Initialise le client HTTP du modèle Roboflow (sans SDK ni appel réseau)"""
         try:
-            api_key = self.config.get('roboflow.api_key')
-            if not api_key or api_key == "YOUR_API_KEY_HERE":
+            if not self.has_api_key():
                 logger.error("Clé API Roboflow non configurée")
                 return
+            api_key = self.config.get('roboflow.api_key')
             
             project_name = self.config.get('roboflow.project', 'tennis-misz2')
             version = self.config.get('roboflow.version', 3)
+            api_url = self.config.get('roboflow.api_url', HOSTED_API_URL)
+            self.client = self._create_client(api_key, project_name, version)
             
-            rf = Roboflow(api_key=api_key)
-            project = rf.workspace().project(project_name)
-            self.model = project.version(version).model
-            
-            logger.info(f"Modèle Roboflow initialisé: {project_name} v{version}")
+            logger.info(f"Modèle Roboflow initialisé: {project_name} v{version} ({api_url})")
             
         except Exception as e:
             logger.error(f"Erreur lors de l'initialisation du modèle Roboflow: {e}")
-            self.model = None
+            self.client = None
+    
+    def _create_client(self, api_key: str, project_name: str,
+                       version: int) -> ResilientInferenceClient:
+        """Crée le client d'inférence avec timeout, tentatives et disjoncteur"""
+        transport = HostedInferenceTransport(
+            api_url=self.config.get('roboflow.api_url', HOSTED_API_URL),
+            project=project_name,
+            version=version,
+            api_key=api_key,
+            confidence=self.config.get('roboflow.confidence', 0.3) * 100,
+            overlap=self.config.get('roboflow.overlap', 0.6) * 100,
+            pool_size=self.config.get('roboflow.pool_size', 4)
+        )
+        breaker = CircuitBreaker(
+            failure_threshold=self.config.get('roboflow.circuit_failure_threshold', 5),
+            reset_timeout=self.config.get('roboflow.circuit_reset_seconds', 30.0)
+        )
+        return ResilientInferenceClient(
+            transport,
+            timeout=self.config.get('roboflow.timeout_seconds', 2.0),
+            max_retries=self.config.get('roboflow.max_retries', 2),
+            backoff=self.config.get('roboflow.retry_backoff_seconds', 0.1),
+            breaker=breaker
+        )
+    
+    def is_available(self) -> bool:
+        """Le modèle est configuré et le disjoncteur laisse passer les appels"""
+        if not self.has_api_key():
+            return False
+        self._ensure_initialized()
+        return self.client is not None and self.client.breaker.allow_request()
     
     def detect_balls_in_frame(self, frame: np.ndarray, 
                             frame_number: int, 
                             timestamp: float) -> List[BallDetection]:
         """Détecte les balles dans une frame"""
-        if self.model is None:
+        self._ensure_initialized()
+        if self.client is None:
             logger.warning("Modèle Roboflow non disponible")
             return []
         
         detections = []
         
         try:
-            # Sauvegarde temporaire de la frame
-            temp_path = os.path.join(self.temp_dir, f"frame_{frame_number}.jpg")
-            cv2.imwrite(temp_path, frame)
+            # Encodage JPEG en mémoire
+            ok, encoded = cv2.imencode(
+                ".jpg", frame,
+                [cv2.IMWRITE_JPEG_QUALITY, self.config.get('roboflow.jpeg_quality', 90)]
+            )
+            if not ok:
+                logger.error(f"Encodage impossible de la frame {frame_number}")
+                return []
             
             # Prédiction avec Roboflow
-            confidence = self.config.get('roboflow.confidence', 0.3) * 100
-            overlap = self.config.get('roboflow.overlap', 0.6) * 100
-            
-            prediction = self.model.predict(
-                temp_path, 
-                confidence=confidence, 
-                overlap=overlap
-            ).json()
+            balls = self.client.predict(encoded.tobytes())
             
             # Traitement des résultats
-            for detection in prediction.get("predictions", []):
-                if detection.get("class") == "ball":
-                    ball_detection = BallDetection(
-                        x=float(detection["x"]),
-                        y=float(detection["y"]),
-                        confidence=float(detection["confidence"]),
-                        timestamp=timestamp,
-                        frame_number=frame_number
-                    )
-                    detections.append(ball_detection)
-            
-            # Nettoyage du fichier temporaire
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            for x, y, confidence in balls:
+                ball_detection = BallDetection(
+                    x=x,
+                    y=y,
+                    confidence=confidence,
+                    timestamp=timestamp,
+                    frame_number=frame_number
+                )
+                detections.append(ball_detection)
                 
+        except InferenceError as e:
+            logger.warning(f"Inférence échouée sur la frame {frame_number} ({e.status}): {e}")
         except Exception as e:
             logger.error(f"Erreur lors de la détection dans la frame {frame_number}: {e}")
         
         return detections
     
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les statistiques du client d'inférence"""
+        return self.client.get_stats() if self.client else {}
+    
     def cleanup(self) -> None:
-        """Nettoie les fichiers temporaires"""
-        try:
-            import shutil
-            shutil.rmtree(self.temp_dir, ignore_errors=True)
-            logger.info("Fichiers temporaires nettoyés")
-        except Exception as e:
-            logger.warning(f"Erreur lors du nettoyage: {e}")
+        """Ferme les connexions persistantes du client d'inférence"""
+        if self.client:
+            logger.info(f"Client d'inférence: disjoncteur {self.client.breaker.state}")
+            self.client.transport.close()
 
 class FallbackBallDetector:
     """Détecteur de balles de secours utilisant OpenCV classique"""
     
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: ConfigManager,
+                 frame_pool: Optional[FrameBufferPool] = None):
         self.config = config
+        self.frame_pool = frame_pool or FrameBufferPool()
         self.background_subtractor = cv2.createBackgroundSubtractorMOG2(
             detectShadows=True
         )
+        # Seuils de surface normalisés par la surface de la frame
+        self.min_area_ratio = config.get('detection.min_ball_area_ratio', 3.3e-5)
+        self.max_area_ratio = config.get('detection.max_ball_area_ratio', 1.6e-3)
+        self.min_circularity = config.get('detection.min_circularity', 0.3)
+        self.scale = config.get('detection.fallback_scale', 1.0)
+        self.max_width = config.get('detection.fallback_max_width', 1280)
+        self.refine_patch_radius = config.get('detection.refinement.patch_radius', 16)
+        
+        # Filtre couleur HSV optionnel (jaune-vert d'une balle de tennis)
+        self.color_filter_enabled = config.get('detection.color_filter.enabled', False)
+        self.hsv_lower = np.array(
+            config.get('detection.color_filter.hsv_lower', [25, 60, 80]), dtype=np.float32
+        )
+        self.hsv_upper = np.array(
+            config.get('detection.color_filter.hsv_upper', [45, 255, 255]), dtype=np.float32
+        )
+        self.color_auto_learn = config.get('detection.color_filter.auto_learn', True)
+        self.color_learning_rate = config.get('detection.color_filter.learning_rate', 0.05)
+        self.hsv_tolerance = np.array(
+            config.get('detection.color_filter.hsv_tolerance', [8, 70, 70]), dtype=np.float32
+        )
+    
+    def get_processing_scale(self, frame_width: int) -> float:
+        """Facteur de réduction appliqué avant la soustraction d'arrière-plan"""
+        scale = self.scale
+        if self.max_width and frame_width > self.max_width:
+            scale = min(scale, self.max_width / frame_width)
+        return min(scale, 1.0)
     
     def detect_balls_in_frame(self, frame: np.ndarray, 
                             frame_number: int, 
@@ -119,85 +188,281 @@ class FallbackBallDetector:
         detections = []
         
         try:
-            # Conversion en niveaux de gris
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            height, width = frame.shape[:2]
+            scale = self.get_processing_scale(width)
+            
+            # Recherche des candidats sur une frame réduite
+            if scale < 1.0:
+                small_size = (max(int(width * scale), 1), max(int(height * scale), 1))
+                small = self.frame_pool.get(
+                    "fallback_small", (small_size[1], small_size[0], 3), frame.dtype
+                )
+                cv2.resize(frame, small_size, dst=small, interpolation=cv2.INTER_AREA)
+            else:
+                small = frame
+            
+            # Soustraction de l'arrière-plan dans un masque réutilisé
+            fg_mask = self.frame_pool.get("fg_mask", small.shape[:2])
+            self.background_subtractor.apply(small, fgmask=fg_mask)
             
-            # Soustraction de l'arrière-plan
-            fg_mask = self.background_subtractor.apply(frame)
+            # Fusion avec le masque couleur avant l'extraction des contours
+            if self.color_filter_enabled:
+                self._apply_color_gate(small, fg_mask)
             
             # Détection de contours
             contours, _ = cv2.findContours(
                 fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
             )
             
+            # Bornes de surface en pixels de la frame réduite
+            frame_area = small.shape[0] * small.shape[1]
+            min_area = self.min_area_ratio * frame_area
+            max_area = self.max_area_ratio * frame_area
+            
             for contour in contours:
                 area = cv2.contourArea(contour)
                 
                 # Filtrage par taille (approximation d'une balle de tennis)
-                if 10 < area < 500:
-                    # Calcul du centre du contour
-                    M = cv2.moments(contour)
-                    if M["m00"] != 0:
-                        cx = int(M["m10"] / M["m00"])
-                        cy = int(M["m01"] / M["m00"])
-                        
-                        # Vérification de la circularité
-                        perimeter = cv2.arcLength(contour, True)
-                        if perimeter > 0:
-                            circularity = 4 * np.pi * area / (perimeter * perimeter)
-                            
-                            if circularity > 0.3:  # Seuil de circularité
-                                detection = BallDetection(
-                                    x=float(cx),
-                                    y=float(cy),
-                                    confidence=min(circularity, 1.0),
-                                    timestamp=timestamp,
-                                    frame_number=frame_number
-                                )
-                                detections.append(detection)
+                if not min_area < area < max_area:
+                    continue
+                
+                # Vérification de la circularité (invariante à l'échelle)
+                perimeter = cv2.arcLength(contour, True)
+                if perimeter <= 0:
+                    continue
+                circularity = 4 * np.pi * area / (perimeter * perimeter)
+                if circularity <= self.min_circularity:
+                    continue
+                
+                # Calcul du centre du contour
+                M = cv2.moments(contour)
+                if M["m00"] == 0:
+                    continue
+                
+                if scale < 1.0:
+                    center = self._refine_center(
+                        frame, fg_mask, contour, scale
+                    )
+                else:
+                    center = (int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"]))
+                
+                detections.append(BallDetection(
+                    x=float(center[0]),
+                    y=float(center[1]),
+                    confidence=min(circularity, 1.0),
+                    timestamp=timestamp,
+                    frame_number=frame_number
+                ))
         
         except Exception as e:
             logger.error(f"Erreur dans le détecteur de secours: {e}")
         
         return detections
+    
+    def _apply_color_gate(self, image: np.ndarray, fg_mask: np.ndarray) -> None:
+        """Restreint le masque de mouvement aux pixels de couleur balle"""
+        roi = cv2.boundingRect(fg_mask)
+        x, y, w, h = roi
+        if w == 0 or h == 0:
+            return
+        
+        # Conversion HSV et seuillage limités à la zone en mouvement
+        hsv = self.frame_pool.get("fallback_hsv", (h, w, 3))
+        cv2.cvtColor(image[y:y + h, x:x + w], cv2.COLOR_BGR2HSV, dst=hsv)
+        color_mask = self.frame_pool.get("fallback_color_mask", (h, w))
+        cv2.inRange(hsv, self.hsv_lower.astype(np.uint8),
+                    self.hsv_upper.astype(np.uint8), dst=color_mask)
+        
+        mask_roi = fg_mask[y:y + h, x:x + w]
+        cv2.bitwise_and(mask_roi, color_mask, dst=mask_roi)
+    
+    def learn_ball_color(self, frame: np.ndarray, detection: BallDetection) -> None:
+        """Ajuste la plage HSV à partir d'une détection confirmée"""
+        if not (self.color_filter_enabled and self.color_auto_learn):
+            return
+        
+        radius = max(self.refine_patch_radius // 2, 2)
+        cx, cy = int(round(detection.x)), int(round(detection.y))
+        height, width = frame.shape[:2]
+        x0, x1 = max(cx - radius, 0), min(cx + radius + 1, width)
+        y0, y1 = max(cy - radius, 0), min(cy + radius + 1, height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        
+        hsv = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2HSV).reshape(-1, 3)
+        
+        # Seuls les pixels proches de la plage actuelle servent à l'apprentissage
+        near = np.all((hsv >= self.hsv_lower - self.hsv_tolerance) &
+                      (hsv <= self.hsv_upper + self.hsv_tolerance), axis=1)
+        if np.count_nonzero(near) < 3:
+            return
+        
+        median = np.median(hsv[near].astype(np.float32), axis=0)
+        rate = self.color_learning_rate
+        limits = np.array([179, 255, 255], dtype=np.float32)
+        self.hsv_lower = np.clip(
+            (1 - rate) * self.hsv_lower + rate * (median - self.hsv_tolerance), 0, limits
+        )
+        self.hsv_upper = np.clip(
+            (1 - rate) * self.hsv_upper + rate * (median + self.hsv_tolerance), 0, limits
+        )
+    
+    def _refine_center(self, frame: np.ndarray, fg_mask: np.ndarray,
+                       contour: np.ndarray, scale: float) -> Tuple[float, float]:
+        """Affine le centre d'un candidat dans un petit patch à pleine résolution"""
+        x, y, w, h = cv2.boundingRect(contour)
+        margin = self.refine_patch_radius
+        height, width = frame.shape[:2]
+        
+        # Patch à pleine résolution autour de la boîte englobante
+        x0 = max(int(x / scale) - margin, 0)
+        y0 = max(int(y / scale) - margin, 0)
+        x1 = min(int((x + w) / scale) + margin, width)
+        y1 = min(int((y + h) / scale) + margin, height)
+        patch = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        
+        # Support du masque de mouvement agrandi à la taille du patch
+        mask_patch = fg_mask[int(y0 * scale):int(np.ceil(y1 * scale)),
+                             int(x0 * scale):int(np.ceil(x1 * scale))]
+        support = cv2.resize(mask_patch, (x1 - x0, y1 - y0),
+                             interpolation=cv2.INTER_NEAREST)
+        
+        # Centroïde pondéré par le contraste local
+        contrast = cv2.absdiff(patch, np.full_like(patch, int(np.median(patch))))
+        weights = np.where(support > 0, contrast, 0).astype(np.float32)
+        M = cv2.moments(weights)
+        if M["m00"] == 0:
+            M = cv2.moments(contour)
+            return (M["m10"] / M["m00"] / scale, M["m01"] / M["m00"] / scale)
+        return (x0 + M["m10"] / M["m00"], y0 + M["m01"] / M["m00"])
+
+class DetectorHealth:
+    """Rappel et latence glissants d'un détecteur"""
+    
+    def __init__(self, window: int = 30):
+        self.window = window
+        self.results = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+        self.calls = 0
+        self.last_call_frame: Optional[int] = None
+    
+    def record(self, detections: List[BallDetection], latency: float,
+               frame_number: int) -> None:
+        """Enregistre le résultat d'un appel au détecteur"""
+        self.results.append(bool(detections))
+        self.latencies.append(latency)
+        self.calls += 1
+        self.last_call_frame = frame_number
+    
+    @property
+    def recall(self) -> float:
+        """Proportion des appels récents ayant produit au moins une détection"""
+        if not self.results:
+            return 1.0
+        return sum(self.results) / len(self.results)
+    
+    @property
+    def mean_latency(self) -> float:
+        """Latence moyenne récente en secondes"""
+        if not self.latencies:
+            return 0.0
+        return sum(self.latencies) / len(self.latencies)
+    
+    def get_stats(self) -> Dict[str, float]:
+        """Retourne les indicateurs de santé"""
+        return {
+            "calls": self.calls,
+            "recall": self.recall,
+            "mean_latency_ms": self.mean_latency * 1000
+        }
 
 class HybridBallDetector:
     """Détecteur hybride combinant Roboflow et OpenCV"""
     
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: ConfigManager,
+                 frame_pool: Optional[FrameBufferPool] = None):
         self.config = config
         self.roboflow_detector = RoboflowBallDetector(config)
-        self.fallback_detector = FallbackBallDetector(config)
-        self.use_fallback = False
+        self.fallback_detector = FallbackBallDetector(config, frame_pool)
+        # "hybrid" (défaut), "fallback" pour ne jamais appeler le modèle distant,
+        # ou "primary" pour l'appeler sur chaque frame (revue haute précision)
+        self.backend = config.get('detection.backend', 'hybrid')
+        
+        # Arbitrage: détecteur économique d'abord, escalade si nécessaire
+        window = config.get('detection.arbiter.health_window', 30)
+        self.escalation_confidence = config.get('detection.arbiter.escalation_confidence', 0.5)
+        self.min_primary_recall = config.get('detection.arbiter.min_primary_recall', 0.2)
+        self.probe_interval = config.get('detection.arbiter.probe_interval', 30)
+        self.primary_health = DetectorHealth(window)
+        self.fallback_health = DetectorHealth(window)
+        self.is_tracking = False
+        self.escalations = 0
+    
+    def notify_tracking(self, is_tracking: bool) -> None:
+        """Indique si la balle de jeu est actuellement suivie"""
+        self.is_tracking = is_tracking
     
     def detect_balls_in_frame(self, frame: np.ndarray, 
                             frame_number: int, 
                             timestamp: float) -> List[BallDetection]:
         """Détecte les balles en utilisant le meilleur détecteur disponible"""
         
-        # Tentative avec Roboflow d'abord
-        if not self.use_fallback and self.roboflow_detector.model is not None:
-            detections = self.roboflow_detector.detect_balls_in_frame(
-                frame, frame_number, timestamp
-            )
-            
-            # Si Roboflow échoue plusieurs fois, basculer vers le détecteur de secours
-            if not detections and frame_number % 10 == 0:
-                logger.info("Roboflow ne détecte rien, test du détecteur de secours")
-                fallback_detections = self.fallback_detector.detect_balls_in_frame(
-                    frame, frame_number, timestamp
-                )
-                if fallback_detections:
-                    logger.info("Détecteur de secours activé")
-                    self.use_fallback = True
-                    return fallback_detections
-            
+        # Le détecteur de secours tourne sur chaque frame (modèle d'arrière-plan)
+        detections = self._timed_detect(
+            self.fallback_detector, self.fallback_health, frame, frame_number, timestamp
+        )
+        
+        if not self._should_escalate(detections, frame_number):
             return detections
         
-        # Utilisation du détecteur de secours
-        return self.fallback_detector.detect_balls_in_frame(
-            frame, frame_number, timestamp
+        # Escalade vers Roboflow quand le suivi est perdu ou peu fiable
+        self.escalations += 1
+        primary_detections = self._timed_detect(
+            self.roboflow_detector, self.primary_health, frame, frame_number, timestamp
         )
+        return primary_detections if primary_detections else detections
+    
+    def _timed_detect(self, detector, health: DetectorHealth, frame: np.ndarray,
+                      frame_number: int, timestamp: float) -> List[BallDetection]:
+        """Appelle un détecteur en mesurant sa latence et son rappel"""
+        start = time.perf_counter()
+        detections = detector.detect_balls_in_frame(frame, frame_number, timestamp)
+        health.record(detections, time.perf_counter() - start, frame_number)
+        return detections
+    
+    def _should_escalate(self, detections: List[BallDetection],
+                         frame_number: int) -> bool:
+        """Décide si le détecteur coûteux doit être appelé sur cette frame"""
+        if self.backend == 'fallback' or not self.roboflow_detector.is_available():
+            return False
+        if self.backend == 'primary':
+            return True
+        
+        confident = any(d.confidence >= self.escalation_confidence for d in detections)
+        if self.is_tracking and confident:
+            return False
+        
+        return self._primary_available(frame_number)
+    
+    def _primary_available(self, frame_number: int) -> bool:
+        """Le détecteur principal est utilisé s'il est sain, ou sondé périodiquement"""
+        health = self.primary_health
+        if len(health.results) < health.window or health.recall >= self.min_primary_recall:
+            return True
+        return frame_number - health.last_call_frame >= self.probe_interval
+    
+    def get_health_stats(self) -> Dict[str, Any]:
+        """Retourne les indicateurs de santé des deux détecteurs"""
+        return {
+            "primary": self.primary_health.get_stats(),
+            "fallback": self.fallback_health.get_stats(),
+            "escalations": self.escalations,
+            "inference": self.roboflow_detector.get_stats()
+        }
+    
+    def learn_ball_color(self, frame: np.ndarray, detection: BallDetection) -> None:
+        """Transmet une détection confirmée au filtre couleur du détecteur de secours"""
+        self.fallback_detector.learn_ball_color(frame, detection)
     
     def cleanup(self) -> None:
         """Nettoie les ressources"""
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Traitement par lots des vidéos d'archive
+========================================
+
+Commande non interactive qui répartit un répertoire (ou un manifeste) de
+vidéos sur un pool de processus, chaque vidéo étant analysée avec son
+profil de calibration (fichier de configuration contenant la section
+"court"). Le statut et la durée de chaque tâche sont consignés dans un
+manifeste JSON; les vidéos déjà traitées sont ignorées lors des
+exécutions suivantes. La sortie d'une vidéo reprend son chemin relatif
+sous le répertoire de sortie (deux "match1.mp4" de jours différents ne
+s'écrasent pas). Un processus de travail tué (mémoire épuisée) fait
+échouer sa tâche sans bloquer le lot.
+
+Exemples:
+    python batch_runner.py --input archives/2024-06-01 --profile court_central.json
+    python batch_runner.py --manifest jobs.json --workers 4 --max-memory-mb 3000
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".avi", ".mkv", ".m4v"}
+
+def default_output(video: Path, output_dir: str, input_dir: Optional[str] = None) -> str:
+    """Sortie d'une vidéo: chemin relatif reproduit sous output_dir
+
+    Hors d'un répertoire d'entrée commun, le nom est rendu unique par une
+    empreinte du chemin absolu de la vidéo.
+    """
+    if input_dir is not None:
+        relative = video.relative_to(input_dir)
+        return str(Path(output_dir) / relative.parent / f"{video.stem}_hawkeye.mp4")
+    digest = hashlib.sha1(str(video.resolve()).encode("utf-8")).hexdigest()[:8]
+    return str(Path(output_dir) / f"{video.stem}_{digest}_hawkeye.mp4")
+
+def discover_jobs(input_dir: str, profile: str, output_dir: str) -> List[Dict[str, Any]]:
+    """Une tâche par vidéo du répertoire, avec le profil commun"""
+    jobs = []
+    for video in sorted(Path(input_dir).rglob("*")):
+        if video.suffix.lower() in VIDEO_EXTENSIONS and video.is_file():
+            jobs.append({
+                "video": str(video),
+                "profile": profile,
+                "output": default_output(video, output_dir, input_dir)
+            })
+    return jobs
+
+def load_job_list(manifest_path: str, default_profile: str,
+                  output_dir: str) -> List[Dict[str, Any]]:
+    """Tâches décrites dans un fichier JSON [{video, profile?, output?, max_duration?}]"""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    jobs = []
+    for entry in entries:
+        video = Path(entry["video"])
+        jobs.append({
+            "video": str(video),
+            "profile": entry.get("profile", default_profile),
+            "output": entry.get("output") or default_output(video, output_dir),
+            "max_duration": entry.get("max_duration")
+        })
+    return jobs
+
+def job_key(job: Dict[str, Any]) -> str:
+    """Identifiant d'une tâche: vidéo, taille et date de modification"""
+    stat = os.stat(job["video"])
+    return f"{os.path.abspath(job['video'])}|{stat.st_size}|{stat.st_mtime_ns}"
+
+class JobManifest:
+    """Manifeste JSON des tâches (statut, durée, résultats), écrit de façon atomique"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.jobs = json.load(f).get("jobs", {})
+
+    def is_done(self, key: str) -> bool:
+        """La tâche est terminée et sa sortie existe toujours"""
+        entry = self.jobs.get(key)
+        return bool(entry and entry.get("status") == "done" and
+                    Path(entry["output"]).exists())
+
+    def update(self, key: str, **fields: Any) -> None:
+        """Met à jour une tâche et réécrit le manifeste"""
+        self.jobs.setdefault(key, {}).update(fields)
+        self.save()
+
+    def save(self) -> None:
+        """Écriture atomique du manifeste"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"jobs": self.jobs}, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def summary(self) -> Dict[str, int]:
+        """Nombre de tâches par statut"""
+        counts: Dict[str, int] = {}
+        for entry in self.jobs.values():
+            status = entry.get("status", "unknown")
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+def _limit_worker_memory(max_memory_mb: int) -> None:
+    """Borne l'espace d'adressage de chaque processus de travail (Unix)"""
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(processName)s - %(levelname)s - %(message)s')
+    if max_memory_mb <= 0:
+        return
+    try:
+        import resource
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Limite mémoire non appliquée: {e}")
+
+def run_job(key: str, job: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyse une vidéo dans un processus de travail, sans interaction"""
+    from main_hawkeye import TennisHawkEyeSystem
+    from checkpoint import CheckpointManager
+    from tennis_hawkeye import CourtCalibrator
+
+    start = time.time()
+    result: Dict[str, Any] = {"key": key, "started": start, "pid": os.getpid()}
+    try:
+        system = TennisHawkEyeSystem(job["profile"])
+        geometry = CourtCalibrator(system.config).load_geometry()
+        if geometry is None or not geometry.is_valid():
+            raise ValueError(f"Profil sans calibration du terrain: {job['profile']}")
+        system.set_court_geometry(geometry)
+        # Points de reprise toujours écrits en lot: une tâche tuée reprend
+        system.config.set('checkpoint.enabled', True)
+
+        Path(job["output"]).parent.mkdir(parents=True, exist_ok=True)
+        # Une tâche interrompue reprend à son dernier point de reprise
+        resume = CheckpointManager(job["output"]).checkpoint_path.exists()
+        if not system.process_video(job["video"], job["output"],
+                                    job.get("max_duration"), resume=resume):
+            raise RuntimeError("échec du traitement vidéo")
+
+        if system.config.get('highlights.enabled', False):
+            from highlights import highlights_directory
+            # En mode résumé, la sortie de la tâche est l'index des séquences
+            result["output"] = str(highlights_directory(job["output"]) / "index.json")
+        result.update(status="done", frames=system.stats["total_frames"],
+                      bounces=system.stats["bounces_detected"],
+                      in_calls=system.stats["in_calls"],
+                      out_calls=system.stats["out_calls"])
+    except MemoryError:
+        result.update(status="failed", error="limite mémoire dépassée")
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+    result.update(finished=time.time(), elapsed=time.time() - start)
+    return result
+
+Runner = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+
+def _record_result(manifest: JobManifest, result: Dict[str, Any]) -> None:
+    """Consigne le résultat d'une tâche dans le manifeste"""
+    key = result.pop("key")
+    manifest.update(key, **result)
+    video = manifest.jobs[key]["video"]
+    if result["status"] == "done":
+        logger.info(f"Terminée en {result['elapsed']:.1f}s: {video}")
+    else:
+        logger.error(f"Échec: {video} ({result.get('error')})")
+
+def _execute(pending: List[Tuple[str, Dict[str, Any]]], manifest: JobManifest,
+             workers: int, max_memory_mb: int, runner: Runner
+             ) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[Tuple[str, Dict[str, Any]]]]:
+    """Exécute les tâches sur un pool de processus
+
+    Les tâches ne sont soumises qu'à mesure que des processus se libèrent:
+    les tâches soumises sont celles en cours d'exécution. Si un processus de
+    travail meurt (tué par le noyau ou limite d'espace d'adressage atteinte
+    hors Python), le pool est inutilisable et la tâche fautive n'est pas
+    identifiable. Retourne (tâches en cours interrompues, tâches jamais
+    démarrées).
+    """
+    queued = list(pending)
+    running: Dict[Any, Tuple[str, Dict[str, Any]]] = {}
+    interrupted: List[Tuple[str, Dict[str, Any]]] = []
+    context = multiprocessing.get_context("spawn")
+    # Un processus neuf par tâche: la mémoire est rendue au système entre deux vidéos
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_limit_worker_memory, initargs=(max_memory_mb,),
+                             max_tasks_per_child=1) as executor:
+        while queued or running:
+            try:
+                while queued and len(running) < workers:
+                    key, job = queued[0]
+                    running[executor.submit(runner, key, job)] = queued.pop(0)
+            except BrokenProcessPool:
+                pass
+            done, _ = wait(running, return_when=FIRST_COMPLETED) if running else (set(), set())
+            for future in done:
+                item = running.pop(future)
+                try:
+                    _record_result(manifest, future.result())
+                except BrokenProcessPool:
+                    interrupted.append(item)
+            if interrupted or (queued and not running):
+                interrupted.extend(running.values())
+                break
+    return interrupted, queued
+
+def run_batch(jobs: List[Dict[str, Any]], manifest: JobManifest, workers: int,
+              max_memory_mb: int = 0, retry_failed: bool = False,
+              runner: Runner = run_job) -> Dict[str, int]:
+    """Planifie les tâches non terminées sur le pool et consigne leurs résultats"""
+    pending = []
+    outputs: Dict[str, str] = {}
+    for job in jobs:
+        if not Path(job["video"]).exists():
+            logger.error(f"Vidéo introuvable: {job['video']}")
+            continue
+        output = os.path.abspath(job["output"])
+        if output in outputs:
+            logger.error(f"Sortie {job['output']} déjà utilisée par {outputs[output]}: "
+                         f"{job['video']} ignorée")
+            continue
+        outputs[output] = job["video"]
+        key = job_key(job)
+        entry = manifest.jobs.get(key, {})
+        if manifest.is_done(key):
+            logger.info(f"Déjà traitée: {job['video']}")
+            continue
+        if entry.get("status") == "failed" and not retry_failed:
+            logger.info(f"Échec précédent ignoré (--retry-failed pour relancer): {job['video']}")
+            continue
+        manifest.update(key, **job, status="pending")
+        pending.append((key, job))
+
+    if not pending:
+        return manifest.summary()
+
+    logger.info(f"{len(pending)} vidéo(s) à traiter sur {workers} processus")
+    while pending:
+        interrupted, pending = _execute(pending, manifest, workers, max_memory_mb, runner)
+
+        # Pool cassé: seules les tâches en cours sont relancées seules (reprise
+        # à leur point de reprise) pour identifier celle qui tue son processus;
+        # les autres repartent sur un pool neuf à pleine capacité
+        for key, job in interrupted:
+            logger.warning(f"Processus de travail perdu, relance isolée: {job['video']}")
+            if _execute([(key, job)], manifest, 1, max_memory_mb, runner)[0]:
+                manifest.update(key, status="failed", finished=time.time(),
+                                error="processus de travail interrompu (mémoire épuisée?)")
+                logger.error(f"Échec: {job['video']} (processus de travail interrompu)")
+    return manifest.summary()
+
+def main():
+    """Point d'entrée du traitement par lots"""
+    parser = argparse.ArgumentParser(description="Traitement par lots Tennis Hawk-Eye")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="Répertoire de vidéos (parcouru récursivement)")
+    source.add_argument("--manifest", help="Liste JSON des tâches")
+    parser.add_argument("--profile", default="config.json",
+                        help="Profil de calibration par défaut (configuration avec 'court')")
+    parser.add_argument("--output-dir", default="batch_output")
+    parser.add_argument("--job-manifest", default="",
+                        help="Manifeste des tâches (défaut: <output-dir>/batch_manifest.json)")
+    parser.add_argument("--workers", type=int, default=max(os.cpu_count() // 2, 1))
+    parser.add_argument("--max-memory-mb", type=int, default=0,
+                        help="Limite d'espace d'adressage par processus (0: aucune)")
+    parser.add_argument("--retry-failed", action="store_true")
+    args = parser.parse_args()
+    if sys.version_info < (3, 11):
+        # max_tasks_per_child du pool de processus
+        parser.error("le traitement par lots nécessite Python 3.11 ou supérieur")
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.input:
+        jobs = discover_jobs(args.input, args.profile, args.output_dir)
+    else:
+        jobs = load_job_list(args.manifest, args.profile, args.output_dir)
+
+    manifest = JobManifest(args.job_manifest or
+                           str(Path(args.output_dir) / "batch_manifest.json"))
+    summary = run_batch(jobs, manifest, args.workers, args.max_memory_mb, args.retry_failed)
+    print(f"Résumé: {summary}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks Tennis Hawk-Eye
+===================================
+
+Mesure les frames par seconde, la latence par étape et le pic de mémoire
+(RSS) des détecteurs, trackers et du détecteur IN/OUT sur des échanges
+synthétiques reproductibles, ainsi que la précision des appels en ligne et
+hors ligne du pipeline complet. Les résultats sont écrits en JSON pour
+comparer les performances d'un commit à l'autre.
+
+Exemples:
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --compare bench.json --tolerance 0.1
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from queue import Empty
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import cv2
+import numpy as np
+
+from demo import SyntheticRally
+from line_call_evaluation import (
+    DEFAULT_PRESETS, call_events, make_offline_config, run_pipeline, score_calls
+)
+from tennis_hawkeye import (
+    BallTracker, MultiBallTracker, InOutDetector, BallDetection, CourtGeometry
+)
+
+def _peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus courant, en Mo"""
+    # VmHWM est remis à zéro par exec, contrairement à ru_maxrss sous Linux
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sur macOS, kilo-octets sur Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def bench_pipeline(video_path: str, truth: Dict[str, Any],
+                   detector_name: str) -> Dict[str, Any]:
+    """Traitement complet d'une vidéo synthétique avec un détecteur donné"""
+    system, elapsed = run_pipeline(
+        video_path, CourtGeometry(**truth["court"]),
+        {**DEFAULT_PRESETS[detector_name], "offline_smoothing.enabled": True,
+         "profiling.enabled": True},
+        str(ROOT / "config.json")
+    )
+    frames = system.stats["total_frames"]
+    # Appels en ligne et hors ligne contre la vérité terrain
+    calls = {}
+    for mode in ("online", "offline"):
+        scores = score_calls(call_events(system, mode), truth["bounces"])
+        calls[mode] = {key: scores[key] for key in
+                       ("bounce_recall", "call_accuracy", "timing_error_ms",
+                        "pixel_error_mean")}
+    return {
+        "frames": frames,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "stages": system.profiler.get_summary(),
+        "bounces_detected": system.stats["bounces_detected"],
+        "calls": calls
+    }
+
+def bench_tracker(tracker_name: str, candidates: int, frames: int) -> Dict[str, Any]:
+    """Mises à jour par seconde d'un tracker avec balles de rechange"""
+    config = make_offline_config({}, str(ROOT / "config.json"))
+    rally = SyntheticRally(duration=frames / 30, seed=0, spare_balls=candidates - 1)
+    spares = np.asarray(rally.spare_positions).reshape(-1, 2)
+
+    tracker = MultiBallTracker(config) if tracker_name == "multi" else BallTracker(config)
+    start = time.perf_counter()
+    for frame_number in range(rally.total_frames):
+        points = np.vstack([rally.positions[frame_number:frame_number + 1], spares])
+        detections = [
+            BallDetection(x=float(x), y=float(y), confidence=0.8,
+                          timestamp=frame_number / 30, frame_number=frame_number)
+            for x, y in points
+        ]
+        if tracker_name == "multi":
+            tracker.update(detections, frame_number)
+        else:
+            for detection in detections:
+                tracker.add_detection(detection)
+    elapsed = time.perf_counter() - start
+    return {"updates_per_second": rally.total_frames / elapsed,
+            "mean_update_ms": elapsed / rally.total_frames * 1000}
+
+def bench_in_out(calls: int) -> Dict[str, Any]:
+    """Appels par seconde du détecteur IN/OUT"""
+    rally = SyntheticRally(duration=1, seed=0)
+    detector = InOutDetector(rally.geometry)
+    points = np.random.default_rng(0).uniform((0, 0), (600, 400), size=(calls, 2))
+
+    start = time.perf_counter()
+    for point in points:
+        detector.is_ball_in_court((point[0], point[1]))
+    classify = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for point in points:
+        detector.distance_to_nearest_line((point[0], point[1]))
+    distance = time.perf_counter() - start
+    return {"classify_per_second": calls / classify,
+            "distance_per_second": calls / distance}
+
+def _run_isolated(queue, function: Callable, args: Tuple) -> None:
+    """Exécute un cas dans un processus dédié pour isoler le pic de RSS"""
+    try:
+        result = function(*args)
+        result["peak_rss_mb"] = _peak_rss_mb()
+        queue.put(result)
+    except Exception as e:
+        queue.put({"error": str(e)})
+
+# Délai maximal d'un cas avant d'arrêter son processus, en secondes
+CASE_TIMEOUT = 600.0
+
+def run_case(function: Callable, *args, timeout: float = CASE_TIMEOUT) -> Dict[str, Any]:
+    """Lance un cas de benchmark dans un sous-processus"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_isolated, args=(queue, function, args))
+    process.start()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = queue.get(timeout=1.0)
+            break
+        except Empty:
+            pass
+        if not process.is_alive():
+            # Le résultat a pu être déposé juste avant la fin du processus
+            try:
+                result = queue.get(timeout=1.0)
+            except Empty:
+                result = {"error": f"processus terminé sans résultat "
+                                   f"(code {process.exitcode})"}
+            break
+        if time.monotonic() > deadline:
+            process.terminate()
+            result = {"error": f"délai de {timeout:.0f} s dépassé"}
+            break
+    process.join()
+    if "error" in result:
+        print(f"  échec: {result['error']}")
+    return result
+
+def _git_commit() -> str:
+    """Commit courant, si disponible"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def _parse_resolution(text: str) -> Tuple[int, int]:
+    """Convertit '1280x720' en (1280, 720)"""
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    """Exécute tous les cas et retourne les résultats"""
+    results: List[Dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for resolution in args.resolutions.split(","):
+            width, height = _parse_resolution(resolution)
+            rally = SyntheticRally(width=width, height=height, fps=args.fps,
+                                   duration=args.duration, noise=args.noise,
+                                   seed=args.seed)
+            video_path = str(Path(tmp) / f"rally_{width}x{height}.mp4")
+            rally.write_video(video_path)
+            truth = rally.ground_truth()
+
+            for detector_name in DEFAULT_PRESETS:
+                name = f"pipeline/{detector_name}/{width}x{height}"
+                print(f"- {name}")
+                result = run_case(bench_pipeline, video_path, truth, detector_name,
+                                  timeout=args.case_timeout)
+                results.append({"name": name, "kind": "pipeline",
+                                "params": {"width": width, "height": height,
+                                           "fps": args.fps, "noise": args.noise},
+                                **result})
+
+    for tracker_name in ("single", "multi"):
+        for candidates in (1, 10, 40):
+            name = f"tracker/{tracker_name}/{candidates}"
+            print(f"- {name}")
+            result = run_case(bench_tracker, tracker_name, candidates, args.tracker_frames,
+                              timeout=args.case_timeout)
+            results.append({"name": name, "kind": "tracker",
+                            "params": {"candidates": candidates}, **result})
+
+    print("- in_out")
+    results.append({"name": "in_out", "kind": "in_out",
+                    "params": {"calls": args.in_out_calls},
+                    **run_case(bench_in_out, args.in_out_calls,
+                                 timeout=args.case_timeout)})
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed
+        },
+        "results": results
+    }
+
+# Métrique principale (plus grand = meilleur) par type de cas
+PRIMARY_METRIC = {
+    "pipeline": "fps",
+    "tracker": "updates_per_second",
+    "in_out": "classify_per_second"
+}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float) -> List[str]:
+    """Liste les cas dont la métrique principale a régressé au-delà de la tolérance"""
+    previous = {r["name"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        metric = PRIMARY_METRIC.get(result["kind"])
+        old = previous.get(result["name"], {}).get(metric)
+        new = result.get(metric)
+        if old and "error" in result:
+            # Un cas mesuré auparavant qui échoue compte comme une régression
+            print(f"{result['name']:<45} échec: {result['error']}")
+            regressions.append(result["name"])
+            continue
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        print(f"{result['name']:<45} {metric}: {old:10.1f} -> {new:10.1f} ({change:+.1%})")
+        if change < -tolerance:
+            regressions.append(result["name"])
+    return regressions
+
+def main():
+    """Point d'entrée de la suite de benchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmarks Tennis Hawk-Eye")
+    parser.add_argument("--resolutions", default="640x360,1280x720,1920x1080",
+                        help="Résolutions séparées par des virgules")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--duration", type=float, default=5.0,
+                        help="Durée des vidéos synthétiques en secondes")
+    parser.add_argument("--noise", type=float, default=2.0,
+                        help="Écart-type du bruit gaussien ajouté aux frames")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracker-frames", type=int, default=600)
+    parser.add_argument("--in-out-calls", type=int, default=20000)
+    parser.add_argument("--case-timeout", type=float, default=CASE_TIMEOUT,
+                        help="Délai maximal d'un cas en secondes avant d'arrêter son processus")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", default="",
+                        help="Résultats de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Baisse relative tolérée avant de signaler une régression")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"Résultats écrits: {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Régressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
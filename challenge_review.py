@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Revue de challenge autour d'un rebond
+=====================================
+
+Accès direct à la frame d'un rebond (CAP_PROP_POS_FRAMES), décodage d'une
+fenêtre de ±1 s seulement, nouvelle détection haute précision (modèle
+complet, pleine résolution) sur cette fenêtre puis rendu d'un replay
+ralenti et zoomé sur le point d'impact.
+
+Exemple:
+    python challenge_review.py --video match.mp4 --frame 1234 --output replay.mp4
+"""
+
+import argparse
+import copy
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from tennis_hawkeye import (
+    ConfigManager, CourtGeometry, CourtCalibrator, BounceEvent, BallDetection,
+    MultiBallTracker, InOutDetector, FrameClock
+)
+from ball_detector import HybridBallDetector
+from offline_smoothing import OfflineBounceDetector
+
+logger = logging.getLogger(__name__)
+
+# Détection haute précision: modèle complet sur chaque frame, pleine résolution
+REVIEW_OVERRIDES = {
+    "detection.fallback_scale": 1.0,
+    "detection.fallback_max_width": 0
+}
+
+class ChallengeReviewer:
+    """Ré-analyse et replay d'une fenêtre courte autour d'un rebond contesté"""
+
+    def __init__(self, config: ConfigManager, geometry: CourtGeometry,
+                 frame_cache=None):
+        self.config = copy.deepcopy(config)
+        for key, value in REVIEW_OVERRIDES.items():
+            self.config.set(key, value)
+        self.config.set('detection.backend', config.get('review.backend', 'primary'))
+
+        self.geometry = geometry
+        self.in_out_detector = InOutDetector(geometry)
+        self.frame_cache = frame_cache
+        self.window_seconds = config.get('review.window_seconds', 1.0)
+        self.warmup_seconds = config.get('review.warmup_seconds', 0.5)
+        self.slow_motion_factor = config.get('review.slow_motion_factor', 4)
+        self.zoom = config.get('review.zoom', 2.5)
+
+    def review(self, video_path: str, target: Union[BounceEvent, int],
+               output_path: str = "") -> Optional[Dict[str, Any]]:
+        """Ré-évalue le rebond le plus proche de la cible et rend le replay"""
+        start = time.perf_counter()
+        original = target if isinstance(target, BounceEvent) else None
+        target_frame = original.frame_number if original else int(target)
+
+        capture = self._open(video_path)
+        if capture is None:
+            return None
+        try:
+            fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+            total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            window = int(round(self.window_seconds * fps))
+            first = max(target_frame - window, 0)
+            last = min(target_frame + window, total - 1) if total > 0 else target_frame + window
+            warmup_first = max(first - int(round(self.warmup_seconds * fps)), 0)
+
+            track = self._analyze(capture, warmup_first, first, last, fps)
+            bounce = self._closest_bounce(self._find_bounces(track), target_frame)
+
+            if bounce is not None:
+                position, detection = bounce
+                frame_number = detection.frame_number
+                timestamp = detection.timestamp
+                call = self.in_out_detector.is_ball_in_court(position)
+                line_distance = self.in_out_detector.distance_to_nearest_line(position)
+            else:
+                logger.warning(f"Aucun rebond retrouvé autour de la frame {target_frame}")
+                position = (original.x, original.y) if original else None
+                frame_number = target_frame
+                timestamp = original.timestamp if original else frame_number / fps
+                call = "UNKNOWN"
+                line_distance = None
+
+            if output_path and position is not None:
+                self._render_replay(capture, first, last, fps, track,
+                                    position, frame_number, call, output_path)
+        finally:
+            capture.release()
+
+        result = {
+            "frame_number": frame_number,
+            "timestamp": timestamp,
+            "x": float(position[0]) if position is not None else None,
+            "y": float(position[1]) if position is not None else None,
+            "call": call,
+            "line_distance": line_distance,
+            "original_call": original.call if original else None,
+            "overturned": bool(original and call != "UNKNOWN" and call != original.call),
+            "frames_decoded": last - warmup_first + 1,
+            "output": output_path or None,
+            "elapsed_seconds": time.perf_counter() - start
+        }
+        logger.info(f"Revue de la frame {target_frame}: {call} "
+                    f"en {result['elapsed_seconds']:.2f}s")
+        return result
+
+    def _open(self, video_path: str):
+        """Ouvre la vidéo, via le cache de frames s'il est fourni"""
+        if self.frame_cache:
+            capture = self.frame_cache.open_capture(video_path)
+        else:
+            capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            logger.error(f"Impossible d'ouvrir la vidéo: {video_path}")
+            return None
+        return capture
+
+    def _analyze(self, capture, warmup_first: int, first: int,
+                 last: int, fps: float) -> List[BallDetection]:
+        """Détecte et suit la balle de jeu sur la fenêtre"""
+        detector = HybridBallDetector(self.config)
+        multi_tracker = MultiBallTracker(self.config)
+        track: List[BallDetection] = []
+        clock = FrameClock(fps)
+
+        capture.set(cv2.CAP_PROP_POS_FRAMES, warmup_first)
+        try:
+            for frame_number in range(warmup_first, last + 1):
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                detections = detector.detect_balls_in_frame(
+                    frame, frame_number, clock.timestamp(capture, frame_number))
+                # Les frames de préchauffage n'alimentent que le modèle d'arrière-plan
+                if frame_number < first:
+                    continue
+
+                rally_detection = multi_tracker.update(detections, frame_number)
+                detector.notify_tracking(rally_detection is not None)
+                if rally_detection is not None:
+                    track.append(rally_detection)
+        finally:
+            detector.cleanup()
+        return track
+
+    def _find_bounces(self, track: List[BallDetection]
+                      ) -> List[Tuple[Tuple[float, float], BallDetection]]:
+        """Rebonds hors ligne sur la trajectoire lissée sans retard de la fenêtre"""
+        return OfflineBounceDetector(self.config).detect(track)
+
+    def _closest_bounce(self, bounces: List[Tuple[Tuple[float, float], BallDetection]],
+                        target_frame: int
+                        ) -> Optional[Tuple[Tuple[float, float], BallDetection]]:
+        """Rebond le plus proche de la frame contestée"""
+        if not bounces:
+            return None
+        return min(bounces, key=lambda b: abs(b[1].frame_number - target_frame))
+
+    def _crop_window(self, width: int, height: int,
+                     center: Tuple[float, float]) -> Tuple[int, int, int, int]:
+        """Fenêtre de zoom centrée sur le rebond et bornée à l'image"""
+        crop_w = max(int(width / self.zoom), 16)
+        crop_h = max(int(height / self.zoom), 16)
+        x0 = int(np.clip(center[0] - crop_w / 2, 0, width - crop_w))
+        y0 = int(np.clip(center[1] - crop_h / 2, 0, height - crop_h))
+        return x0, y0, crop_w, crop_h
+
+    def _render_replay(self, capture, first: int, last: int, fps: float,
+                       track: List[BallDetection],
+                       position: Tuple[float, float], bounce_frame: int,
+                       call: str, output_path: str) -> None:
+        """Écrit le replay ralenti et zoomé de la fenêtre"""
+        width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        x0, y0, crop_w, crop_h = self._crop_window(width, height, position)
+        scale = np.array([width / crop_w, height / crop_h])
+        origin = np.array([x0, y0])
+
+        def to_view(point) -> Tuple[int, int]:
+            view = (np.asarray(point, dtype=np.float64) - origin) * scale
+            return int(view[0]), int(view[1])
+
+        colors = self.config.get('visualization.colors', {})
+        thickness = self.config.get('visualization.line_thickness', 2)
+        if call == "IN":
+            call_color = colors.get('ball_in', [0, 255, 0])
+        elif call == "OUT":
+            call_color = colors.get('ball_out', [0, 0, 255])
+        else:
+            call_color = [255, 255, 255]
+        court_lines = [
+            (np.array([to_view(p) for p in polygon], np.int32), colors.get(key, default))
+            for polygon, key, default in (
+                (self.geometry.court_corners, 'court_boundary', [0, 255, 0]),
+                (self.geometry.service_box_corners, 'service_area', [0, 0, 255]))
+            if polygon
+        ]
+
+        writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'),
+                                 max(fps / self.slow_motion_factor, 1.0), (width, height))
+        view = np.empty((height, width, 3), dtype=np.uint8)
+        capture.set(cv2.CAP_PROP_POS_FRAMES, first)
+        try:
+            for frame_number in range(first, last + 1):
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                cv2.resize(frame[y0:y0 + crop_h, x0:x0 + crop_w], (width, height),
+                           dst=view, interpolation=cv2.INTER_CUBIC)
+
+                for points, color in court_lines:
+                    cv2.polylines(view, [points], True, color, thickness)
+
+                path = [to_view((d.x, d.y)) for d in track if d.frame_number <= frame_number]
+                if len(path) >= 2:
+                    cv2.polylines(view, [np.array(path, np.int32)], False,
+                                  colors.get('trajectory', [255, 255, 0]), thickness)
+
+                if frame_number >= bounce_frame:
+                    cv2.circle(view, to_view(position), int(6 * scale[0]), call_color, thickness)
+                    cv2.putText(view, call, (30, 60), cv2.FONT_HERSHEY_SIMPLEX,
+                                1.5, call_color, 3)
+
+                cv2.putText(view, f"x{self.slow_motion_factor} - frame {frame_number}",
+                            (30, height - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
+                            (255, 255, 255), 2)
+                writer.write(view)
+        finally:
+            writer.release()
+        logger.info(f"Replay écrit: {output_path}")
+
+def main():
+    """Point d'entrée de la revue de challenge"""
+    parser = argparse.ArgumentParser(description="Revue de challenge d'un rebond")
+    parser.add_argument("--video", required=True, help="Vidéo du match")
+    parser.add_argument("--frame", type=int, required=True,
+                        help="Frame du rebond contesté")
+    parser.add_argument("--output", default="challenge_replay.mp4")
+    parser.add_argument("--config", default="config.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    config = ConfigManager(args.config)
+    geometry = CourtCalibrator(config).load_geometry()
+    if geometry is None or not geometry.is_valid():
+        print("Géométrie du terrain non configurée")
+        return
+
+    result = ChallengeReviewer(config, geometry).review(args.video, args.frame, args.output)
+    if result is None:
+        print("Échec de la revue")
+        return
+    distance = (f"{result['line_distance']:.1f}px"
+                if result['line_distance'] is not None else "-")
+    print(f"Frame {result['frame_number']}: {result['call']} "
+          f"(ligne à {distance}) en {result['elapsed_seconds']:.2f}s")
+    print(f"Replay: {result['output']}")
+
+if __name__ == "__main__":
+    main()
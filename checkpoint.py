@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Points de reprise du traitement vidéo
+=====================================
+
+Sauvegarde périodique de l'état du traitement (trackers, appels,
+statistiques, frame courante) et écriture de la sortie en segments
+finalisés, concaténés à la fin. Un traitement interrompu reprend à la
+dernière frame sauvegardée au lieu de tout recommencer.
+
+Les détections de la balle de jeu, qui croissent avec la durée du match,
+sont ajoutées par blocs à un fichier annexe au lieu d'être réécrites à
+chaque point de reprise; celui-ci ne conserve que la taille valide du
+fichier annexe.
+"""
+
+import os
+import pickle
+import shutil
+import subprocess
+import tempfile
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 3
+
+class CheckpointManager:
+    """Fichier de reprise et segments de sortie associés à une vidéo de sortie"""
+
+    def __init__(self, output_path: str):
+        self.output_path = Path(output_path)
+        self.checkpoint_path = Path(f"{output_path}.checkpoint")
+        self.segment_dir = Path(f"{output_path}.segments")
+        self.detections_path = Path(f"{output_path}.detections")
+
+    def segment_path(self, index: int) -> str:
+        """Chemin du segment de sortie d'indice donné"""
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        suffix = self.output_path.suffix or ".mp4"
+        return str(self.segment_dir / f"segment_{index:04d}{suffix}")
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """Écrit le point de reprise de façon atomique"""
+        state = dict(state, version=CHECKPOINT_VERSION)
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.checkpoint_path.parent,
+                                        prefix=self.checkpoint_path.name)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.checkpoint_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Point de reprise sauvegardé à la frame {state.get('frame_count')}")
+
+    def append_detections(self, records: List[Any]) -> int:
+        """Ajoute un bloc de détections au fichier annexe; retourne sa taille valide"""
+        self.detections_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.detections_path, 'ab') as f:
+            if records:
+                pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            return f.tell()
+
+    def load_detections(self, size: int) -> List[Any]:
+        """Relit les détections jusqu'à la taille enregistrée au point de reprise
+
+        Les blocs ajoutés après ce point (interruption avant la sauvegarde de
+        l'état) sont tronqués pour que la reprise les réécrive une seule fois.
+        """
+        records: List[Any] = []
+        if size <= 0:
+            if self.detections_path.exists():
+                self.detections_path.unlink()
+            return records
+        with open(self.detections_path, 'r+b') as f:
+            while f.tell() < size:
+                records.extend(pickle.load(f))
+            f.truncate(size)
+        return records
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Lit le dernier point de reprise, s'il existe et est compatible"""
+        try:
+            with open(self.checkpoint_path, 'rb') as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.error(f"Point de reprise illisible {self.checkpoint_path}: {e}")
+            return None
+        if state.get("version") != CHECKPOINT_VERSION:
+            logger.error(f"Version de point de reprise incompatible: {state.get('version')}")
+            return None
+        return state
+
+    def concatenate(self, segments: List[str], fps: float) -> bool:
+        """Assemble les segments dans la vidéo de sortie finale"""
+        if not segments:
+            return False
+        if len(segments) == 1:
+            os.replace(segments[0], self.output_path)
+            return True
+        if shutil.which("ffmpeg") and self._concatenate_ffmpeg(segments):
+            return True
+        return self._concatenate_opencv(segments, fps)
+
+    def _concatenate_ffmpeg(self, segments: List[str]) -> bool:
+        """Concaténation sans réencodage avec le démultiplexeur concat de ffmpeg"""
+        list_path = self.segment_dir / "segments.txt"
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for segment in segments:
+                f.write(f"file '{Path(segment).resolve()}'\n")
+        result = subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+             "-i", str(list_path), "-c", "copy", str(self.output_path)],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            logger.warning(f"Concaténation ffmpeg échouée: {result.stderr.strip()}")
+            return False
+        return True
+
+    def _concatenate_opencv(self, segments: List[str], fps: float) -> bool:
+        """Concaténation par réencodage OpenCV (sans ffmpeg)"""
+        writer = None
+        try:
+            for segment in segments:
+                capture = cv2.VideoCapture(segment)
+                while True:
+                    ret, frame = capture.read()
+                    if not ret:
+                        break
+                    if writer is None:
+                        height, width = frame.shape[:2]
+                        writer = cv2.VideoWriter(str(self.output_path),
+                                                 cv2.VideoWriter_fourcc(*'mp4v'),
+                                                 fps, (width, height))
+                    writer.write(frame)
+                capture.release()
+        finally:
+            if writer is not None:
+                writer.release()
+        return writer is not None
+
+    def clear(self) -> None:
+        """Supprime le point de reprise et les segments"""
+        if self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+        if self.detections_path.exists():
+            self.detections_path.unlink()
+        shutil.rmtree(self.segment_dir, ignore_errors=True)
@@ -8,7 +8,6 @@ incluant la sélection des zones et la calibration de la caméra.
 """
 
 import cv2
-import pygame
 import numpy as np
 import json
 import logging
@@ -32,6 +31,16 @@ class InteractiveCourtSetup:
             "baseline": {"points": [], "color": (255, 0, 0), "name": "Ligne de fond"}
         }
         self.setup_complete = False
+        
+        # Aperçu à la résolution d'affichage et loupe pleine résolution
+        self.max_display_size = (config.get('setup.max_display_width', 1600),
+                                 config.get('setup.max_display_height', 900))
+        self.loupe_radius = config.get('setup.loupe_radius', 16)
+        self.loupe_zoom = config.get('setup.loupe_zoom', 8)
+        self.preview = None
+        self.display_scale = 1.0
+        self.cursor = None
+        self._loupe_origin = (0, 0)
     
     def setup_from_image(self, image_path: str) -> bool:
         """Configure le terrain à partir d'une image de référence"""
@@ -40,12 +49,23 @@ class InteractiveCourtSetup:
                 logger.error(f"Image non trouvée: {image_path}")
                 return False
             
-            self.image = cv2.imread(image_path)
-            if self.image is None:
+            image = cv2.imread(image_path)
+            if image is None:
                 logger.error(f"Impossible de charger l'image: {image_path}")
                 return False
             
             logger.info(f"Image chargée: {image_path}")
+            return self.setup_from_array(image)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors du setup: {e}")
+            return False
+    
+    def setup_from_array(self, image: np.ndarray) -> bool:
+        """Configure le terrain à partir d'une image déjà en mémoire (ex: extraite de la vidéo)"""
+        try:
+            self.image = image
+            self._prepare_preview()
             self._run_interactive_setup()
             return self.setup_complete
             
@@ -86,44 +106,75 @@ class InteractiveCourtSetup:
         else:
             print("\n✗ Configuration invalide")
     
+    def _prepare_preview(self) -> None:
+        """Réduit l'image de référence une seule fois à la résolution d'affichage"""
+        height, width = self.image.shape[:2]
+        self.display_scale = min(1.0, self.max_display_size[0] / width,
+                                 self.max_display_size[1] / height)
+        if self.display_scale < 1.0:
+            self.preview = cv2.resize(self.image, None, fx=self.display_scale,
+                                      fy=self.display_scale, interpolation=cv2.INTER_AREA)
+        else:
+            self.preview = self.image
+    
+    def _to_full_resolution(self, x: int, y: int) -> Tuple[int, int]:
+        """Convertit un clic dans l'aperçu en coordonnées de l'image complète"""
+        height, width = self.image.shape[:2]
+        full_x = int(round((x + 0.5) / self.display_scale - 0.5))
+        full_y = int(round((y + 0.5) / self.display_scale - 0.5))
+        return (min(max(full_x, 0), width - 1), min(max(full_y, 0), height - 1))
+    
     def _configure_zone(self, zone_key: str) -> bool:
-        """Configure une zone spécifique"""
+        """Configure une zone spécifique (réaffichage uniquement sur événement)"""
         zone = self.zones[zone_key]
         zone["points"] = []
+        if self.preview is None:
+            self._prepare_preview()
         
-        # Création de la fenêtre OpenCV
+        # Création des fenêtres OpenCV: aperçu réduit et loupe pleine résolution
         window_name = f"Configuration - {zone['name']}"
-        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+        loupe_name = "Loupe"
+        cv2.namedWindow(window_name, cv2.WINDOW_AUTOSIZE)
+        cv2.namedWindow(loupe_name, cv2.WINDOW_AUTOSIZE)
+        dirty = {"preview": True, "loupe": True}
+        
+        def add_point(point: Tuple[int, int]) -> None:
+            if len(zone["points"]) < 4:
+                zone["points"].append(point)
+                dirty["preview"] = dirty["loupe"] = True
+                print(f"Point {len(zone['points'])}: {point}")
         
-        # Callback pour les clics de souris
+        # Callbacks souris: le mouvement ne rafraîchit que la loupe
         def mouse_callback(event, x, y, flags, param):
-            if event == cv2.EVENT_LBUTTONDOWN and len(zone["points"]) < 4:
-                zone["points"].append((x, y))
-                print(f"Point {len(zone['points'])}: ({x}, {y})")
+            if event == cv2.EVENT_MOUSEMOVE:
+                self.cursor = self._to_full_resolution(x, y)
+                dirty["loupe"] = True
+            elif event == cv2.EVENT_LBUTTONDOWN:
+                add_point(self._to_full_resolution(x, y))
+        
+        # Un clic dans la loupe place le point au pixel exact de l'image complète
+        def loupe_callback(event, x, y, flags, param):
+            if event == cv2.EVENT_LBUTTONDOWN and self.cursor is not None:
+                add_point(self._loupe_to_full_resolution(x, y))
         
         cv2.setMouseCallback(window_name, mouse_callback)
+        cv2.setMouseCallback(loupe_name, loupe_callback)
         
         while True:
-            # Copie de l'image pour l'affichage
-            display_image = self.image.copy()
-            
-            # Affichage des zones déjà configurées
-            self._draw_configured_zones(display_image)
-            
-            # Affichage des points de la zone actuelle
-            self._draw_zone_points(display_image, zone)
-            
-            # Affichage des instructions
-            self._draw_instructions(display_image, zone_key)
-            
-            cv2.imshow(window_name, display_image)
+            if dirty["preview"]:
+                cv2.imshow(window_name, self._render_preview(zone_key))
+                dirty["preview"] = False
+            if dirty["loupe"] and self.cursor is not None:
+                cv2.imshow(loupe_name, self._render_loupe(self.cursor, zone))
+                dirty["loupe"] = False
             
-            key = cv2.waitKey(1) & 0xFF
+            key = cv2.waitKey(20) & 0xFF
             
             if key == ord('q') and len(zone["points"]) == 4:
                 break
             elif key == ord('r'):
                 zone["points"] = []
+                dirty["preview"] = dirty["loupe"] = True
                 print("Zone réinitialisée")
             elif key == 27:  # Escape
                 cv2.destroyAllWindows()
@@ -132,30 +183,78 @@ class InteractiveCourtSetup:
         cv2.destroyAllWindows()
         return len(zone["points"]) == 4
     
-    def _draw_configured_zones(self, image: np.ndarray) -> None:
-        """Dessine les zones déjà configurées"""
+    def _render_preview(self, zone_key: str) -> np.ndarray:
+        """Aperçu à la résolution d'affichage avec zones, points et instructions"""
+        display_image = self.preview.copy()
+        self._draw_configured_zones(display_image, self.display_scale)
+        self._draw_zone_points(display_image, self.zones[zone_key], self.display_scale)
+        self._draw_instructions(display_image, zone_key)
+        return display_image
+    
+    def _render_loupe(self, center: Tuple[int, int], zone: dict) -> np.ndarray:
+        """Agrandissement pleine résolution autour du curseur, avec réticule"""
+        radius = self.loupe_radius
+        size = 2 * radius + 1
+        crop = np.zeros((size, size, 3), dtype=self.image.dtype)
+        height, width = self.image.shape[:2]
+        x0, y0 = center[0] - radius, center[1] - radius
+        src_x0, src_y0 = max(x0, 0), max(y0, 0)
+        src_x1, src_y1 = min(x0 + size, width), min(y0 + size, height)
+        crop[src_y0 - y0:src_y1 - y0, src_x0 - x0:src_x1 - x0] = \
+            self.image[src_y0:src_y1, src_x0:src_x1]
+        
+        zoom = self.loupe_zoom
+        loupe = cv2.resize(crop, (size * zoom, size * zoom), interpolation=cv2.INTER_NEAREST)
+        # Points déjà placés visibles dans la loupe
+        for point in zone["points"]:
+            px, py = point[0] - x0, point[1] - y0
+            if 0 <= px < size and 0 <= py < size:
+                cv2.rectangle(loupe, (px * zoom, py * zoom),
+                              ((px + 1) * zoom - 1, (py + 1) * zoom - 1), zone["color"], 1)
+        middle = radius * zoom + zoom // 2
+        cv2.line(loupe, (middle, 0), (middle, size * zoom - 1), (255, 255, 255), 1)
+        cv2.line(loupe, (0, middle), (size * zoom - 1, middle), (255, 255, 255), 1)
+        cv2.putText(loupe, f"{center[0]}, {center[1]}", (5, 15),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        self._loupe_origin = (x0, y0)
+        return loupe
+    
+    def _loupe_to_full_resolution(self, x: int, y: int) -> Tuple[int, int]:
+        """Convertit un clic dans la loupe en pixel de l'image complète"""
+        height, width = self.image.shape[:2]
+        full_x = self._loupe_origin[0] + x // self.loupe_zoom
+        full_y = self._loupe_origin[1] + y // self.loupe_zoom
+        return (min(max(full_x, 0), width - 1), min(max(full_y, 0), height - 1))
+    
+    def _draw_configured_zones(self, image: np.ndarray, scale: float = 1.0) -> None:
+        """Dessine les zones déjà configurées (points mis à l'échelle de l'image)"""
         for zone_key, zone in self.zones.items():
             if len(zone["points"]) == 4:
-                points = np.array(zone["points"], np.int32)
+                points = self._scale_points(zone["points"], scale)
                 cv2.polylines(image, [points], True, zone["color"], 2)
                 
                 # Label de la zone
-                if zone["points"]:
-                    cv2.putText(image, zone["name"], zone["points"][0], 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.7, zone["color"], 2)
+                cv2.putText(image, zone["name"], tuple(int(v) for v in points[0]),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, zone["color"], 2)
     
-    def _draw_zone_points(self, image: np.ndarray, zone: dict) -> None:
+    def _draw_zone_points(self, image: np.ndarray, zone: dict, scale: float = 1.0) -> None:
         """Dessine les points de la zone en cours de configuration"""
-        for i, point in enumerate(zone["points"]):
-            cv2.circle(image, point, 5, zone["color"], -1)
-            cv2.putText(image, str(i+1), (point[0]+10, point[1]-10),
+        points = self._scale_points(zone["points"], scale)
+        for i, (x, y) in enumerate(points):
+            cv2.circle(image, (int(x), int(y)), 5, zone["color"], -1)
+            cv2.putText(image, str(i+1), (int(x)+10, int(y)-10),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, zone["color"], 2)
         
         # Ligne entre les points
-        if len(zone["points"]) > 1:
-            points = np.array(zone["points"], np.int32)
+        if len(points) > 1:
             cv2.polylines(image, [points], False, zone["color"], 1)
     
+    def _scale_points(self, points: List[Tuple[int, int]], scale: float) -> np.ndarray:
+        """Points pleine résolution convertis aux coordonnées de l'aperçu"""
+        if not points:
+            return np.empty((0, 2), np.int32)
+        return np.round((np.asarray(points, np.float64) + 0.5) * scale - 0.5).astype(np.int32)
+    
     def _draw_instructions(self, image: np.ndarray, zone_key: str) -> None:
         """Affiche les instructions sur l'image"""
         zone = self.zones[zone_key]
@@ -14,7 +14,11 @@ import os
 import tempfile
 from pathlib import Path
 
-from tennis_hawkeye import ConfigManager, BallTracker, BallDetection, CourtGeometry
+from typing import Any, Dict, List, Optional, Tuple
+
+from tennis_hawkeye import (
+    ConfigManager, BallTracker, BallDetection, CourtGeometry, InOutDetector
+)
 from ball_detector import FallbackBallDetector
 from court_setup import InteractiveCourtSetup
 
@@ -26,7 +30,15 @@ def create_demo_config():
             "project": "tennis-demo",
             "version": 1,
             "confidence": 0.3,
-            "overlap": 0.6
+            "overlap": 0.6,
+            "api_url": "https://detect.roboflow.com",
+            "timeout_seconds": 2.0,
+            "max_retries": 2,
+            "retry_backoff_seconds": 0.1,
+            "circuit_failure_threshold": 5,
+            "circuit_reset_seconds": 30.0,
+            "pool_size": 4,
+            "jpeg_quality": 90
         },
         "video": {
             "input_path": "demo_video.mp4",
@@ -40,19 +52,119 @@ def create_demo_config():
             "baseline_corners": [[100, 75], [500, 75], [500, 325], [100, 325]]
         },
         "detection": {
+            "backend": "hybrid",
             "min_ball_confidence": 0.3,
             "max_tracking_distance": 50,
             "bounce_detection_threshold": 0.8,
-            "trajectory_smoothing": 0.7
+            "bounce_debounce_seconds": 0.3,
+            "trajectory_smoothing": 0.7,
+            "max_track_misses": 5,
+            "min_track_hits": 3,
+            "static_ball_speed": 2.0,
+            "reference_fps": 30.0,
+            "min_ball_area_ratio": 3.3e-05,
+            "max_ball_area_ratio": 0.0016,
+            "min_circularity": 0.3,
+            "fallback_scale": 1.0,
+            "fallback_max_width": 1280,
+            "color_filter": {
+                "enabled": False,
+                "hsv_lower": [25, 60, 80],
+                "hsv_upper": [45, 255, 255],
+                "hsv_tolerance": [8, 70, 70],
+                "auto_learn": True,
+                "learning_rate": 0.05
+            },
+            "refinement": {
+                "enabled": True,
+                "trigger_distance": 4.0,
+                "patch_radius": 16
+            },
+            "arbiter": {
+                "health_window": 30,
+                "escalation_confidence": 0.5,
+                "min_primary_recall": 0.2,
+                "probe_interval": 30
+            }
+        },
+        "profiling": {
+            "enabled": False,
+            "window": 1000,
+            "summary_path": "",
+            "trace_path": ""
+        },
+        "review": {
+            "backend": "primary",
+            "window_seconds": 1.0,
+            "warmup_seconds": 0.5,
+            "slow_motion_factor": 4,
+            "zoom": 2.5
+        },
+        "multi_camera": {
+            "court_corners_world": [[-4.115, -11.885], [4.115, -11.885], [4.115, 11.885], [-4.115, 11.885]],
+            "max_time_gap": 0.05,
+            "bounce_height": 0.15,
+            "max_reprojection_error": 10.0,
+            "cameras": []
+        },
+        "checkpoint": {
+            "enabled": False,
+            "interval_seconds": 60,
+            "warmup_seconds": 20.0
+        },
+        "event_store": {
+            "enabled": False,
+            "path": "match_events.db",
+            "match_name": "",
+            "season": "",
+            "played_at": "",
+            "batch_size": 256,
+            "flush_interval_seconds": 1.0
+        },
+        "offline_smoothing": {
+            "enabled": True,
+            "max_gap_seconds": 0.2,
+            "process_noise": 1.0e7,
+            "measurement_noise": 1.5,
+            "fit_window": 3
+        },
+        "highlights": {
+            "enabled": False,
+            "pre_roll_seconds": 2.0,
+            "post_roll_seconds": 2.0,
+            "source": "rendered",
+            "jpeg_quality": 90,
+            "max_ring_mb": 256
+        },
+        "frame_cache": {
+            "enabled": False,
+            "directory": ".frame_cache",
+            "quota_gb": 20
+        },
+        "reference": {
+            "reservoir_size": 48,
+            "preview_width": 320,
+            "subset_size": 9,
+            "seed": 0,
+            "output_path": ""
+        },
+        "setup": {
+            "max_display_width": 1600,
+            "max_display_height": 900,
+            "loupe_radius": 16,
+            "loupe_zoom": 8
         },
         "visualization": {
             "show_trajectory": True,
             "show_court_lines": True,
             "show_confidence": True,
+            "show_legend": True,
+            "show_call_banner": True,
             "line_thickness": 2,
             "colors": {
                 "court_boundary": [0, 255, 0],
                 "service_area": [0, 0, 255],
+                "baseline": [255, 0, 0],
                 "ball_in": [0, 255, 0],
                 "ball_out": [0, 0, 255],
                 "trajectory": [255, 255, 0]
@@ -140,6 +252,158 @@ def create_synthetic_video():
     out.release()
     print("✓ Vidéo synthétique créée: demo_video.mp4")
 
+# Géométrie de référence du terrain synthétique (600x400)
+DEMO_COURT_CORNERS = [(50, 50), (550, 50), (550, 350), (50, 350)]
+DEMO_SERVICE_CORNERS = [(150, 100), (450, 100), (450, 300), (150, 300)]
+DEMO_BASELINE_CORNERS = [(100, 75), (500, 75), (500, 325), (100, 325)]
+
+class SyntheticRally:
+    """Échange synthétique: vols paraboliques avec rebonds et vérité terrain"""
+    
+    def __init__(self, width: int = 600, height: int = 400, fps: float = 30,
+                 duration: float = 5.0, noise: float = 0.0, seed: int = 0,
+                 out_ratio: float = 0.3, spare_balls: int = 0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.total_frames = int(round(duration * fps))
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+        self.scale = min(width / 600, height / 400)
+        self.ball_radius = max(int(round(6 * self.scale)), 2)
+        self.geometry = CourtGeometry(
+            court_corners=self._scale_points(DEMO_COURT_CORNERS),
+            service_box_corners=self._scale_points(DEMO_SERVICE_CORNERS),
+            baseline_corners=self._scale_points(DEMO_BASELINE_CORNERS)
+        )
+        self.positions = np.full((self.total_frames, 2), np.nan)
+        self.bounces: List[Dict[str, Any]] = []
+        self._simulate(out_ratio)
+        self.spare_positions = [
+            (float(self.rng.uniform(0.05, 0.95) * width),
+             float(self.rng.uniform(0.9, 0.97) * height))
+            for _ in range(spare_balls)
+        ]
+        self.background = self._render_court()
+    
+    def _scale_points(self, points: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Met à l'échelle un polygone du terrain de référence"""
+        return [(int(round(x * self.scale)), int(round(y * self.scale))) for x, y in points]
+    
+    def _random_ground_point(self, want_out: bool) -> Tuple[float, float]:
+        """Tire un point au sol dans (ou hors de) la zone IN"""
+        detector = InOutDetector(self.geometry)
+        for _ in range(100):
+            point = (float(self.rng.uniform(0.05, 0.95) * self.width),
+                     float(self.rng.uniform(0.15, 0.9) * self.height))
+            if (detector.is_ball_in_court(point) == "OUT") == want_out:
+                return point
+        return point
+    
+    def _simulate(self, out_ratio: float) -> None:
+        """Génère les positions image de la balle et les rebonds"""
+        detector = InOutDetector(self.geometry)
+        frame = 0
+        start = self._random_ground_point(False)
+        launch = self.rng.uniform(10, 30) * self.scale
+        while frame < self.total_frames:
+            target = self._random_ground_point(self.rng.random() < out_ratio)
+            flight = max(int(self.fps * self.rng.uniform(0.5, 0.9)), 4)
+            apex = self.rng.uniform(40, 90) * self.scale
+            
+            # Vol jusqu'au rebond: projection au sol linéaire, hauteur parabolique
+            t = np.arange(flight) / flight
+            ground = np.outer(1 - t, start) + np.outer(t, target)
+            height = launch * (1 - t) + 4 * apex * t * (1 - t)
+            self._write_positions(frame, ground, height)
+            frame += flight
+            if frame >= self.total_frames:
+                break
+            
+            self.bounces.append({
+                "frame_number": frame,
+                "timestamp": frame / self.fps,
+                "x": target[0],
+                "y": target[1],
+                "call": detector.is_ball_in_court(target)
+            })
+            
+            # Remontée après le rebond jusqu'à la frappe suivante
+            rise = max(int(flight * 0.6), 3)
+            t = np.arange(rise) / rise
+            direction = np.subtract(target, start)
+            hit = np.asarray(target) + 0.3 * direction
+            hit = (float(np.clip(hit[0], 0, self.width - 1)),
+                   float(np.clip(hit[1], 0, self.height - 1)))
+            ground = np.outer(1 - t, target) + np.outer(t, hit)
+            height = 0.6 * apex * np.sin(0.5 * np.pi * t)
+            self._write_positions(frame, ground, height)
+            frame += rise
+            start = hit
+            launch = 0.6 * apex
+    
+    def _write_positions(self, first_frame: int, ground: np.ndarray,
+                         height: np.ndarray) -> None:
+        """Écrit les positions image d'un segment de vol"""
+        end = min(first_frame + len(ground), self.total_frames)
+        count = end - first_frame
+        self.positions[first_frame:end, 0] = ground[:count, 0]
+        self.positions[first_frame:end, 1] = ground[:count, 1] - height[:count]
+    
+    def _render_court(self) -> np.ndarray:
+        """Dessine le terrain de fond à la résolution demandée"""
+        img = np.full((self.height, self.width, 3), 34, dtype=np.uint8)
+        thickness = max(int(round(2 * self.scale)), 1)
+        for polygon in (self.geometry.court_corners,
+                        self.geometry.service_box_corners,
+                        self.geometry.baseline_corners):
+            cv2.polylines(img, [np.array(polygon, np.int32)], True,
+                          (255, 255, 255), thickness)
+        return img
+    
+    def render_frame(self, frame_number: int) -> np.ndarray:
+        """Rend une frame avec la balle, les balles de rechange et le bruit"""
+        frame = self.background.copy()
+        for x, y in self.spare_positions:
+            cv2.circle(frame, (int(x), int(y)), self.ball_radius, (0, 255, 255), -1)
+        x, y = self.positions[frame_number]
+        if not np.isnan(x):
+            cv2.circle(frame, (int(round(x)), int(round(y))),
+                       self.ball_radius, (0, 255, 255), -1)
+        if self.noise > 0:
+            noise = self.rng.normal(0, self.noise, frame.shape)
+            frame = np.clip(frame + noise, 0, 255).astype(np.uint8)
+        return frame
+    
+    def write_video(self, path: str) -> None:
+        """Écrit l'échange dans une vidéo MP4"""
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        out = cv2.VideoWriter(path, fourcc, self.fps, (self.width, self.height))
+        for frame_number in range(self.total_frames):
+            out.write(self.render_frame(frame_number))
+        out.release()
+    
+    def ground_truth(self) -> Dict[str, Any]:
+        """Vérité terrain sérialisable (rebonds, appels et géométrie)"""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "fps": self.fps,
+            "total_frames": self.total_frames,
+            "court": {
+                "court_corners": self.geometry.court_corners,
+                "service_box_corners": self.geometry.service_box_corners,
+                "baseline_corners": self.geometry.baseline_corners
+            },
+            "bounces": self.bounces
+        }
+
+def create_rally_video(path: str, **kwargs) -> Dict[str, Any]:
+    """Crée une vidéo d'échange synthétique et retourne sa vérité terrain"""
+    rally = SyntheticRally(**kwargs)
+    rally.write_video(path)
+    return rally.ground_truth()
+
 def test_ball_tracker():
     """Test du tracker de balles avec des données synthétiques"""
     print("\n=== Test du Ball Tracker ===")
@@ -157,7 +421,7 @@ def test_ball_tracker():
     for i, (x, y) in enumerate(trajectory_points):
         detection = BallDetection(
             x=float(x), y=float(y), confidence=0.8,
-            timestamp=i * 0.1, frame_number=i
+            timestamp=i / 30, frame_number=i
         )
         
         success = tracker.add_detection(detection)
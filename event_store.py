@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Base d'événements de match interrogeable
+========================================
+
+Chaque rebond, appel de ligne, segment de piste et statistique de match est
+conservé dans une base SQLite indexée (match, instant, zone, appel). Les
+écritures passent par une file consommée par un thread d'écriture qui les
+regroupe en transactions, pour ne pas ralentir la boucle de traitement.
+
+La distance à la ligne est en pixels pour une caméra seule et en mètres
+pour le mode multi-caméras (colonne `distance_unit`: 'px' ou 'm').
+
+Exemple de requête (tous les OUT à moins de 5 px de la ligne de fond de la
+saison 2024):
+    store.query_bounces(call="OUT", zone="baseline", max_line_distance=5.0,
+                        distance_unit="px", season="2024")
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from tennis_hawkeye import BounceEvent
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    video_path TEXT,
+    season TEXT,
+    played_at TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bounces (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    timestamp REAL NOT NULL,
+    frame_number INTEGER NOT NULL,
+    x REAL NOT NULL,
+    y REAL NOT NULL,
+    call TEXT NOT NULL,
+    zone TEXT,
+    line_distance REAL,
+    distance_unit TEXT NOT NULL DEFAULT 'px',
+    uncertainty REAL,
+    refined INTEGER NOT NULL DEFAULT 0,
+    source TEXT NOT NULL DEFAULT 'online'
+);
+CREATE TABLE IF NOT EXISTS track_segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    track_id INTEGER,
+    start_frame INTEGER NOT NULL,
+    end_frame INTEGER NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    points TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS match_stats (
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    key TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (match_id, key)
+);
+CREATE INDEX IF NOT EXISTS idx_matches_season ON matches(season, played_at);
+CREATE INDEX IF NOT EXISTS idx_bounces_match_time ON bounces(match_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_bounces_call_zone ON bounces(call, zone, line_distance);
+CREATE INDEX IF NOT EXISTS idx_bounces_zone ON bounces(zone, line_distance);
+CREATE INDEX IF NOT EXISTS idx_segments_match_time ON track_segments(match_id, start_time);
+"""
+
+INSERT_BOUNCE = """
+INSERT INTO bounces (match_id, timestamp, frame_number, x, y, call, zone,
+                     line_distance, distance_unit, uncertainty, refined, source)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_SEGMENT = """
+INSERT INTO track_segments (match_id, track_id, start_frame, end_frame,
+                            start_time, end_time, points)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+UPSERT_STAT = """
+INSERT INTO match_stats (match_id, key, value) VALUES (?, ?, ?)
+ON CONFLICT(match_id, key) DO UPDATE SET value = excluded.value
+"""
+
+class EventStore:
+    """Base SQLite des événements de match, alimentée par un thread d'écriture"""
+
+    def __init__(self, path: str, batch_size: int = 256, flush_interval: float = 1.0):
+        self.path = str(path)
+        self.batch_size = max(int(batch_size), 1)
+        self.flush_interval = flush_interval
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._connection = self._connect()
+        self._connection.executescript(SCHEMA)
+        self._migrate()
+        self._connection.commit()
+        self._lock = threading.Lock()
+
+        self._queue: "queue.Queue[Optional[Tuple[str, tuple]]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="event-store-writer",
+                                        daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connexion en mode WAL: lectures concurrentes pendant les écritures"""
+        connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30.0)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _migrate(self) -> None:
+        """Ajoute les colonnes absentes d'une base créée par une version antérieure"""
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(bounces)")}
+        if "distance_unit" not in columns:
+            # Les bases antérieures ne contiennent que des rebonds d'une caméra seule
+            self._connection.execute("ALTER TABLE bounces ADD COLUMN "
+                                     "distance_unit TEXT NOT NULL DEFAULT 'px'")
+
+    def start_match(self, name: str, video_path: str = "", season: str = "",
+                    played_at: str = "") -> int:
+        """Enregistre un match (écriture synchrone) et retourne son identifiant"""
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO matches (name, video_path, season, played_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, video_path, season, played_at, time.time())
+            )
+            self._connection.commit()
+        return int(cursor.lastrowid)
+
+    def add_bounce(self, match_id: int, event: BounceEvent, source: str = "online",
+                   distance_unit: str = "px") -> None:
+        """Met en file un rebond et son appel
+
+        source: online, offline ou multi_camera; distance_unit: unité de
+        `line_distance` ('px' dans l'image, 'm' sur le terrain).
+        """
+        self._queue.put((INSERT_BOUNCE, (
+            match_id, event.timestamp, event.frame_number, event.x, event.y,
+            event.call, event.zone, event.line_distance, distance_unit,
+            event.uncertainty, int(event.refined), source
+        )))
+
+    def add_track_segment(self, match_id: int, track_id: Optional[int],
+                          points: List[Tuple[int, float, float, float]]) -> None:
+        """Met en file un segment de piste: points (frame, instant, x, y)"""
+        if not points:
+            return
+        self._queue.put((INSERT_SEGMENT, (
+            match_id, track_id, points[0][0], points[-1][0], points[0][1], points[-1][1],
+            json.dumps([[round(float(v), 2) for v in point] for point in points])
+        )))
+
+    def set_stats(self, match_id: int, stats: Dict[str, float]) -> None:
+        """Met en file les statistiques d'un match (remplace les valeurs existantes)"""
+        for key, value in stats.items():
+            self._queue.put((UPSERT_STAT, (match_id, key, float(value))))
+
+    def truncate_match(self, match_id: int, from_frame: int) -> None:
+        """Supprime les événements d'un match à partir d'une frame (reprise)"""
+        self.flush()
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM bounces WHERE match_id = ? AND frame_number >= ?",
+                (match_id, from_frame))
+            self._connection.execute(
+                "DELETE FROM track_segments WHERE match_id = ? AND end_frame >= ?",
+                (match_id, from_frame))
+            self._connection.commit()
+
+    def flush(self) -> None:
+        """Attend que toutes les écritures en file soient validées"""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Vide la file, arrête le thread d'écriture et ferme la base"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        with self._lock:
+            self._connection.close()
+
+    def _write_loop(self) -> None:
+        """Regroupe les écritures en file en transactions de taille bornée"""
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            grouped: Dict[str, List[tuple]] = {}
+            for entry in batch:
+                if entry is None:
+                    running = False
+                    continue
+                grouped.setdefault(entry[0], []).append(entry[1])
+            try:
+                with self._lock:
+                    with self._connection:
+                        for statement, rows in grouped.items():
+                            self._connection.executemany(statement, rows)
+            except sqlite3.Error as e:
+                logger.error(f"Erreur d'écriture de la base d'événements: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def query_bounces(self, call: Optional[str] = None, zone: Optional[str] = None,
+                      max_line_distance: Optional[float] = None,
+                      distance_unit: Optional[str] = None,
+                      season: Optional[str] = None, match_id: Optional[int] = None,
+                      since: Optional[float] = None, until: Optional[float] = None,
+                      source: Optional[str] = None,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rebonds filtrés par appel, zone, distance à la ligne, saison, match et instant
+
+        Un seuil `max_line_distance` s'entend dans `distance_unit` (pixels par
+        défaut): les rebonds exprimés dans une autre unité sont exclus.
+        """
+        if max_line_distance is not None and distance_unit is None:
+            distance_unit = "px"
+        clauses, params = [], []
+        for column, value in (("b.call", call), ("b.zone", zone),
+                              ("b.match_id", match_id), ("m.season", season),
+                              ("b.source", source), ("b.distance_unit", distance_unit)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if max_line_distance is not None:
+            clauses.append("b.line_distance <= ?")
+            params.append(max_line_distance)
+        if since is not None:
+            clauses.append("b.timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("b.timestamp <= ?")
+            params.append(until)
+
+        sql = ("SELECT b.*, m.name AS match_name, m.season FROM bounces b "
+               "JOIN matches m ON m.id = b.match_id")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY b.match_id, b.timestamp"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self._fetch(sql, params)
+
+    def track_segments(self, match_id: int) -> List[Dict[str, Any]]:
+        """Segments de piste d'un match, points décodés"""
+        rows = self._fetch("SELECT * FROM track_segments WHERE match_id = ? "
+                           "ORDER BY start_time", [match_id])
+        for row in rows:
+            row["points"] = json.loads(row["points"])
+        return rows
+
+    def match_stats(self, match_id: int) -> Dict[str, float]:
+        """Statistiques enregistrées d'un match"""
+        rows = self._fetch("SELECT key, value FROM match_stats WHERE match_id = ?",
+                           [match_id])
+        return {row["key"]: row["value"] for row in rows}
+
+    def _fetch(self, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+        """Exécute une requête de lecture et retourne des dictionnaires"""
+        with self._lock:
+            cursor = self._connection.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
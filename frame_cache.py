@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Cache de frames décodées sur disque
+===================================
+
+Stocke les frames décodées d'une vidéo dans un fichier brut projeté en
+mémoire (memmap) accompagné d'un index. Les passes suivantes (calibration,
+ré-analyse, rendu) accèdent à n'importe quelle frame sans redécoder, via
+des vues NumPy sans copie. L'espace disque est borné par un quota avec
+éviction LRU par vidéo.
+
+Le nombre de frames annoncé par le conteneur n'est qu'une estimation:
+l'entrée est agrandie si le décodage la dépasse, et ramenée au nombre réel
+de frames à la fin de la vidéo.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class CachedCapture:
+    """Remplaçant de cv2.VideoCapture servant les frames depuis le cache"""
+
+    def __init__(self, cache: "FrameCache", entry_dir: Path,
+                 index: Dict[str, Any], video_path: str):
+        self.cache = cache
+        self.entry_dir = entry_dir
+        self.index = index
+        self.video_path = video_path
+        if not (entry_dir / "timestamps.raw").exists():
+            cache.create_timestamps(entry_dir, index["capacity"])
+        self._map()
+        self.position = 0
+        self._position_msec = 0.0
+        self._capture: Optional[cv2.VideoCapture] = None
+        self._capture_position = -1
+
+    def _map(self) -> None:
+        """Projette en mémoire les frames et leurs instants à la capacité de l'index"""
+        shape = (self.index["capacity"], self.index["height"], self.index["width"], 3)
+        self.frames = np.memmap(self.entry_dir / "frames.raw", dtype=np.uint8,
+                                mode="r+", shape=shape)
+        # Instants de présentation (ms) des frames en cache, NaN si inconnus
+        self.timestamps = np.memmap(self.entry_dir / "timestamps.raw", dtype=np.float64,
+                                    mode="r+", shape=(self.index["capacity"],))
+
+    @property
+    def cached_frames(self) -> int:
+        """Nombre de frames consécutives déjà présentes dans le cache"""
+        return self.index["frames_cached"]
+
+    def isOpened(self) -> bool:
+        """Toujours ouvert tant que le cache est accessible"""
+        return True
+
+    def frame(self, frame_number: int) -> Optional[np.ndarray]:
+        """Vue en lecture seule (sans copie) d'une frame déjà en cache"""
+        if not 0 <= frame_number < self.cached_frames:
+            return None
+        view = self.frames[frame_number]
+        view.flags.writeable = False
+        return view
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Lit la frame courante depuis le cache, ou la décode dans le cache
+
+        Comme cv2.VideoCapture.read, la frame est copiée dans `image` si ce
+        tampon est fourni (et de la bonne taille). Sinon, une frame en cache
+        est retournée comme vue en lecture seule du memmap: la copier avant
+        de dessiner dessus.
+        """
+        if self.position < self.cached_frames:
+            self._position_msec = self._cached_msec(self.position)
+            frame = self._serve(self.position, image)
+            self.position += 1
+            return True, frame
+
+        if not self._seek_capture(self.position):
+            return False, None
+
+        # Décodage directement dans l'emplacement du memmap
+        if self.position == self.cached_frames and self._reserve(self.position):
+            ok, frame = self._capture.read(image=self.frames[self.position])
+            if ok and frame.shape == self.frames.shape[1:]:
+                self.timestamps[self.position] = self._capture.get(cv2.CAP_PROP_POS_MSEC)
+                self.index["frames_cached"] = self.position + 1
+                frame = self._serve(self.position, image)
+        else:
+            ok, frame = self._capture.read(image=image)
+
+        if not ok:
+            if self.position == self.cached_frames:
+                self._complete()
+            return False, None
+
+        self._position_msec = self._capture.get(cv2.CAP_PROP_POS_MSEC)
+        self.position += 1
+        self._capture_position = self.position
+        return True, frame
+
+    def _serve(self, frame_number: int, image: Optional[np.ndarray]) -> np.ndarray:
+        """Frame en cache copiée dans `image`, ou vue en lecture seule"""
+        view = self.frame(frame_number)
+        if image is not None and image.shape == view.shape and image.dtype == view.dtype:
+            np.copyto(image, view)
+            return image
+        return view
+
+    def _reserve(self, frame_number: int) -> bool:
+        """Agrandit l'entrée si le décodage dépasse le nombre de frames estimé"""
+        capacity = self.index["capacity"]
+        if frame_number < capacity:
+            return True
+        extra = max(capacity // 4, 1)
+        frame_bytes = self.index["height"] * self.index["width"] * 3
+        if not self.cache.evict(extra * frame_bytes, keep=self.entry_dir):
+            logger.info("Quota du cache atteint: frames suivantes non mises en cache")
+            return False
+        self._resize(capacity + extra)
+        return True
+
+    def _complete(self) -> None:
+        """Fin de la vidéo: l'entrée est ramenée au nombre réel de frames"""
+        self.index["complete"] = True
+        if 0 < self.cached_frames < self.index["capacity"]:
+            self._resize(self.cached_frames)
+
+    def _resize(self, capacity: int) -> None:
+        """Redimensionne les fichiers de l'entrée et les projette à nouveau"""
+        previous = self.index["capacity"]
+        frame_bytes = self.index["height"] * self.index["width"] * 3
+        self.frames.flush()
+        self.timestamps.flush()
+        with open(self.entry_dir / "frames.raw", "r+b") as f:
+            f.truncate(capacity * frame_bytes)
+        with open(self.entry_dir / "timestamps.raw", "r+b") as f:
+            f.truncate(capacity * 8)
+            if capacity > previous:
+                f.seek(previous * 8)
+                np.full(capacity - previous, np.nan, dtype=np.float64).tofile(f)
+        self.index["capacity"] = capacity
+        self._map()
+        self.cache.write_index(self.entry_dir, self.index)
+
+    def _cached_msec(self, frame_number: int) -> float:
+        """Instant d'une frame en cache, à la cadence nominale s'il est inconnu"""
+        msec = float(self.timestamps[frame_number])
+        if np.isnan(msec):
+            return frame_number * 1000.0 / (self.index["fps"] or 30.0)
+        return msec
+
+    def _seek_capture(self, frame_number: int) -> bool:
+        """Ouvre et positionne la capture sous-jacente si nécessaire"""
+        if self._capture is None:
+            self._capture = cv2.VideoCapture(self.video_path)
+            self._capture_position = 0
+            if not self._capture.isOpened():
+                return False
+        if self._capture_position != frame_number:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            self._capture_position = frame_number
+        return True
+
+    def get(self, prop: int) -> float:
+        """Propriétés vidéo depuis l'index du cache"""
+        if prop == cv2.CAP_PROP_FPS:
+            return self.index["fps"]
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.index["width"]
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.index["height"]
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.cached_frames if self.index["complete"] else self.index["capacity"]
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return self.position
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self._position_msec
+        return 0.0
+
+    def set(self, prop: int, value: float) -> bool:
+        """Accès direct à une frame via CAP_PROP_POS_FRAMES"""
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.position = max(int(value), 0)
+            return True
+        return False
+
+    def release(self) -> None:
+        """Vide le memmap sur disque et met à jour l'index"""
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+        self.frames.flush()
+        self.timestamps.flush()
+        self.index["last_access"] = time.time()
+        self.cache.write_index(self.entry_dir, self.index)
+
+class FrameCache:
+    """Cache disque de frames décodées, borné par un quota avec éviction LRU"""
+
+    def __init__(self, directory: str = ".frame_cache", quota_bytes: int = 20 * 1024 ** 3):
+        self.directory = Path(directory)
+        self.quota_bytes = quota_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def video_key(self, video_path: str) -> str:
+        """Clé stable d'une vidéo (chemin, taille et date de modification)"""
+        stat = os.stat(video_path)
+        identity = f"{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+
+    def open_capture(self, video_path: str):
+        """Retourne une capture servie par le cache, ou cv2.VideoCapture si impossible"""
+        try:
+            entry_dir = self.directory / self.video_key(video_path)
+            index = self.read_index(entry_dir)
+            if index is None:
+                index = self._create_entry(entry_dir, video_path)
+            if index is None:
+                return cv2.VideoCapture(video_path)
+            index["last_access"] = time.time()
+            self.write_index(entry_dir, index)
+            return CachedCapture(self, entry_dir, index, video_path)
+        except OSError as e:
+            logger.warning(f"Cache de frames indisponible: {e}")
+            return cv2.VideoCapture(video_path)
+
+    def _create_entry(self, entry_dir: Path, video_path: str) -> Optional[Dict[str, Any]]:
+        """Réserve le fichier brut d'une nouvelle vidéo après éviction si besoin"""
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            return None
+        index = {
+            "source": os.path.abspath(video_path),
+            "width": int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": capture.get(cv2.CAP_PROP_FPS),
+            "capacity": int(capture.get(cv2.CAP_PROP_FRAME_COUNT)),
+            "frames_cached": 0,
+            "complete": False,
+            "last_access": time.time()
+        }
+        capture.release()
+
+        size = index["capacity"] * index["height"] * index["width"] * 3
+        if size <= 0 or size > self.quota_bytes:
+            logger.info(f"Vidéo non mise en cache ({size / 1024 ** 2:.0f} Mo)")
+            return None
+        self.evict(size)
+
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        with open(entry_dir / "frames.raw", "wb") as f:
+            f.truncate(size)
+        self.create_timestamps(entry_dir, index["capacity"])
+        self.write_index(entry_dir, index)
+        logger.info(f"Cache de frames créé: {entry_dir} ({size / 1024 ** 2:.0f} Mo)")
+        return index
+
+    def create_timestamps(self, entry_dir: Path, capacity: int) -> None:
+        """Réserve les instants de présentation d'une entrée (inconnus au départ)"""
+        np.full(capacity, np.nan, dtype=np.float64).tofile(entry_dir / "timestamps.raw")
+
+    def entries(self) -> List[Tuple[Path, Dict[str, Any]]]:
+        """Entrées du cache avec leur index"""
+        result = []
+        for entry_dir in self.directory.iterdir():
+            index = self.read_index(entry_dir)
+            if index is not None:
+                result.append((entry_dir, index))
+        return result
+
+    def entry_size(self, index: Dict[str, Any]) -> int:
+        """Taille réservée par une entrée, en octets"""
+        return index["capacity"] * index["height"] * index["width"] * 3
+
+    def evict(self, required_bytes: int, keep: Optional[Path] = None) -> bool:
+        """Supprime les vidéos les moins récemment utilisées pour libérer de la place
+
+        `keep` (entrée en cours d'agrandissement) n'est jamais évincée.
+        Retourne True si la place demandée tient dans le quota.
+        """
+        entries = sorted(self.entries(), key=lambda e: e[1].get("last_access", 0))
+        used = sum(self.entry_size(index) for _, index in entries)
+        for entry_dir, index in entries:
+            if used + required_bytes <= self.quota_bytes:
+                break
+            if keep is not None and entry_dir == keep:
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            used -= self.entry_size(index)
+            logger.info(f"Cache évincé: {index['source']}")
+        return used + required_bytes <= self.quota_bytes
+
+    def read_index(self, entry_dir: Path) -> Optional[Dict[str, Any]]:
+        """Lit l'index d'une entrée"""
+        try:
+            with open(entry_dir / "index.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_index(self, entry_dir: Path, index: Dict[str, Any]) -> None:
+        """Écrit l'index d'une entrée"""
+        with open(entry_dir / "index.json", "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=4)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Sortie en mode résumé (highlights)
+==================================
+
+Au lieu d'encoder toute la vidéo, seules de courtes séquences autour de
+chaque rebond sont écrites. Les dernières frames sont conservées, encodées
+en JPEG, dans un tampon circulaire (pré-roll) borné en frames et en octets:
+en 4K, un tampon brut de deux secondes dépasserait la limite mémoire d'un
+processus du traitement par lots. À chaque rebond, une séquence est
+ouverte avec ce pré-roll puis prolongée jusqu'au post-roll. Les rebonds
+rapprochés sont fusionnés dans la même séquence. Un index JSON décrit les
+séquences et les appels qu'elles contiennent.
+"""
+
+import json
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from tennis_hawkeye import BounceEvent
+
+logger = logging.getLogger(__name__)
+
+def highlights_directory(output_path: str) -> Path:
+    """Répertoire des séquences associé à une sortie vidéo"""
+    output = Path(output_path)
+    return output.parent / f"{output.stem}_highlights"
+
+class HighlightWriter:
+    """Écrit des séquences autour des rebonds et leur index"""
+
+    def __init__(self, output_path: str, fps: float, frame_size: Tuple[int, int],
+                 pre_roll_seconds: float = 2.0, post_roll_seconds: float = 2.0,
+                 video_path: str = "", jpeg_quality: int = 90,
+                 max_ring_mb: float = 256.0):
+        self.video_path = video_path
+        self.directory = highlights_directory(output_path)
+        self.index_path = self.directory / "index.json"
+        self.suffix = Path(output_path).suffix or ".mp4"
+        self.fps = fps
+        self.frame_size = frame_size
+        self.pre_roll = max(int(round(pre_roll_seconds * fps)), 0)
+        self.post_roll = max(int(round(post_roll_seconds * fps)), 0)
+
+        # Le rebond est confirmé quelques frames après son instant réel: le
+        # tampon garde une demi-seconde de plus que le pré-roll
+        self.capacity = self.pre_roll + max(int(fps // 2), 1)
+        self.encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+        self.max_ring_bytes = int(max_ring_mb * 1024 * 1024)
+        # (numéro de frame, instant, JPEG) du plus ancien au plus récent
+        self.ring: deque = deque()
+        self.ring_bytes = 0
+
+        self.clips: List[Dict[str, Any]] = []
+        self.writer: Optional[cv2.VideoWriter] = None
+        self.clip_end = -1
+        self.frames_written = 0
+
+    def write(self, frame: np.ndarray, frame_number: int,
+              timestamp: Optional[float] = None) -> None:
+        """Frame traitée: écrite dans la séquence en cours ou mise en tampon
+
+        `timestamp` est l'instant de la frame dans le conteneur; à défaut, il
+        est déduit du numéro de frame et de la cadence nominale.
+        """
+        if timestamp is None:
+            timestamp = frame_number / self.fps
+        if self.writer is not None and frame_number > self.clip_end:
+            self._close_clip()
+        if self.writer is not None:
+            self._write_clip_frame(frame, frame_number, timestamp)
+            return
+        ok, encoded = cv2.imencode('.jpg', frame, self.encode_params)
+        if not ok:
+            logger.warning(f"Frame {frame_number} non mise en tampon (encodage JPEG)")
+            return
+        self.ring.append((frame_number, timestamp, encoded))
+        self.ring_bytes += encoded.nbytes
+        # Pré-roll raccourci plutôt que de dépasser le budget mémoire
+        while self.ring and (len(self.ring) > self.capacity or
+                             self.ring_bytes > self.max_ring_bytes):
+            self.ring_bytes -= self.ring.popleft()[2].nbytes
+
+    def trigger(self, event: BounceEvent) -> None:
+        """Ouvre (ou prolonge) une séquence autour d'un rebond"""
+        if self.writer is None:
+            self._open_clip(event.frame_number - self.pre_roll)
+        self.clip_end = max(self.clip_end, event.frame_number + self.post_roll)
+        self.clips[-1]["events"].append({
+            "frame_number": event.frame_number,
+            "timestamp": event.timestamp,
+            "call": event.call,
+            "line_distance": event.line_distance
+        })
+
+    def _open_clip(self, first_frame: int) -> None:
+        """Nouvelle séquence, commençant par le pré-roll du tampon"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"clip_{len(self.clips) + 1:04d}{self.suffix}"
+        self.writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'),
+                                      self.fps, self.frame_size)
+        self.clips.append({"file": path.name, "start_frame": None, "end_frame": None,
+                           "events": []})
+
+        # Frames du tampon dans l'ordre chronologique
+        for frame_number, timestamp, encoded in self.ring:
+            if frame_number >= first_frame:
+                self._write_clip_frame(cv2.imdecode(encoded, cv2.IMREAD_COLOR),
+                                       frame_number, timestamp)
+        self.ring.clear()
+        self.ring_bytes = 0
+
+    def _write_clip_frame(self, frame: np.ndarray, frame_number: int,
+                          timestamp: float) -> None:
+        """Encode une frame dans la séquence en cours"""
+        clip = self.clips[-1]
+        if clip["start_frame"] is None:
+            clip["start_frame"] = frame_number
+            clip["start_time"] = timestamp
+        clip["end_frame"] = frame_number
+        clip["end_time"] = timestamp + 1.0 / self.fps
+        self.writer.write(frame)
+        self.frames_written += 1
+
+    def _close_clip(self) -> None:
+        """Finalise la séquence en cours"""
+        self.writer.release()
+        self.writer = None
+        self.clip_end = -1
+        clip = self.clips[-1]
+        logger.info(f"Séquence {clip['file']}: frames {clip['start_frame']}"
+                    f"-{clip['end_frame']}, {len(clip['events'])} rebond(s)")
+
+    def close(self) -> None:
+        """Finalise la dernière séquence et écrit l'index"""
+        if self.writer is not None:
+            self._close_clip()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "video": self.video_path,
+                "fps": self.fps,
+                "pre_roll_frames": self.pre_roll,
+                "post_roll_frames": self.post_roll,
+                "frames_written": self.frames_written,
+                "clips": self.clips
+            }, f, indent=4)
+        logger.info(f"{len(self.clips)} séquence(s), index: {self.index_path}")
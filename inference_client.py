@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Client d'inférence distante résilient
+=====================================
+
+Module encapsulant les appels au modèle hébergé avec des timeouts par
+requête, des tentatives bornées avec gigue, un disjoncteur (circuit breaker)
+et des histogrammes de latence par statut.
+"""
+
+import json
+import time
+import random
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HOSTED_API_URL = "https://detect.roboflow.com"
+
+class InferenceError(Exception):
+    """Erreur d'un appel d'inférence distante"""
+
+    def __init__(self, message: str, status: str, retryable: bool = True):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+class CircuitOpenError(InferenceError):
+    """Le disjoncteur est ouvert, l'appel n'a pas été tenté"""
+
+    def __init__(self):
+        super().__init__("Disjoncteur ouvert", "circuit_open", retryable=False)
+
+class LatencyHistogram:
+    """Histogramme de latences à seuils fixes (en millisecondes)"""
+
+    BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf')]
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS_MS)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def record(self, latency_ms: float) -> None:
+        """Ajoute une latence à l'histogramme"""
+        for index, bound in enumerate(self.BUCKETS_MS):
+            if latency_ms <= bound:
+                self.counts[index] += 1
+                break
+        self.total += 1
+        self.sum_ms += latency_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Représentation sérialisable de l'histogramme"""
+        labels = [f"<={b}" if b != float('inf') else "+inf" for b in self.BUCKETS_MS]
+        return {
+            "count": self.total,
+            "mean_ms": self.sum_ms / self.total if self.total else 0.0,
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+class CircuitBreaker:
+    """Disjoncteur fermé / ouvert / semi-ouvert"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._state = self.CLOSED
+
+    @property
+    def state(self) -> str:
+        """État courant, passant en semi-ouvert après le délai de réarmement"""
+        if self._state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Indique si un appel peut être tenté"""
+        return self.state != self.OPEN
+
+    def record_success(self) -> None:
+        """Referme le disjoncteur après un succès"""
+        self.failures = 0
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        """Compte un échec et ouvre le disjoncteur au-delà du seuil"""
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                logger.warning("Disjoncteur d'inférence ouvert")
+            self._state = self.OPEN
+            self.opened_at = self.clock()
+
+class ResilientInferenceClient:
+    """Appels d'inférence avec timeout, tentatives bornées et disjoncteur"""
+
+    def __init__(self, transport: Callable[[bytes, float], Any],
+                 timeout: float = 2.0, max_retries: int = 2,
+                 backoff: float = 0.1, breaker: Optional[CircuitBreaker] = None):
+        self.transport = transport
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def predict(self, image_bytes: bytes) -> Any:
+        """Envoie une image encodée et retourne la réponse du modèle"""
+        last_error: Optional[InferenceError] = None
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow_request():
+                self._record("circuit_open", 0.0)
+                raise CircuitOpenError()
+
+            start = time.perf_counter()
+            try:
+                result = self.transport(image_bytes, self.timeout)
+            except InferenceError as e:
+                self._record(e.status, (time.perf_counter() - start) * 1000)
+                self.breaker.record_failure()
+                last_error = e
+                if not e.retryable or attempt == self.max_retries:
+                    break
+                # Attente exponentielle avec gigue complète
+                time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+                continue
+
+            self._record("ok", (time.perf_counter() - start) * 1000)
+            self.breaker.record_success()
+            return result
+
+        raise last_error
+
+    def _record(self, status: str, latency_ms: float) -> None:
+        """Ajoute une latence à l'histogramme du statut"""
+        with self._lock:
+            self.histograms.setdefault(status, LatencyHistogram()).record(latency_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne l'état du disjoncteur et les histogrammes par statut"""
+        with self._lock:
+            return {
+                "circuit_state": self.breaker.state,
+                "latency_by_status": {
+                    status: histogram.to_dict()
+                    for status, histogram in self.histograms.items()
+                }
+            }
+
+class HostedInferenceTransport:
+    """Transport HTTP avec session persistante vers le serveur d'inférence"""
+
+    def __init__(self, api_url: str, project: str, version: int,
+                 api_key: str, confidence: float, overlap: float,
+                 pool_size: int = 4):
+        self.url = f"{api_url.rstrip('/')}/{project}/{version}"
+        self.params = {
+            "api_key": api_key,
+            "confidence": confidence,
+            "overlap": overlap
+        }
+        # Import différé: requests n'est chargé que si l'inférence distante sert
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._requests = requests
+        
+        # Pool de connexions keep-alive dimensionné au niveau de concurrence
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
+        })
+
+    def __call__(self, image_bytes: bytes,
+                 timeout: float) -> List[Tuple[float, float, float]]:
+        """Envoie les octets JPEG et retourne les balles (x, y, confiance)"""
+        try:
+            response = self.session.post(
+                self.url,
+                params=self.params,
+                files={"file": ("frame.jpg", image_bytes, "image/jpeg")},
+                timeout=timeout
+            )
+        except self._requests.Timeout as e:
+            raise InferenceError(str(e), "timeout")
+        except self._requests.RequestException as e:
+            raise InferenceError(str(e), "connection_error")
+
+        if response.status_code != 200:
+            retryable = response.status_code >= 500 or response.status_code == 429
+            raise InferenceError(f"HTTP {response.status_code}",
+                                 f"http_{response.status_code}", retryable)
+        return decode_ball_predictions(response.content)
+
+    def close(self) -> None:
+        """Ferme les connexions du pool"""
+        self.session.close()
+
+def decode_ball_predictions(body: bytes) -> List[Tuple[float, float, float]]:
+    """Décode directement la réponse JSON en tuples (x, y, confiance) de balles"""
+    try:
+        predictions = json.loads(body).get("predictions", [])
+        return [
+            (float(p["x"]), float(p["y"]), float(p["confidence"]))
+            for p in predictions if p.get("class") == "ball"
+        ]
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise InferenceError(f"Réponse invalide: {e}", "invalid_response", False)
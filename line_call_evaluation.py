@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Évaluation des appels IN/OUT contre une vérité terrain
+======================================================
+
+Exécute le pipeline sous plusieurs configurations sur des vidéos annotées
+(rebonds et appels IN/OUT, par exemple produits par demo.SyntheticRally)
+et rapporte la précision des appels, l'erreur temporelle et l'erreur en
+pixels des rebonds à côté des FPS, pour choisir le réglage le plus rapide
+qui ne sacrifie pas d'appels corrects. Les appels évalués sont par défaut
+ceux de la passe hors ligne (vidéo enregistrée), ou ceux du pipeline en
+ligne avec --mode online; le gain de la passe hors ligne sur les appels
+en ligne est rapporté pour chaque réglage. Aucun réglage n'est recommandé si aucun ne
+produit d'appel correct.
+
+Exemples:
+    python line_call_evaluation.py --synthetic --duration 20
+    python line_call_evaluation.py --video match.mp4 --annotations match.json \\
+        --configs presets.json --output evaluation.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tennis_hawkeye import (
+    ConfigManager, CourtGeometry, BounceEvent, linear_sum_assignment
+)
+
+logger = logging.getLogger(__name__)
+
+# Réglages comparés par défaut (clés de configuration en notation pointée)
+DEFAULT_PRESETS = {
+    "fallback_full": {"detection.fallback_scale": 1.0,
+                      "detection.fallback_max_width": 0},
+    "fallback_downscaled": {"detection.fallback_scale": 1.0,
+                            "detection.fallback_max_width": 640},
+    "fallback_color": {"detection.fallback_scale": 1.0,
+                       "detection.fallback_max_width": 640,
+                       "detection.color_filter.enabled": True}
+}
+
+def make_offline_config(overrides: Dict[str, Any],
+                        base_path: str = "config.json") -> ConfigManager:
+    """Configuration sans appel réseau, avec surcharges en notation pointée"""
+    config = ConfigManager(base_path)
+    config.set('detection.backend', 'fallback')
+    config.set('roboflow.api_key', '')
+    for key, value in overrides.items():
+        config.set(key, value)
+    return config
+
+def run_pipeline(video_path: str, geometry: CourtGeometry,
+                 overrides: Dict[str, Any], base_config: str = "config.json"):
+    """Traite une vidéo avec une configuration donnée; retourne (système, durée)"""
+    from main_hawkeye import TennisHawkEyeSystem
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = make_offline_config(overrides, base_config)
+        config.config_path = str(Path(tmp) / "config.json")
+        config.save_config()
+
+        system = TennisHawkEyeSystem(config.config_path)
+        system.set_court_geometry(geometry)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            system.process_video(video_path, str(Path(tmp) / "output.mp4"))
+        return system, time.perf_counter() - start
+
+def match_bounces(predicted: List[BounceEvent], truth: List[Dict[str, Any]],
+                  max_dt: float) -> List[Tuple[int, int]]:
+    """Associe rebonds prédits et annotés (affectation optimale sur l'écart temporel)"""
+    if not predicted or not truth:
+        return []
+    predicted_t = np.array([e.timestamp for e in predicted])
+    truth_t = np.array([b["timestamp"] for b in truth])
+    dt = np.abs(predicted_t[:, None] - truth_t[None, :])
+    cost = np.where(dt <= max_dt, dt, 1e9)
+    rows, cols = linear_sum_assignment(cost)
+    valid = cost[rows, cols] < 1e9
+    return list(zip(rows[valid].tolist(), cols[valid].tolist()))
+
+def score_calls(predicted: List[BounceEvent], truth: List[Dict[str, Any]],
+                max_dt: float = 0.2) -> Dict[str, Any]:
+    """Précision des appels, rappel des rebonds et erreurs temporelle/pixel"""
+    pairs = match_bounces(predicted, truth, max_dt)
+    correct = sum(1 for p, t in pairs if predicted[p].call == truth[t]["call"])
+    timing = [abs(predicted[p].timestamp - truth[t]["timestamp"]) * 1000 for p, t in pairs]
+    pixels = [float(np.hypot(predicted[p].x - truth[t]["x"],
+                             predicted[p].y - truth[t]["y"])) for p, t in pairs]
+    return {
+        "truth_bounces": len(truth),
+        "predicted_bounces": len(predicted),
+        "matched_bounces": len(pairs),
+        "bounce_recall": len(pairs) / len(truth) if truth else 0.0,
+        "bounce_precision": len(pairs) / len(predicted) if predicted else 0.0,
+        # Un rebond manqué compte comme un appel faux
+        "call_accuracy": correct / len(truth) if truth else 0.0,
+        "matched_call_accuracy": correct / len(pairs) if pairs else 0.0,
+        "timing_error_ms": float(np.mean(timing)) if timing else None,
+        "pixel_error_mean": float(np.mean(pixels)) if pixels else None,
+        "pixel_error_p95": float(np.percentile(pixels, 95)) if pixels else None
+    }
+
+def call_events(system, mode: str) -> List[BounceEvent]:
+    """Appels d'un traitement: passe hors ligne ou pipeline en ligne"""
+    if mode == "offline":
+        return system.offline_events
+    return system.line_call_engine.bounce_events
+
+def evaluate(video_path: str, annotations: Dict[str, Any],
+             presets: Dict[str, Dict[str, Any]], max_dt: float = 0.2,
+             base_config: str = "config.json",
+             mode: str = "offline") -> List[Dict[str, Any]]:
+    """Évalue chaque réglage et retourne un rapport par réglage
+
+    Les deux jeux d'appels sont toujours scorés (`online`, `offline`) pour
+    mesurer le gain de la passe hors ligne; les métriques de premier niveau
+    sont celles du mode demandé.
+    """
+    geometry = CourtGeometry(**annotations["court"])
+    report = []
+    for name, overrides in presets.items():
+        logger.info(f"Évaluation du réglage {name}")
+        overrides = {**overrides, "offline_smoothing.enabled": True}
+        system, elapsed = run_pipeline(video_path, geometry, overrides, base_config)
+        frames = system.stats["total_frames"]
+        scores = {m: score_calls(call_events(system, m), annotations["bounces"], max_dt)
+                  for m in ("online", "offline")}
+        report.append({
+            "name": name,
+            "mode": mode,
+            "overrides": overrides,
+            "fps": frames / elapsed if elapsed > 0 else 0.0,
+            **scores[mode],
+            **scores
+        })
+    return report
+
+def choose_fastest(report: List[Dict[str, Any]],
+                   max_accuracy_loss: float = 0.0) -> Optional[Dict[str, Any]]:
+    """Réglage le plus rapide dont la précision reste proche de la meilleure
+
+    Aucun réglage n'est retenu si aucun ne retrouve de rebond ou ne produit
+    d'appel correct: le plus rapide ne serait alors qu'un réglage inutilisable.
+    """
+    if not report:
+        return None
+    best_accuracy = max(r["call_accuracy"] for r in report)
+    best_recall = max(r["bounce_recall"] for r in report)
+    if best_accuracy <= 0 or best_recall <= 0:
+        return None
+    eligible = [r for r in report
+                if r["call_accuracy"] >= best_accuracy - max_accuracy_loss]
+    return max(eligible, key=lambda r: r["fps"])
+
+def print_report(report: List[Dict[str, Any]],
+                 chosen: Optional[Dict[str, Any]]) -> None:
+    """Affiche le tableau comparatif des réglages"""
+    print("\n=== Évaluation des appels ===")
+    print(f"{'Réglage':<22}{'FPS':>8}{'Précision':>11}{'Rappel':>9}"
+          f"{'Δt (ms)':>10}{'Δpx':>8}")
+    for r in report:
+        timing = f"{r['timing_error_ms']:.0f}" if r['timing_error_ms'] is not None else "-"
+        pixels = f"{r['pixel_error_mean']:.1f}" if r['pixel_error_mean'] is not None else "-"
+        print(f"{r['name']:<22}{r['fps']:>8.1f}{r['call_accuracy']:>11.1%}"
+              f"{r['bounce_recall']:>9.1%}{timing:>10}{pixels:>8}")
+    print("\nGain de la passe hors ligne (en ligne -> hors ligne):")
+    for r in report:
+        online, offline = r["online"], r["offline"]
+        timing = " -> ".join(f"{m['timing_error_ms']:.0f}" if m['timing_error_ms'] is not None
+                             else "-" for m in (online, offline))
+        print(f"{r['name']:<22}précision {online['call_accuracy']:.1%} -> "
+              f"{offline['call_accuracy']:.1%}, Δt {timing} ms")
+    if chosen:
+        print(f"\nRéglage recommandé: {chosen['name']}")
+    elif report:
+        print("\nAucun réglage recommandé: aucun appel correct sur la vérité terrain")
+
+def main():
+    """Point d'entrée de l'outil d'évaluation"""
+    parser = argparse.ArgumentParser(description="Évaluation des appels IN/OUT")
+    parser.add_argument("--video", help="Vidéo à analyser")
+    parser.add_argument("--annotations", help="Vérité terrain JSON (rebonds, appels, terrain)")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="Génère une vidéo annotée avec demo.SyntheticRally")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--noise", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--configs", help="Réglages JSON {nom: {clé.pointée: valeur}}")
+    parser.add_argument("--base-config", default="config.json")
+    parser.add_argument("--max-dt", type=float, default=0.2,
+                        help="Écart temporel maximal (s) pour associer deux rebonds")
+    parser.add_argument("--max-accuracy-loss", type=float, default=0.0,
+                        help="Perte de précision tolérée pour le choix du réglage")
+    parser.add_argument("--mode", choices=["offline", "online"], default="offline",
+                        help="Appels évalués: passe hors ligne ou pipeline en ligne")
+    parser.add_argument("--output", default="", help="Rapport JSON")
+    args = parser.parse_args()
+
+    presets = DEFAULT_PRESETS
+    if args.configs:
+        with open(args.configs, 'r', encoding='utf-8') as f:
+            presets = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic:
+            from demo import create_rally_video
+            video_path = str(Path(tmp) / "rally.mp4")
+            annotations = create_rally_video(
+                video_path, width=args.width, height=args.height, fps=args.fps,
+                duration=args.duration, noise=args.noise, seed=args.seed
+            )
+        elif args.video and args.annotations:
+            video_path = args.video
+            with open(args.annotations, 'r', encoding='utf-8') as f:
+                annotations = json.load(f)
+        else:
+            parser.error("--synthetic ou --video et --annotations sont requis")
+
+        report = evaluate(video_path, annotations, presets, args.max_dt,
+                          args.base_config, args.mode)
+
+    chosen = choose_fastest(report, args.max_accuracy_loss)
+    print_report(report, chosen)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"report": report, "chosen": chosen and chosen["name"]}, f, indent=4)
+    if chosen is None:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
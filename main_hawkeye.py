@@ -7,11 +7,14 @@ Application complète de détection "in/out" pour le tennis.
 Combine tous les modules pour créer un système Hawk-Eye fonctionnel.
 """
 
+import time
+_STARTUP_T0 = time.perf_counter()
+
 import cv2
 import numpy as np
 import os
 import sys
-import time
+import argparse
 import logging
 from pathlib import Path
 from typing import List, Optional, Tuple
@@ -19,38 +22,99 @@ from typing import List, Optional, Tuple
 # Imports des modules locaux
 from tennis_hawkeye import (
     ConfigManager, BallTracker, CourtCalibrator, 
-    InOutDetector, BallDetection, CourtGeometry
+    InOutDetector, BallDetection, CourtGeometry, LineCallEngine,
+    MultiBallTracker, FrameBufferPool, BounceEvent, FrameClock
 )
 from ball_detector import HybridBallDetector
-from court_setup import InteractiveCourtSetup
+from court_setup import InteractiveCourtSetup, AutoCourtDetector
+from profiling import StageProfiler
+from frame_cache import FrameCache
+from challenge_review import ChallengeReviewer
+from checkpoint import CheckpointManager
+from event_store import EventStore
+from reference_frame import extract_reference_frame
+from overlay import OverlayRenderer
+from highlights import HighlightWriter
+from offline_smoothing import OfflineBounceDetector
+
+_IMPORTS_DONE = time.perf_counter()
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('tennis_hawkeye.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def configure_logging() -> None:
+    """Configure le logging de l'application (console + fichier)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('tennis_hawkeye.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+def print_startup_profile(init_seconds: float) -> None:
+    """Affiche le temps de démarrage et les modules lourds chargés"""
+    import_seconds = _IMPORTS_DONE - _STARTUP_T0
+    print("\n=== Profil de démarrage ===")
+    print(f"Imports: {import_seconds * 1000:.1f} ms")
+    print(f"Initialisation du système: {init_seconds * 1000:.1f} ms")
+    print(f"Total: {(import_seconds + init_seconds) * 1000:.1f} ms")
+    for module in ("roboflow", "requests", "pygame"):
+        state = "chargé" if module in sys.modules else "non chargé"
+        print(f"  {module}: {state}")
+
 class TennisHawkEyeSystem:
     """Système principal Tennis Hawk-Eye"""
     
     def __init__(self, config_path: str = "config.json"):
         self.config = ConfigManager(config_path)
-        self.ball_detector = HybridBallDetector(self.config)
+        self.frame_pool = FrameBufferPool()
+        self.ball_detector = HybridBallDetector(self.config, self.frame_pool)
         self.ball_tracker = BallTracker(self.config)
+        self.multi_tracker = MultiBallTracker(self.config)
         self.court_calibrator = CourtCalibrator(self.config)
         self.in_out_detector = None
+        self.line_call_engine = None
         self.court_geometry = None
+        # Calques de visualisation (terrain et légende pré-rendus)
+        self.overlay = OverlayRenderer(self.config)
         
         # Variables de traitement vidéo
         self.video_capture = None
         self.video_writer = None
+        self.highlight_writer = None
         self.frame_count = 0
-        self.fps = 30
+        self.fps = 30.0
+        self.frame_clock = FrameClock(self.fps)
+        # Dernières frames décodées, pour l'affinage d'un rebond à la frame précédente
+        self.recent_frames = {}
+        
+        # Instrumentation par étape
+        self.profiler = StageProfiler(
+            window=self.config.get('profiling.window', 1000),
+            enabled=self.config.get('profiling.enabled', False),
+            trace=bool(self.config.get('profiling.trace_path', ''))
+        )
+        self.cprofile = None
+        
+        # Cache disque des frames décodées pour les passes multiples
+        self.frame_cache = None
+        if self.config.get('frame_cache.enabled', False):
+            self.frame_cache = FrameCache(
+                self.config.get('frame_cache.directory', '.frame_cache'),
+                int(self.config.get('frame_cache.quota_gb', 20) * 1024 ** 3)
+            )
+        
+        # Base d'événements de match interrogeable
+        self.event_store = None
+        self.match_id = None
+        
+        # Flux complet des détections de la balle de jeu (piste, détection),
+        # pour les segments de piste et la passe hors ligne
+        self.rally_detections: List[Tuple[int, BallDetection]] = []
+        self.segment_start = 0
+        self.detections_saved = 0
+        self.offline_events: List[BounceEvent] = []
         
         # Statistiques
         self.stats = {
@@ -58,7 +122,10 @@ class TennisHawkEyeSystem:
             "balls_detected": 0,
             "in_calls": 0,
             "out_calls": 0,
-            "bounces_detected": 0
+            "bounces_detected": 0,
+            "track_switches": 0,
+            "buffer_allocations": 0,
+            "buffer_reuses": 0
         }
     
     def setup_court(self, reference_image_path: str) -> bool:
@@ -70,35 +137,81 @@ class TennisHawkEyeSystem:
         if existing_geometry and existing_geometry.is_valid():
             response = input("Configuration existante trouvée. Utiliser? (y/n): ")
             if response.lower() == 'y':
-                self.court_geometry = existing_geometry
-                self.in_out_detector = InOutDetector(self.court_geometry)
+                self.set_court_geometry(existing_geometry)
                 logger.info("Configuration existante chargée")
                 return True
         
         # Configuration interactive
         setup = InteractiveCourtSetup(self.config)
         if setup.setup_from_image(reference_image_path):
-            self.court_geometry = setup.get_court_geometry()
-            if self.court_geometry:
-                self.in_out_detector = InOutDetector(self.court_geometry)
+            geometry = setup.get_court_geometry()
+            if geometry:
+                self.set_court_geometry(geometry)
                 logger.info("Terrain configuré avec succès")
                 return True
         
         logger.error("Échec de la configuration du terrain")
         return False
     
+    def setup_court_from_video(self, video_path: str) -> bool:
+        """Configure le terrain sur une image de référence extraite de la vidéo"""
+        logger.info("Extraction de l'image de référence depuis la vidéo")
+        reference = extract_reference_frame(
+            video_path, self.config, self.config.get('reference.output_path', '')
+        )
+        if reference is None:
+            logger.error("Échec de l'extraction de l'image de référence")
+            return False
+        
+        # Détection automatique d'abord, configuration interactive sinon
+        geometry = AutoCourtDetector().detect_court_lines(reference)
+        if geometry is None:
+            setup = InteractiveCourtSetup(self.config)
+            if setup.setup_from_array(reference):
+                geometry = setup.get_court_geometry()
+        if geometry is None:
+            logger.error("Échec de la configuration du terrain")
+            return False
+        
+        self.set_court_geometry(geometry)
+        logger.info("Terrain configuré avec succès")
+        return True
+    
+    def set_court_geometry(self, geometry: CourtGeometry) -> None:
+        """Installe la géométrie du terrain et le moteur d'appels associé"""
+        self.court_geometry = geometry
+        self.in_out_detector = InOutDetector(geometry)
+        self.line_call_engine = LineCallEngine(self.config, self.in_out_detector)
+    
     def process_video(self, video_path: str, output_path: str, 
-                     max_duration: Optional[float] = None) -> bool:
-        """Traite une vidéo complète"""
+                     max_duration: Optional[float] = None,
+                     resume: bool = False) -> bool:
+        """Traite une vidéo complète, en reprenant au dernier point de reprise si demandé"""
+        checkpoint = None
+        highlights = self.config.get('highlights.enabled', False)
+        if highlights:
+            # Les séquences sont finalisées au fil de l'eau: pas de segments à reprendre
+            logger.info("Mode résumé: points de reprise désactivés")
+        elif resume or self.config.get('checkpoint.enabled', False):
+            checkpoint = CheckpointManager(output_path)
+        state = checkpoint.load() if (checkpoint and resume) else None
+        if resume and state is None:
+            logger.warning("Aucun point de reprise trouvé, traitement depuis le début")
         try:
-            # Ouverture de la vidéo
-            self.video_capture = cv2.VideoCapture(video_path)
+            # Ouverture de la vidéo (servie par le cache si activé)
+            if self.frame_cache:
+                self.video_capture = self.frame_cache.open_capture(video_path)
+            else:
+                self.video_capture = cv2.VideoCapture(video_path)
             if not self.video_capture.isOpened():
                 logger.error(f"Impossible d'ouvrir la vidéo: {video_path}")
                 return False
             
             # Propriétés de la vidéo
-            self.fps = int(self.video_capture.get(cv2.CAP_PROP_FPS))
+            # Cadence nominale non tronquée (29.97, 59.94...); les instants
+            # viennent des timestamps du conteneur (cadence variable)
+            self.fps = self.video_capture.get(cv2.CAP_PROP_FPS) or 30.0
+            self.frame_clock = FrameClock(self.fps)
             frame_width = int(self.video_capture.get(cv2.CAP_PROP_FRAME_WIDTH))
             frame_height = int(self.video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
             total_frames = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -108,40 +221,120 @@ class TennisHawkEyeSystem:
                 max_frames = int(max_duration * self.fps)
                 total_frames = min(total_frames, max_frames)
             
-            logger.info(f"Traitement vidéo: {total_frames} frames à {self.fps} FPS")
+            logger.info(f"Traitement vidéo: {total_frames} frames à {self.fps:g} FPS")
+            
+            # Reprise: restauration de l'état et accès direct à la frame sauvegardée
+            self.frame_count = 0
+            self.recent_frames.clear()
+            self.rally_detections = []
+            self.segment_start = 0
+            self.detections_saved = 0
+            self.offline_events = []
+            segments: List[str] = []
+            if state:
+                self._restore_state(state, checkpoint)
+                segments = list(state["segments"])
+                self.frame_count = state["frame_count"]
+                self._warm_up_detector(frame_width, frame_height)
+                logger.info(f"Reprise à la frame {self.frame_count}/{total_frames}")
+            elif checkpoint:
+                checkpoint.clear()
+            self._start_match(video_path, state)
+            interval = max(int(self.config.get('checkpoint.interval_seconds', 60) * self.fps), 1)
             
-            # Configuration du writer de sortie
+            # Configuration du writer de sortie: séquences autour des rebonds en
+            # mode résumé, sinon vidéo complète (segment courant si points de reprise)
             fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            self.video_writer = cv2.VideoWriter(
-                output_path, fourcc, self.fps, (frame_width, frame_height)
-            )
+            segment_path = checkpoint.segment_path(len(segments)) if checkpoint else output_path
+            if highlights:
+                self.highlight_writer = HighlightWriter(
+                    output_path, self.fps, (frame_width, frame_height),
+                    self.config.get('highlights.pre_roll_seconds', 2.0),
+                    self.config.get('highlights.post_roll_seconds', 2.0),
+                    video_path=video_path,
+                    jpeg_quality=self.config.get('highlights.jpeg_quality', 90),
+                    max_ring_mb=self.config.get('highlights.max_ring_mb', 256)
+                )
+                raw_highlights = self.config.get('highlights.source', 'rendered') == 'raw'
+            else:
+                self.video_writer = cv2.VideoWriter(
+                    segment_path, fourcc, self.fps, (frame_width, frame_height)
+                )
             
             # Traitement frame par frame
-            self.frame_count = 0
+            start_frame = self.frame_count
             start_time = time.time()
             
             while self.frame_count < total_frames:
-                ret, frame = self.video_capture.read()
+                # Décodage directement dans un buffer du pool (deux buffers
+                # alternés: la frame précédente reste valide pour l'affinage)
+                with self.profiler.span("decode"):
+                    decode_buffer = self.frame_pool.get(
+                        f"decode_{self.frame_count % 2}", (frame_height, frame_width, 3)
+                    )
+                    ret, frame = self.video_capture.read(image=decode_buffer)
                 if not ret:
                     break
                 
                 # Traitement de la frame
+                if self.cprofile:
+                    self.cprofile.enable()
                 processed_frame = self._process_frame(frame)
+                if self.cprofile:
+                    self.cprofile.disable()
                 
                 # Écriture de la frame traitée
-                self.video_writer.write(processed_frame)
+                with self.profiler.span("encode"):
+                    if self.highlight_writer:
+                        self.highlight_writer.write(
+                            frame if raw_highlights else processed_frame, self.frame_count,
+                            self.frame_clock.last
+                        )
+                    else:
+                        self.video_writer.write(processed_frame)
                 
                 # Affichage du progrès
                 if self.frame_count % 30 == 0:
                     progress = (self.frame_count / total_frames) * 100
                     elapsed = time.time() - start_time
-                    eta = (elapsed / (self.frame_count + 1)) * (total_frames - self.frame_count)
+                    done = self.frame_count - start_frame
+                    eta = (elapsed / (done + 1)) * (total_frames - self.frame_count)
                     logger.info(f"Progrès: {progress:.1f}% - ETA: {eta:.1f}s")
                 
                 self.frame_count += 1
+                
+                # Segment finalisé puis point de reprise à chaque intervalle
+                if (checkpoint and self.frame_count % interval == 0 and
+                        self.frame_count < total_frames):
+                    self.video_writer.release()
+                    segments.append(segment_path)
+                    if self.event_store:
+                        self.event_store.flush()
+                    checkpoint.save(self._checkpoint_state(
+                        checkpoint, video_path, output_path, max_duration, segments
+                    ))
+                    segment_path = checkpoint.segment_path(len(segments))
+                    self.video_writer = cv2.VideoWriter(
+                        segment_path, fourcc, self.fps, (frame_width, frame_height)
+                    )
             
             # Finalisation
+            pool_stats = self.frame_pool.get_stats()
+            self.stats["buffer_allocations"] = pool_stats["allocations"]
+            self.stats["buffer_reuses"] = pool_stats["reuses"]
+            if self.highlight_writer:
+                self.stats["highlight_clips"] = len(self.highlight_writer.clips)
+                self.stats["highlight_frames"] = self.highlight_writer.frames_written
+            self._offline_line_calls()
+            self._finish_match()
             self._cleanup_video_processing()
+            if checkpoint:
+                segments.append(segment_path)
+                if not checkpoint.concatenate(segments, self.fps):
+                    logger.error("Échec de l'assemblage des segments de sortie")
+                    return False
+                checkpoint.clear()
+            self._write_profiles(output_path)
             self._print_statistics()
             
             logger.info(f"Traitement terminé: {output_path}")
@@ -150,118 +343,303 @@ class TennisHawkEyeSystem:
         except Exception as e:
             logger.error(f"Erreur lors du traitement vidéo: {e}")
             self._cleanup_video_processing()
+            if checkpoint and checkpoint.checkpoint_path.exists():
+                logger.info("Traitement reprenable avec --resume")
             return False
     
-    def _process_frame(self, frame: np.ndarray) -> np.ndarray:
-        """Traite une frame individuelle"""
-        processed_frame = frame.copy()
-        timestamp = self.frame_count / self.fps
-        
-        # Détection des balles
-        detections = self.ball_detector.detect_balls_in_frame(
-            frame, self.frame_count, timestamp
+    def resume_video(self, output_path: str) -> bool:
+        """Reprend le traitement interrompu d'une sortie depuis son point de reprise"""
+        state = CheckpointManager(output_path).load()
+        if state is None:
+            logger.error(f"Aucun point de reprise pour {output_path}")
+            return False
+        self.set_court_geometry(CourtGeometry(**state["court"]))
+        return self.process_video(state["video_path"], output_path,
+                                  state["max_duration"], resume=True)
+    
+    def _warm_up_detector(self, frame_width: int, frame_height: int) -> None:
+        """Reprise: modèle d'arrière-plan réchauffé sur les frames précédentes
+
+        Les frames de `checkpoint.warmup_seconds` avant le point de reprise
+        sont décodées et passées au seul détecteur de secours (ni suivi, ni
+        appels, ni sortie), comme le fait la revue de challenge: sans cela,
+        le détecteur repart d'un modèle vide et manque les premières balles.
+        """
+        warmup = int(round(self.config.get('checkpoint.warmup_seconds', 20.0) * self.fps))
+        first = max(self.frame_count - warmup, 0)
+        self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, first)
+        for frame_number in range(first, self.frame_count):
+            decode_buffer = self.frame_pool.get(
+                f"decode_{frame_number % 2}", (frame_height, frame_width, 3)
+            )
+            ret, frame = self.video_capture.read(image=decode_buffer)
+            if not ret:
+                self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, self.frame_count)
+                return
+            timestamp = self.frame_clock.timestamp(self.video_capture, frame_number)
+            self.ball_detector.fallback_detector.detect_balls_in_frame(
+                frame, frame_number, timestamp
+            )
+            # Frames voisines disponibles pour l'affinage des premiers rebonds
+            self.recent_frames.pop(frame_number - 2, None)
+            self.recent_frames[frame_number] = frame
+        logger.info(f"Détecteur réchauffé sur {self.frame_count - first} frames")
+    
+    def _checkpoint_state(self, checkpoint: CheckpointManager,
+                          video_path: str, output_path: str,
+                          max_duration: Optional[float],
+                          segments: List[str]) -> dict:
+        """État nécessaire pour reprendre le traitement à la frame courante"""
+        # Seules les détections reçues depuis le dernier point sont écrites
+        detections_size = checkpoint.append_detections(
+            self.rally_detections[self.detections_saved:]
         )
+        self.detections_saved = len(self.rally_detections)
+        geometry = self.court_geometry
+        return {
+            "video_path": video_path,
+            "output_path": output_path,
+            "max_duration": max_duration,
+            "frame_count": self.frame_count,
+            "segments": list(segments),
+            "stats": dict(self.stats),
+            "court": {
+                "court_corners": geometry.court_corners,
+                "service_box_corners": geometry.service_box_corners,
+                "baseline_corners": geometry.baseline_corners
+            } if geometry else None,
+            "ball_tracker": {
+                "detections": self.ball_tracker.detections,
+                "trajectory": self.ball_tracker.trajectory,
+                "last_position": self.ball_tracker.last_position,
+                "velocity": self.ball_tracker.velocity
+            },
+            "multi_tracker": {
+                "tracks": self.multi_tracker.tracks,
+                "active_track_id": self.multi_tracker.active_track_id,
+                "next_id": self.multi_tracker._next_id
+            },
+            "line_calls": {
+                "bounce_events": self.line_call_engine.bounce_events,
+                "last_call": self.line_call_engine.last_call
+            } if self.line_call_engine else None,
+            "detector": {
+                "is_tracking": self.ball_detector.is_tracking,
+                "hsv_lower": self.ball_detector.fallback_detector.hsv_lower,
+                "hsv_upper": self.ball_detector.fallback_detector.hsv_upper
+            },
+            "match_id": self.match_id,
+            "detections_size": detections_size,
+            "segment_start": self.segment_start
+        }
+    
+    def _restore_state(self, state: dict, checkpoint: CheckpointManager) -> None:
+        """Restaure trackers, appels et statistiques depuis un point de reprise"""
+        self.stats.update(state["stats"])
+        if state["court"] and self.court_geometry is None:
+            self.set_court_geometry(CourtGeometry(**state["court"]))
         
-        # Mise à jour des statistiques
-        self.stats["total_frames"] += 1
-        if detections:
-            self.stats["balls_detected"] += len(detections)
+        tracker = state["ball_tracker"]
+        self.ball_tracker.detections = tracker["detections"]
+        self.ball_tracker.trajectory = tracker["trajectory"]
+        self.ball_tracker.last_position = tracker["last_position"]
+        self.ball_tracker.velocity = tracker["velocity"]
         
-        # Traitement de chaque détection
-        for detection in detections:
-            # Ajout au tracker
-            if self.ball_tracker.add_detection(detection):
-                # Vérification du rebond
-                if self.ball_tracker.detect_bounce():
-                    self.stats["bounces_detected"] += 1
-                    logger.info(f"Rebond détecté à la frame {self.frame_count}")
-                
-                # Détermination IN/OUT
-                if self.in_out_detector:
-                    position = (detection.x, detection.y)
-                    call = self.in_out_detector.is_ball_in_court(position)
-                    
-                    if call == "IN":
-                        self.stats["in_calls"] += 1
-                    elif call == "OUT":
-                        self.stats["out_calls"] += 1
-                    
-                    # Visualisation
-                    processed_frame = self._draw_detection(
-                        processed_frame, detection, call
-                    )
+        multi = state["multi_tracker"]
+        self.multi_tracker.tracks = multi["tracks"]
+        self.multi_tracker.active_track_id = multi["active_track_id"]
+        self.multi_tracker._next_id = multi["next_id"]
         
-        # Dessin du terrain
-        if self.court_geometry:
-            processed_frame = self._draw_court(processed_frame)
+        if state["line_calls"] and self.line_call_engine:
+            self.line_call_engine.bounce_events = state["line_calls"]["bounce_events"]
+            self.line_call_engine.last_call = state["line_calls"]["last_call"]
         
-        # Dessin de la trajectoire
-        processed_frame = self._draw_trajectory(processed_frame)
+        detector = state["detector"]
+        self.ball_detector.is_tracking = detector["is_tracking"]
+        self.ball_detector.fallback_detector.hsv_lower = detector["hsv_lower"]
+        self.ball_detector.fallback_detector.hsv_upper = detector["hsv_upper"]
         
-        return processed_frame
+        self.match_id = state.get("match_id")
+        self.rally_detections = checkpoint.load_detections(state["detections_size"])
+        self.detections_saved = len(self.rally_detections)
+        self.segment_start = state.get("segment_start", 0)
     
-    def _draw_detection(self, frame: np.ndarray, 
-                       detection: BallDetection, call: str) -> np.ndarray:
-        """Dessine une détection de balle sur la frame"""
-        x, y = int(detection.x), int(detection.y)
-        
-        # Couleur selon le call
-        colors = self.config.get('visualization.colors', {})
-        if call == "IN":
-            color = colors.get('ball_in', [0, 255, 0])
-        elif call == "OUT":
-            color = colors.get('ball_out', [0, 0, 255])
-        else:
-            color = [255, 255, 255]
-        
-        # Dessin du cercle et du label
-        cv2.circle(frame, (x, y), 10, color, 2)
-        
-        # Label avec call et confiance
-        label = f"{call} ({detection.confidence:.2f})"
-        cv2.putText(frame, label, (x + 15, y - 15),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    def _start_match(self, video_path: str, state: Optional[dict]) -> None:
+        """Ouvre le match dans la base d'événements (ou le reprend après un point de reprise)
+
+        La base (et son thread d'écriture) est ouverte pour la durée d'un
+        traitement et fermée au nettoyage.
+        """
+        if not self.config.get('event_store.enabled', False):
+            return
+        self.event_store = EventStore(
+            self.config.get('event_store.path', 'match_events.db'),
+            self.config.get('event_store.batch_size', 256),
+            self.config.get('event_store.flush_interval_seconds', 1.0)
+        )
+        if state and self.match_id is not None:
+            # Les événements écrits après le point de reprise seront rejoués
+            self.event_store.truncate_match(self.match_id, self.frame_count)
+            return
+        self.match_id = self.event_store.start_match(
+            name=self.config.get('event_store.match_name', '') or Path(video_path).stem,
+            video_path=str(Path(video_path).resolve()),
+            season=str(self.config.get('event_store.season', '')),
+            played_at=str(self.config.get('event_store.played_at', ''))
+        )
+    
+    def _finish_match(self) -> None:
+        """Enregistre le dernier segment de piste et les statistiques du match"""
+        if self.event_store is None or self.match_id is None:
+            return
+        self._record_track_segment()
+        self.event_store.set_stats(self.match_id, self.stats)
+        self.event_store.flush()
+    
+    def _record_track_segment(self) -> None:
+        """Enregistre le segment de la piste de jeu courante"""
+        segment = self.rally_detections[self.segment_start:]
+        if self.event_store and self.match_id is not None and segment:
+            self.event_store.add_track_segment(
+                self.match_id, segment[0][0],
+                [(d.frame_number, d.timestamp, d.x, d.y) for _, d in segment]
+            )
+        self.segment_start = len(self.rally_detections)
+    
+    def _read_frame(self, frame_number: int) -> Optional[np.ndarray]:
+        """Relit une image de la vidéo source, ou None si elle est illisible"""
+        if self.video_capture is None:
+            return None
+        self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        ret, frame = self.video_capture.read()
+        return frame if ret else None
+
+    def _offline_line_calls(self) -> None:
+        """Rebonds et appels recalculés sur les trajectoires lissées du flux complet"""
+        if (not self.config.get('offline_smoothing.enabled', True) or
+                self.in_out_detector is None or not self.rally_detections):
+            return
+        track_ids, detections = zip(*self.rally_detections)
+        engine = LineCallEngine(self.config, self.in_out_detector)
+        for position, detection in OfflineBounceDetector(self.config).detect(detections,
+                                                                             track_ids):
+            # Image du rebond relue dans la vidéo (ou le cache de trames)
+            # uniquement pour les appels serrés à affiner
+            frame = None
+            if engine.needs_refinement(position, detection):
+                frame = self._read_frame(detection.frame_number)
+            engine.evaluate_bounce(position, detection.timestamp, detection.frame_number,
+                                   frame=frame, detection=detection)
+        self.offline_events = list(engine.bounce_events)
         
-        return frame
+        self.stats["offline_bounces"] = len(self.offline_events)
+        self.stats["offline_in_calls"] = sum(e.call == "IN" for e in self.offline_events)
+        self.stats["offline_out_calls"] = sum(e.call == "OUT" for e in self.offline_events)
+        if self.event_store and self.match_id is not None:
+            for event in self.offline_events:
+                self.event_store.add_bounce(self.match_id, event, source="offline")
+        logger.info(f"Passe hors ligne: {len(self.offline_events)} rebond(s) "
+                    f"sur trajectoires lissées")
     
-    def _draw_court(self, frame: np.ndarray) -> np.ndarray:
-        """Dessine les lignes du terrain"""
-        if not self.court_geometry:
-            return frame
+    def review_challenge(self, video_path: str, target, output_path: str = ""):
+        """Ré-analyse un rebond contesté (BounceEvent ou numéro de frame)"""
+        if self.court_geometry is None:
+            logger.error("Terrain non configuré pour la revue")
+            return None
+        reviewer = ChallengeReviewer(self.config, self.court_geometry, self.frame_cache)
+        return reviewer.review(video_path, target, output_path)
+    
+    def _process_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Traite une frame individuelle"""
+        # Dessin en place dans un buffer de sortie réutilisé
+        processed_frame = self.frame_pool.get("output", frame.shape, frame.dtype)
+        np.copyto(processed_frame, frame)
+        timestamp = self.frame_clock.timestamp(self.video_capture, self.frame_count)
+        self.recent_frames.pop(self.frame_count - 2, None)
+        self.recent_frames[self.frame_count] = frame
         
-        colors = self.config.get('visualization.colors', {})
-        thickness = self.config.get('visualization.line_thickness', 2)
+        # Détection des balles
+        with self.profiler.span("inference"):
+            detections = self.ball_detector.detect_balls_in_frame(
+                frame, self.frame_count, timestamp
+            )
         
-        # Limites du terrain
-        court_color = colors.get('court_boundary', [0, 255, 0])
-        points = np.array(self.court_geometry.court_corners, np.int32)
-        cv2.polylines(frame, [points], True, court_color, thickness)
+        # Mise à jour des statistiques
+        self.stats["total_frames"] += 1
+        if detections:
+            self.stats["balls_detected"] += len(detections)
         
-        # Zone de service
-        service_color = colors.get('service_area', [0, 0, 255])
-        points = np.array(self.court_geometry.service_box_corners, np.int32)
-        cv2.polylines(frame, [points], True, service_color, thickness)
+        # Sélection de la balle de jeu parmi les pistes candidates
+        with self.profiler.span("tracking"):
+            previous_track_id = self.multi_tracker.active_track_id
+            rally_detection = self.multi_tracker.update(detections, self.frame_count)
+            if self.multi_tracker.active_track_id != previous_track_id:
+                self._record_track_segment()
+                self.ball_tracker.clear_trajectory()
+                if self.multi_tracker.active_track_id is not None:
+                    self.stats["track_switches"] += 1
+            self.ball_detector.notify_tracking(rally_detection is not None)
+            if rally_detection:
+                self.ball_detector.learn_ball_color(frame, rally_detection)
+                self.rally_detections.append(
+                    (self.multi_tracker.active_track_id, rally_detection)
+                )
+            
+            # Ajout de la balle de jeu au tracker (déjà associée à sa piste)
+            tracked = (rally_detection is not None and
+                       self.ball_tracker.add_detection(rally_detection, associated=True))
+            bounce = tracked and self.ball_tracker.detect_bounce()
         
-        return frame
-    
-    def _draw_trajectory(self, frame: np.ndarray) -> np.ndarray:
-        """Dessine la trajectoire de la balle"""
-        if not self.config.get('visualization.show_trajectory', True):
-            return frame
+        # L'appel IN/OUT n'est évalué qu'au point de rebond
+        if bounce:
+            with self.profiler.span("classification"):
+                self._handle_bounce()
         
-        trajectory = self.ball_tracker.trajectory
-        if len(trajectory) < 2:
-            return frame
+        with self.profiler.span("drawing"):
+            # Calques statiques en cache, puis balle, trajectoire et dernier appel
+            last_call = self.line_call_engine.last_call if self.line_call_engine else None
+            processed_frame = self.overlay.render(
+                processed_frame, self.court_geometry,
+                rally_detection if (tracked and self.line_call_engine) else None,
+                last_call.call if last_call else "UNKNOWN",
+                self.ball_tracker.trajectory, last_call
+            )
         
-        color = self.config.get('visualization.colors.trajectory', [255, 255, 0])
+        return processed_frame
+    
+    def _handle_bounce(self) -> None:
+        """Évalue l'appel IN/OUT au point de rebond détecté"""
+        bounce = self.ball_tracker.get_bounce_point()
+        if bounce is None:
+            return
+        if self.line_call_engine is None:
+            self.stats["bounces_detected"] += 1
+            return
         
-        # Dessin de la trajectoire
-        for i in range(1, len(trajectory)):
-            pt1 = (int(trajectory[i-1][0]), int(trajectory[i-1][1]))
-            pt2 = (int(trajectory[i][0]), int(trajectory[i][1]))
-            cv2.line(frame, pt1, pt2, color, 1)
+        position, detection = bounce
+        event = self.line_call_engine.evaluate_bounce(
+            position, detection.timestamp, detection.frame_number,
+            frame=self.recent_frames.get(detection.frame_number),
+            detection=detection
+        )
+        if event is None:
+            return
         
-        return frame
+        self.stats["bounces_detected"] += 1
+        if self.event_store and self.match_id is not None:
+            self.event_store.add_bounce(self.match_id, event)
+        if self.highlight_writer:
+            self.highlight_writer.trigger(event)
+        if event.call == "IN":
+            self.stats["in_calls"] += 1
+        elif event.call == "OUT":
+            self.stats["out_calls"] += 1
+        if event.refined:
+            logger.info(f"Rebond à la frame {event.frame_number}: {event.call} "
+                        f"(ligne à {event.line_distance:.2f} ± {event.uncertainty:.2f}px)")
+        else:
+            logger.info(f"Rebond à la frame {event.frame_number}: {event.call} "
+                        f"(ligne à {event.line_distance:.1f}px)")
     
     def _cleanup_video_processing(self) -> None:
         """Nettoie les ressources de traitement vidéo"""
@@ -269,8 +647,34 @@ class TennisHawkEyeSystem:
             self.video_capture.release()
         if self.video_writer:
             self.video_writer.release()
+        if self.highlight_writer:
+            self.highlight_writer.close()
+            self.highlight_writer = None
+        if self.event_store:
+            # Écritures en file validées, thread d'écriture et connexion fermés
+            self.event_store.close()
+            self.event_store = None
         self.ball_detector.cleanup()
     
+    def _write_profiles(self, output_path: str) -> None:
+        """Écrit le résumé des étapes, la trace Chrome et le profil cProfile"""
+        try:
+            if self.profiler.enabled:
+                summary_path = (self.config.get('profiling.summary_path', '') or
+                                f"{output_path}.profile.json")
+                self.profiler.write_summary(summary_path)
+            trace_path = self.config.get('profiling.trace_path', '')
+            if trace_path:
+                self.profiler.write_chrome_trace(trace_path)
+            if self.cprofile:
+                import pstats
+                cprofile_path = f"{output_path}.cprofile"
+                self.cprofile.dump_stats(cprofile_path)
+                pstats.Stats(self.cprofile).sort_stats("cumulative").print_stats(20)
+                logger.info(f"Profil cProfile écrit: {cprofile_path}")
+        except OSError as e:
+            logger.warning(f"Impossible d'écrire les profils: {e}")
+    
     def _print_statistics(self) -> None:
         """Affiche les statistiques de traitement"""
         print("\n=== Statistiques de traitement ===")
@@ -279,6 +683,28 @@ class TennisHawkEyeSystem:
         print(f"Appels IN: {self.stats['in_calls']}")
         print(f"Appels OUT: {self.stats['out_calls']}")
         print(f"Rebonds détectés: {self.stats['bounces_detected']}")
+        print(f"Changements de piste: {self.stats['track_switches']}")
+        if "offline_bounces" in self.stats:
+            print(f"Rebonds hors ligne: {self.stats['offline_bounces']} "
+                  f"(IN {self.stats['offline_in_calls']}, "
+                  f"OUT {self.stats['offline_out_calls']})")
+        if "highlight_clips" in self.stats:
+            print(f"Séquences résumé: {self.stats['highlight_clips']} "
+                  f"({self.stats['highlight_frames']} frames encodées)")
+        health = self.ball_detector.get_health_stats()
+        print(f"Appels Roboflow: {health['primary']['calls']} "
+              f"({health['escalations']} escalades, "
+              f"{health['primary']['mean_latency_ms']:.1f} ms en moyenne)")
+        print(f"Allocations de buffers: {self.stats['buffer_allocations']} "
+              f"({self.stats['buffer_reuses']} réutilisations)")
+        
+        stage_summary = self.profiler.get_summary()
+        if stage_summary:
+            print("\n=== Temps par étape (ms) ===")
+            for stage, values in stage_summary.items():
+                print(f"{stage:<15} p50={values['p50_ms']:.2f} "
+                      f"p95={values['p95_ms']:.2f} p99={values['p99_ms']:.2f} "
+                      f"total={values['total_ms']:.0f}")
         
         if self.stats['total_frames'] > 0:
             detection_rate = (self.stats['balls_detected'] / self.stats['total_frames']) * 100
@@ -286,26 +712,79 @@ class TennisHawkEyeSystem:
 
 def main():
     """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Tennis Hawk-Eye System v2.0")
+    parser.add_argument("--config", default="config.json",
+                        help="Chemin du fichier de configuration")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Affiche le temps de démarrage et les modules chargés")
+    parser.add_argument("--profile-stages", action="store_true",
+                        help="Chronomètre les étapes et écrit <sortie>.profile.json")
+    parser.add_argument("--profile", action="store_true",
+                        help="Active cProfile autour du traitement de chaque frame")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reprend un traitement interrompu depuis son point de reprise")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="Écrit des points de reprise pendant le traitement")
+    parser.add_argument("--trace", default="",
+                        help="Exporte les étapes au format Chrome trace dans ce fichier")
+    args = parser.parse_args()
+    
+    configure_logging()
     print("Tennis Hawk-Eye System v2.0")
     print("============================")
     
     # Initialisation du système
-    system = TennisHawkEyeSystem()
+    init_start = time.perf_counter()
+    system = TennisHawkEyeSystem(args.config)
+    if args.profile_startup:
+        print_startup_profile(time.perf_counter() - init_start)
+    if args.checkpoint:
+        system.config.set('checkpoint.enabled', True)
+    if args.profile_stages or args.trace:
+        system.config.set('profiling.enabled', True)
+        system.profiler.enabled = True
+    if args.trace:
+        system.config.set('profiling.trace_path', args.trace)
+        system.profiler.trace = True
+    if args.profile:
+        import cProfile
+        system.cprofile = cProfile.Profile()
+    
+    # Reprise d'un traitement interrompu (terrain et vidéo lus dans le point de reprise)
+    if args.resume:
+        output_path = input("Sortie à reprendre (défaut: output_hawkeye.mp4): ").strip()
+        output_path = output_path or "output_hawkeye.mp4"
+        if system.resume_video(output_path):
+            print(f"\n✓ Analyse terminée: {output_path}")
+        else:
+            print("\n✗ Échec de la reprise")
+        return
     
     # Configuration interactive
     print("\n1. Configuration du terrain")
-    reference_image = input("Chemin vers l'image de référence: ").strip()
+    reference_image = input("Chemin vers l'image de référence "
+                            "(vide: extraite de la vidéo): ").strip()
     
-    if not reference_image or not Path(reference_image).exists():
-        print("Image de référence non trouvée")
-        return
+    video_path = ""
+    if reference_image:
+        if not Path(reference_image).exists():
+            print("Image de référence non trouvée")
+            return
+        configured = system.setup_court(reference_image)
+    else:
+        video_path = input("Chemin vers la vidéo à analyser: ").strip()
+        if not video_path or not Path(video_path).exists():
+            print("Vidéo non trouvée")
+            return
+        configured = system.setup_court_from_video(video_path)
     
-    if not system.setup_court(reference_image):
+    if not configured:
         print("Échec de la configuration du terrain")
         return
     
     print("\n2. Traitement de la vidéo")
-    video_path = input("Chemin vers la vidéo à analyser: ").strip()
+    if not video_path:
+        video_path = input("Chemin vers la vidéo à analyser: ").strip()
     
     if not video_path or not Path(video_path).exists():
         print("Vidéo non trouvée")
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Fusion multi-caméras et triangulation 3D
+========================================
+
+Plusieurs caméras synchronisées filment le même terrain. Chaque caméra est
+calibrée contre un modèle de terrain commun (coordonnées en mètres, Z vers
+le haut), ses détections sont produites dans un processus dédié, alignées
+dans le temps puis triangulées par DLT vectorisée. Les rebonds sont détectés
+sur la hauteur réelle de la balle et appelés dans le plan du terrain.
+
+Exemple:
+    python multi_camera.py --config config.json --output events.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from tennis_hawkeye import (
+    ConfigManager, CourtGeometry, InOutDetector, BounceEvent, MultiBallTracker, FrameClock
+)
+
+logger = logging.getLogger(__name__)
+
+# Terrain de simple (mètres), origine au centre du filet, Y le long du terrain
+SINGLES_COURT_CORNERS = [(-4.115, -11.885), (4.115, -11.885),
+                         (4.115, 11.885), (-4.115, 11.885)]
+
+@dataclass
+class CameraCalibration:
+    """Calibration d'une caméra contre le modèle de terrain commun"""
+    name: str
+    camera_matrix: np.ndarray
+    rvec: np.ndarray
+    tvec: np.ndarray
+
+    @property
+    def projection(self) -> np.ndarray:
+        """Matrice de projection 3x4 P = K [R | t]"""
+        rotation, _ = cv2.Rodrigues(self.rvec)
+        return self.camera_matrix @ np.hstack([rotation, self.tvec.reshape(3, 1)])
+
+    def project(self, points: np.ndarray) -> np.ndarray:
+        """Projette des points 3D (N, 3) dans l'image (N, 2)"""
+        homogeneous = np.hstack([points, np.ones((len(points), 1))]) @ self.projection.T
+        return homogeneous[:, :2] / homogeneous[:, 2:3]
+
+def estimate_focal_length(homography: np.ndarray,
+                          principal_point: Tuple[float, float]) -> Optional[float]:
+    """Focale déduite d'une homographie plan du terrain -> image (pixels carrés)"""
+    shift = np.array([[1, 0, principal_point[0]],
+                      [0, 1, principal_point[1]],
+                      [0, 0, 1]], dtype=np.float64)
+    h = np.linalg.inv(shift) @ homography
+    estimates = []
+    # Colonnes de rotation orthogonales, puis de même norme
+    denominator = h[2, 0] * h[2, 1]
+    if abs(denominator) > 1e-12:
+        estimates.append(-(h[0, 0] * h[0, 1] + h[1, 0] * h[1, 1]) / denominator)
+    denominator = h[2, 0] ** 2 - h[2, 1] ** 2
+    if abs(denominator) > 1e-12:
+        estimates.append((h[0, 1] ** 2 + h[1, 1] ** 2 - h[0, 0] ** 2 - h[1, 0] ** 2)
+                         / denominator)
+    valid = [np.sqrt(f2) for f2 in estimates if f2 > 0]
+    return float(valid[0]) if valid else None
+
+def calibrate_camera(name: str, image_points: List[Tuple[float, float]],
+                     world_points: List[Tuple[float, float, float]],
+                     image_size: Tuple[int, int],
+                     focal_length: Optional[float] = None) -> Optional[CameraCalibration]:
+    """Calibre une caméra à partir de points du terrain (au moins 4 au sol)"""
+    image = np.asarray(image_points, dtype=np.float64)
+    world = np.asarray(world_points, dtype=np.float64)
+    if len(image) < 4 or len(image) != len(world):
+        logger.error(f"Caméra {name}: au moins 4 correspondances sont nécessaires")
+        return None
+
+    principal_point = (image_size[0] / 2, image_size[1] / 2)
+    if focal_length is None:
+        ground = np.abs(world[:, 2]) < 1e-9
+        homography, _ = cv2.findHomography(world[ground, :2], image[ground])
+        if homography is not None:
+            focal_length = estimate_focal_length(homography, principal_point)
+    if focal_length is None:
+        logger.warning(f"Caméra {name}: focale indéterminée, largeur d'image utilisée")
+        focal_length = float(image_size[0])
+
+    camera_matrix = np.array([[focal_length, 0, principal_point[0]],
+                              [0, focal_length, principal_point[1]],
+                              [0, 0, 1]], dtype=np.float64)
+    ok, rvec, tvec = cv2.solvePnP(world, image, camera_matrix, None,
+                                  flags=cv2.SOLVEPNP_ITERATIVE)
+    if not ok:
+        logger.error(f"Caméra {name}: échec de l'estimation de pose")
+        return None
+    return CameraCalibration(name, camera_matrix, rvec.ravel(), tvec.ravel())
+
+def triangulate(projections: np.ndarray,
+                points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """DLT vectorisée: projections (C, 3, 4), points (N, C, 2) avec NaN si absent
+
+    Retourne les positions 3D (N, 3) et un masque des échantillons vus par au
+    moins deux caméras.
+    """
+    seen = ~np.isnan(points).any(axis=2)
+    xy = np.nan_to_num(points)
+    rows_x = xy[..., 0, None] * projections[None, :, 2, :] - projections[None, :, 0, :]
+    rows_y = xy[..., 1, None] * projections[None, :, 2, :] - projections[None, :, 1, :]
+    system = np.concatenate([rows_x, rows_y], axis=1)
+    system *= np.concatenate([seen, seen], axis=1)[..., None]
+
+    # Lignes normalisées pour le conditionnement du système
+    norms = np.linalg.norm(system, axis=2, keepdims=True)
+    system /= np.where(norms > 0, norms, 1.0)
+
+    _, _, vh = np.linalg.svd(system)
+    homogeneous = vh[:, -1, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        positions = homogeneous[:, :3] / homogeneous[:, 3:4]
+    valid = (seen.sum(axis=1) >= 2) & np.isfinite(positions).all(axis=1)
+    return positions, valid
+
+def align_streams(streams: List[np.ndarray], offsets: List[float],
+                  times: np.ndarray, max_gap: float) -> np.ndarray:
+    """Rééchantillonne chaque flux (t, x, y) aux instants communs: (N, C, 2)"""
+    aligned = np.full((len(times), len(streams), 2), np.nan)
+    for camera, (stream, offset) in enumerate(zip(streams, offsets)):
+        if len(stream) == 0:
+            continue
+        order = np.argsort(stream[:, 0])
+        t = stream[order, 0] + offset
+        x, y = stream[order, 1], stream[order, 2]
+
+        # Interpolation seulement entre deux échantillons suffisamment proches
+        after = np.clip(np.searchsorted(t, times), 0, len(t) - 1)
+        before = np.clip(after - 1, 0, len(t) - 1)
+        exact = np.isclose(t[after], times, atol=1e-9)
+        bracketed = (t[before] <= times) & (t[after] >= times) & \
+                    (t[after] - t[before] <= 2 * max_gap)
+        usable = exact | bracketed
+
+        aligned[usable, camera, 0] = np.interp(times[usable], t, x)
+        aligned[usable, camera, 1] = np.interp(times[usable], t, y)
+    return aligned
+
+def detect_camera_stream(camera: Dict[str, Any], config_path: str) -> np.ndarray:
+    """Détections de la balle de jeu d'une caméra: tableau (M, 5) de t, x, y, confiance, frame"""
+    from ball_detector import HybridBallDetector
+
+    config = ConfigManager(config_path)
+    detector = HybridBallDetector(config)
+    tracker = MultiBallTracker(config)
+    capture = cv2.VideoCapture(camera["video"])
+    clock = FrameClock(capture.get(cv2.CAP_PROP_FPS))
+    rows = []
+    frame_number = 0
+    try:
+        while True:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            detections = detector.detect_balls_in_frame(
+                frame, frame_number, clock.timestamp(capture, frame_number))
+            rally_detection = tracker.update(detections, frame_number)
+            detector.notify_tracking(rally_detection is not None)
+            if rally_detection is not None:
+                rows.append((rally_detection.timestamp, rally_detection.x,
+                             rally_detection.y, rally_detection.confidence,
+                             rally_detection.frame_number))
+            frame_number += 1
+    finally:
+        capture.release()
+        detector.cleanup()
+    logger.info(f"Caméra {camera.get('name')}: {len(rows)} détections sur {frame_number} frames")
+    return np.array(rows, dtype=np.float64).reshape(-1, 5)
+
+class MultiCameraSystem:
+    """Appels IN/OUT à partir de la trajectoire 3D triangulée"""
+
+    def __init__(self, config: ConfigManager):
+        self.config = config
+        self.cameras: List[Dict[str, Any]] = config.get('multi_camera.cameras', [])
+        corners = [tuple(c) for c in config.get('multi_camera.court_corners_world',
+                                                SINGLES_COURT_CORNERS)]
+        self.court_corners_world = corners
+        self.in_out_detector = InOutDetector(CourtGeometry(
+            court_corners=corners, service_box_corners=corners, baseline_corners=corners
+        ))
+        self.max_time_gap = config.get('multi_camera.max_time_gap', 0.05)
+        self.bounce_height = config.get('multi_camera.bounce_height', 0.15)
+        self.max_reprojection_error = config.get('multi_camera.max_reprojection_error', 10.0)
+        self.debounce_seconds = config.get('detection.bounce_debounce_seconds', 0.3)
+        self.calibrations: List[CameraCalibration] = []
+
+    def calibrate(self) -> bool:
+        """Calibre chaque caméra avec les coins du terrain et ses points annexes"""
+        self.calibrations = []
+        for camera in self.cameras:
+            image_points = [tuple(p) for p in camera["court_corners"]]
+            world_points = [(x, y, 0.0) for x, y in self.court_corners_world]
+            for image_point, world_point in zip(camera.get("extra_image_points", []),
+                                                camera.get("extra_world_points", [])):
+                image_points.append(tuple(image_point))
+                world_points.append(tuple(world_point))
+
+            calibration = calibrate_camera(
+                camera.get("name", f"camera_{len(self.calibrations)}"),
+                image_points, world_points, tuple(camera["image_size"]),
+                camera.get("focal_length")
+            )
+            if calibration is None:
+                return False
+            self.calibrations.append(calibration)
+        return len(self.calibrations) >= 2
+
+    def run_detection(self) -> List[np.ndarray]:
+        """Lance la détection de chaque caméra dans son propre processus"""
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(processes=len(self.cameras)) as pool:
+            return pool.starmap(detect_camera_stream,
+                                [(camera, self.config.config_path) for camera in self.cameras])
+
+    def fuse(self, streams: List[np.ndarray]
+             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Aligne les flux sur la caméra de référence et triangule
+
+        Retourne les instants (N,), les numéros de frame de la caméra de
+        référence (N,), les positions 3D (N, 3) et le masque des positions
+        fiables (vues par deux caméras, faible erreur de reprojection).
+        """
+        offsets = [camera.get("time_offset", 0.0) for camera in self.cameras]
+        reference = streams[0].reshape(-1, 5)
+        times = reference[:, 0] + offsets[0]
+        frame_numbers = reference[:, 4].astype(np.int64)
+        points = align_streams(streams, offsets, times, self.max_time_gap)
+
+        projections = np.stack([c.projection for c in self.calibrations])
+        positions, valid = triangulate(projections, points)
+
+        # Erreur de reprojection moyenne sur les caméras qui voient la balle
+        homogeneous = np.hstack([positions, np.ones((len(positions), 1))])
+        projected = np.einsum('cij,nj->nci', projections, homogeneous)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            errors = np.linalg.norm(projected[..., :2] / projected[..., 2:3] - points, axis=2)
+            errors = np.nanmean(np.where(np.isnan(points[..., 0]), np.nan, errors), axis=1)
+        valid &= errors <= self.max_reprojection_error
+        return times, frame_numbers, positions, valid
+
+    def detect_bounces(self, times: np.ndarray, frame_numbers: np.ndarray,
+                       positions: np.ndarray, valid: np.ndarray) -> List[BounceEvent]:
+        """Rebonds: minimum local de hauteur proche du sol, appelés dans le plan du terrain
+
+        Les minima distants de moins de `detection.bounce_debounce_seconds`
+        (bruit de la hauteur triangulée près du sol) forment un seul rebond,
+        placé au plus bas d'entre eux.
+        """
+        times, frame_numbers = times[valid], frame_numbers[valid]
+        positions = positions[valid]
+        if len(times) < 3:
+            return []
+        vz = np.diff(positions[:, 2]) / np.maximum(np.diff(times), 1e-9)
+        candidates = np.nonzero((vz[:-1] < 0) & (vz[1:] >= 0))[0] + 1
+        candidates = candidates[positions[candidates, 2] <= self.bounce_height]
+
+        bounces: List[int] = []
+        first_time = 0.0
+        for index in candidates:
+            if bounces and times[index] - first_time < self.debounce_seconds:
+                if positions[index, 2] < positions[bounces[-1], 2]:
+                    bounces[-1] = index
+                continue
+            bounces.append(index)
+            first_time = times[index]
+
+        events = []
+        for index in bounces:
+            point = (float(positions[index, 0]), float(positions[index, 1]))
+            zone, line_distance = self.in_out_detector.nearest_line(point)
+            events.append(BounceEvent(
+                x=point[0],
+                y=point[1],
+                timestamp=float(times[index]),
+                frame_number=int(frame_numbers[index]),
+                call=self.in_out_detector.is_ball_in_court(point),
+                line_distance=line_distance,
+                zone=zone
+            ))
+        return events
+
+    def process(self) -> List[BounceEvent]:
+        """Calibration, détection par caméra, fusion 3D et appels"""
+        if not self.calibrate():
+            logger.error("Au moins deux caméras calibrées sont nécessaires")
+            return []
+        streams = self.run_detection()
+        times, frame_numbers, positions, valid = self.fuse(streams)
+        logger.info(f"{int(valid.sum())}/{len(times)} positions 3D triangulées")
+        events = self.detect_bounces(times, frame_numbers, positions, valid)
+        for event in events:
+            logger.info(f"Rebond à {event.timestamp:.2f}s: {event.call} "
+                        f"(ligne à {event.line_distance * 100:.1f} cm)")
+        if self.config.get('event_store.enabled', False):
+            self.store_events(events)
+        return events
+
+    def store_events(self, events: List[BounceEvent]) -> Optional[int]:
+        """Enregistre les rebonds dans la base d'événements; retourne l'identifiant du match
+
+        Les positions et distances à la ligne sont en mètres sur le terrain
+        (source 'multi_camera', unité 'm'); les numéros de frame sont ceux de
+        la caméra de référence.
+        """
+        from event_store import EventStore
+
+        video_path = self.cameras[0].get("video", "") if self.cameras else ""
+        store = EventStore(self.config.get('event_store.path', 'match_events.db'),
+                           self.config.get('event_store.batch_size', 256),
+                           self.config.get('event_store.flush_interval_seconds', 1.0))
+        try:
+            match_id = store.start_match(
+                name=self.config.get('event_store.match_name', '') or "multi_camera",
+                video_path=video_path,
+                season=str(self.config.get('event_store.season', '')),
+                played_at=str(self.config.get('event_store.played_at', ''))
+            )
+            for event in events:
+                store.add_bounce(match_id, event, source="multi_camera", distance_unit="m")
+            store.set_stats(match_id, {
+                "bounces_detected": len(events),
+                "in_calls": sum(e.call == "IN" for e in events),
+                "out_calls": sum(e.call == "OUT" for e in events)
+            })
+        finally:
+            store.close()
+        return match_id
+
+def main():
+    """Point d'entrée du mode multi-caméras"""
+    parser = argparse.ArgumentParser(description="Appels IN/OUT multi-caméras")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--output", default="", help="Rebonds détectés (JSON)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    events = MultiCameraSystem(ConfigManager(args.config)).process()
+    print(f"{len(events)} rebonds détectés")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([asdict(event) for event in events], f, indent=4)
+
+if __name__ == "__main__":
+    main()
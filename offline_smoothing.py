@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Lissage hors ligne des trajectoires
+===================================
+
+Le lissage exponentiel de `BallTracker` est causal: la position lissée est
+en retard sur la balle, ce qui décale le rebond dans le sens opposé au
+déplacement. Sur une vidéo enregistrée, tout le flux de détections est
+disponible: un lisseur de Rauch-Tung-Striebel (filtre de Kalman avant puis
+passe arrière) donne une trajectoire sans retard.
+
+Le flux est découpé en segments aux trous de détection (et aux changements
+de piste); à l'intérieur d'un segment, le pas de temps variable du modèle
+absorbe les frames manquantes. Le rebond est localisé sur la trajectoire
+lissée puis placé à l'intersection des droites ajustées sur les détections
+brutes avant et après le changement de direction.
+"""
+
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tennis_hawkeye import ConfigManager, BallDetection
+
+logger = logging.getLogger(__name__)
+
+def split_segments(times: np.ndarray, max_gap: float,
+                   track_ids: Optional[np.ndarray] = None) -> List[slice]:
+    """Segments contigus: coupure aux trous > max_gap et aux changements de piste"""
+    if len(times) == 0:
+        return []
+    breaks = np.diff(times) > max_gap
+    if track_ids is not None:
+        breaks |= track_ids[1:] != track_ids[:-1]
+    edges = np.concatenate([[0], np.nonzero(breaks)[0] + 1, [len(times)]])
+    return [slice(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])]
+
+def affine_scan(A: np.ndarray, B: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Compositions cumulées des applications X -> A[i] X + B[i] (matrices (m, 2, 2))
+
+    Retourne (A', B') tels que X_i = A'[i] X_0 + B'[i] pour la récurrence
+    X_i = A[i] X_{i-1} + B[i]: balayage préfixe par doublement, en log2(m)
+    opérations NumPy sur tout le tableau, sans inverse de matrice.
+    """
+    A, B = A.copy(), B.copy()
+    shift = 1
+    while shift < len(A):
+        A[shift:], B[shift:] = A[shift:] @ A[:-shift], A[shift:] @ B[:-shift] + B[shift:]
+        shift *= 2
+    return A, B
+
+def rts_gains(dts: np.ndarray, process_noise: float, measurement_noise: float
+              ) -> Tuple[np.ndarray, np.ndarray]:
+    """Gains de Kalman (n, 2) et gains de lissage (n-1, 2, 2) d'un segment
+
+    La récursion de covariance ne dépend que des pas de temps, pas des
+    mesures: elle est calculée une seule fois pour les deux axes, sur des
+    scalaires, et seuls les gains en sortent.
+    """
+    n = len(dts) + 1
+    r = measurement_noise ** 2
+    q = process_noise
+    filtered_cov = np.empty((n, 3))   # (p_pp, p_pv, p_vv)
+    predicted_cov = np.empty((n, 3))
+
+    # État initial: première mesure et vitesse aux différences finies
+    dt0 = max(float(dts[0]), 1e-9)
+    cpp, cpv, cvv = r, -r / dt0, 2 * r / dt0 ** 2 + q * dt0
+    filtered_cov[0] = predicted_cov[0] = (cpp, cpv, cvv)
+    for i, dt in enumerate(dts.tolist(), start=1):
+        # Prédiction: F = [[1, dt], [0, 1]], bruit d'accélération blanc
+        ppp = cpp + 2 * dt * cpv + dt * dt * cvv + q * dt ** 3 / 3
+        ppv = cpv + dt * cvv + q * dt ** 2 / 2
+        pvv = cvv + q * dt
+        predicted_cov[i] = (ppp, ppv, pvv)
+        # Correction par la mesure de position
+        k_p, k_v = ppp / (ppp + r), ppv / (ppp + r)
+        cpp, cpv, cvv = (1 - k_p) * ppp, (1 - k_p) * ppv, pvv - k_v * ppv
+        filtered_cov[i] = (cpp, cpv, cvv)
+
+    gains = predicted_cov[:, :2] / (predicted_cov[:, :1] + r)
+    # Gain de lissage C = P F^T Pp^-1 pour chaque pas
+    cpp, cpv, cvv = filtered_cov[:-1].T
+    ppp, ppv, pvv = predicted_cov[1:].T
+    pft = np.stack([np.stack([cpp + dts * cpv, cpv], axis=-1),
+                    np.stack([cpv + dts * cvv, cvv], axis=-1)], axis=1)
+    det = ppp * pvv - ppv * ppv
+    inverse = np.stack([np.stack([pvv, -ppv], axis=-1),
+                        np.stack([-ppv, ppp], axis=-1)], axis=1) / det[:, None, None]
+    return gains, pft @ inverse
+
+def rts_smooth(times: np.ndarray, positions: np.ndarray, process_noise: float,
+               measurement_noise: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Lisseur RTS à vitesse constante, pas de temps variable: positions (N, 2)
+
+    L'état des deux axes est la matrice [[x, y], [vx, vy]]. Une fois les
+    gains calculés (`rts_gains`), le filtre avant et la passe arrière sont des
+    récurrences affines sur cet état, appliquées par `affine_scan` sur tout
+    le segment. Retourne positions et vitesses lissées.
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    n = len(positions)
+    if n < 2:
+        return positions.copy(), np.zeros_like(positions)
+
+    dts = np.diff(np.asarray(times, dtype=np.float64))
+    gains, smoother_gains = rts_gains(dts, process_noise, measurement_noise)
+    transitions = np.zeros((n - 1, 2, 2))
+    transitions[:, 0, 0] = transitions[:, 1, 1] = 1.0
+    transitions[:, 0, 1] = dts
+
+    # Filtre avant: X_i = (I - K_i H) F_i X_{i-1} + K_i y_i
+    correction = np.eye(2) - gains[1:, :, None] * np.array([1.0, 0.0])
+    initial = np.stack([positions[0], (positions[1] - positions[0]) / max(dts[0], 1e-9)])
+    A, B = affine_scan(correction @ transitions,
+                       gains[1:, :, None] * positions[1:, None, :])
+    filtered = np.concatenate([initial[None], A @ initial + B])
+
+    # Passe arrière: S_i = C_i S_{i+1} + (I - C_i F_{i+1}) X_i
+    A, B = affine_scan(smoother_gains[::-1],
+                       ((np.eye(2) - smoother_gains @ transitions) @ filtered[:-1])[::-1])
+    smoothed = np.concatenate([(A @ filtered[-1] + B)[::-1], filtered[-1:]])
+    return smoothed[:, 0], smoothed[:, 1]
+
+def intersect_fits(times: np.ndarray, positions: np.ndarray, index: int,
+                   window: int) -> Tuple[float, np.ndarray]:
+    """Instant et position du rebond: intersection des droites y(t) avant/après
+
+    Des droites sont ajustées sur les détections brutes de part et d'autre du
+    sommet `index`; l'instant est borné entre les détections voisines.
+    """
+    before = slice(max(index - window, 0), index + 1)
+    after = slice(index, min(index + window + 1, len(times)))
+    if before.stop - before.start < 2 or after.stop - after.start < 2:
+        return float(times[index]), positions[index].copy()
+    t0 = times[index]
+    fit_in = np.polyfit(times[before] - t0, positions[before], 1)     # (2, 2)
+    fit_out = np.polyfit(times[after] - t0, positions[after], 1)
+    slope_gap = fit_in[0, 1] - fit_out[0, 1]
+    if abs(slope_gap) < 1e-9:
+        return float(t0), positions[index].copy()
+    t = (fit_out[1, 1] - fit_in[1, 1]) / slope_gap
+    t = float(np.clip(t, times[max(index - 1, 0)] - t0,
+                      times[min(index + 1, len(times) - 1)] - t0))
+    position = 0.5 * (fit_in[0] * t + fit_in[1] + fit_out[0] * t + fit_out[1])
+    return float(t0 + t), position
+
+class OfflineBounceDetector:
+    """Rebonds sans retard sur le flux complet des détections de la balle de jeu"""
+
+    def __init__(self, config: ConfigManager):
+        self.config = config
+        self.max_gap = config.get('offline_smoothing.max_gap_seconds', 0.2)
+        self.process_noise = config.get('offline_smoothing.process_noise', 1.0e7)
+        self.measurement_noise = config.get('offline_smoothing.measurement_noise', 1.5)
+        self.fit_window = config.get('offline_smoothing.fit_window', 3)
+        self.min_speed = config.get('detection.bounce_detection_threshold', 0.8)
+        self.reference_fps = config.get('detection.reference_fps', 30.0)
+
+    def smooth(self, detections: Sequence[BallDetection],
+               track_ids: Optional[Sequence[int]] = None
+               ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[slice]]:
+        """Instants, positions brutes, positions lissées et segments du flux"""
+        times = np.array([d.timestamp for d in detections], dtype=np.float64)
+        raw = np.array([(d.x, d.y) for d in detections], dtype=np.float64).reshape(-1, 2)
+        ids = np.asarray(track_ids) if track_ids is not None else None
+        segments = split_segments(times, self.max_gap, ids)
+        smoothed = raw.copy()
+        for segment in segments:
+            smoothed[segment], _ = rts_smooth(times[segment], raw[segment],
+                                              self.process_noise, self.measurement_noise)
+        return times, raw, smoothed, segments
+
+    def detect(self, detections: Sequence[BallDetection],
+               track_ids: Optional[Sequence[int]] = None
+               ) -> List[Tuple[Tuple[float, float], BallDetection]]:
+        """Rebonds (position, détection la plus proche): y maximal entre descente et remontée"""
+        if len(detections) < 3:
+            return []
+        times, raw, smoothed, segments = self.smooth(detections, track_ids)
+        # Instants en frames de référence: seuil indépendant de la cadence
+        frames = times * self.reference_fps
+
+        bounces = []
+        w = self.fit_window
+        for segment in segments:
+            start = segment.start
+            y = smoothed[segment, 1]
+            f = frames[segment]
+            if len(y) < 3:
+                continue
+            # Sommet local de y, avec descente puis remontée franches sur la
+            # fenêtre, réduite aux bords du segment (pixels par frame de
+            # référence, comme le seuil de BallTracker)
+            center = np.arange(1, len(y) - 1)
+            before = center - np.minimum(w, center)
+            after = center + np.minimum(w, len(y) - 1 - center)
+            peak = (y[center] >= y[center - 1]) & (y[center] > y[center + 1])
+            falling = (y[center] - y[before]) / (f[center] - f[before])
+            rising = (y[center] - y[after]) / (f[after] - f[center])
+            valid = peak & (falling > self.min_speed) & (rising > 0)
+            for local in center[valid]:
+                _, position = intersect_fits(times[segment], raw[segment], int(local), w)
+                detection = detections[start + int(local)]
+                bounces.append(((float(position[0]), float(position[1])), detection))
+        return bounces
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Rendu des calques de visualisation
+==================================
+
+Les calques statiques (limites du terrain, zone de service, ligne de fond,
+légende) ne changent pas d'une frame à l'autre: ils sont rendus une seule
+fois par géométrie du terrain et taille de frame dans un calque et un
+masque, puis appliqués à chaque frame par une seule copie indexée. Les
+calques dynamiques (balle, trajectoire, bandeau du dernier appel) sont
+dessinés ensuite. Chaque calque est activé par sa clé `visualization.*`.
+"""
+
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from tennis_hawkeye import ConfigManager, CourtGeometry, BallDetection, BounceEvent
+
+logger = logging.getLogger(__name__)
+
+class StaticLayer:
+    """Calque pré-rendu: image, masque et octets couverts (indices à plat)"""
+
+    def __init__(self, overlay: np.ndarray, mask: np.ndarray):
+        self.overlay = overlay
+        self.mask = mask
+        # Indices d'octets plutôt que de pixels: l'indexation 1D est la plus rapide
+        channels = overlay.shape[2]
+        pixels = np.flatnonzero(mask)
+        self.indices = (pixels[:, None] * channels + np.arange(channels)).ravel()
+        self.values = overlay.reshape(-1)[self.indices]
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """Copie les pixels du calque dans la frame (en place si contiguë)"""
+        if not self.indices.size:
+            return frame
+        if not frame.flags.c_contiguous:
+            np.copyto(frame, self.overlay, where=self.mask[..., None])
+            return frame
+        frame.reshape(-1)[self.indices] = self.values
+        return frame
+
+class OverlayRenderer:
+    """Compose les calques statiques mis en cache et les calques dynamiques"""
+
+    def __init__(self, config: ConfigManager):
+        self.config = config
+        self._static_key = None
+        self._static_layer: Optional[StaticLayer] = None
+        self.static_builds = 0
+
+    def _color(self, name: str, default: List[int]) -> Tuple[int, ...]:
+        """Couleur BGR de la section visualization.colors"""
+        return tuple(int(c) for c in self.config.get(f'visualization.colors.{name}', default))
+
+    def _static_polygons(self, geometry: CourtGeometry):
+        """Polygones statiques actifs avec leur couleur"""
+        if not self.config.get('visualization.show_court_lines', True):
+            return []
+        return [
+            (polygon, self._color(key, default))
+            for polygon, key, default in (
+                (geometry.court_corners, 'court_boundary', [0, 255, 0]),
+                (geometry.service_box_corners, 'service_area', [0, 0, 255]),
+                (geometry.baseline_corners, 'baseline', [255, 0, 0]))
+            if len(polygon) >= 2
+        ]
+
+    def static_layer(self, geometry: CourtGeometry,
+                     frame_shape: Sequence[int]) -> StaticLayer:
+        """Calque statique de la géométrie, reconstruit seulement si elle change"""
+        thickness = self.config.get('visualization.line_thickness', 2)
+        polygons = self._static_polygons(geometry)
+        show_legend = self.config.get('visualization.show_legend', True)
+        key = (tuple(frame_shape), thickness, show_legend,
+               tuple((tuple(map(tuple, polygon)), color) for polygon, color in polygons))
+        if key == self._static_key:
+            return self._static_layer
+
+        overlay = np.zeros(tuple(frame_shape[:2]) + (3,), dtype=np.uint8)
+        mask = np.zeros(frame_shape[:2], dtype=np.uint8)
+        for polygon, color in polygons:
+            points = np.array(polygon, np.int32)
+            cv2.polylines(overlay, [points], True, color, thickness)
+            cv2.polylines(mask, [points], True, 255, thickness)
+        if show_legend:
+            self._draw_legend(overlay, mask)
+
+        self._static_key = key
+        self._static_layer = StaticLayer(overlay, mask.astype(bool))
+        self.static_builds += 1
+        return self._static_layer
+
+    def _draw_legend(self, overlay: np.ndarray, mask: np.ndarray) -> None:
+        """Légende des couleurs IN/OUT en haut à gauche"""
+        entries = [("IN", self._color('ball_in', [0, 255, 0])),
+                   ("OUT", self._color('ball_out', [0, 0, 255]))]
+        for i, (label, color) in enumerate(entries):
+            y = 25 + 25 * i
+            for image, value in ((overlay, color), (mask, 255)):
+                cv2.circle(image, (20, y - 5), 7, value, -1)
+                cv2.putText(image, label, (35, y), cv2.FONT_HERSHEY_SIMPLEX,
+                            0.6, value, 2)
+
+    def render(self, frame: np.ndarray, geometry: Optional[CourtGeometry],
+               detection: Optional[BallDetection], call: str,
+               trajectory: Sequence[Tuple[float, float]],
+               last_call: Optional[BounceEvent] = None) -> np.ndarray:
+        """Calques statiques puis dynamiques, dessinés en place dans la frame"""
+        if geometry is not None:
+            self.static_layer(geometry, frame.shape).apply(frame)
+        self._draw_trajectory(frame, trajectory)
+        if detection is not None:
+            self._draw_detection(frame, detection, call)
+        if last_call is not None:
+            self._draw_call_banner(frame, last_call)
+        return frame
+
+    def _call_color(self, call: str) -> Tuple[int, ...]:
+        """Couleur associée à un appel"""
+        if call == "IN":
+            return self._color('ball_in', [0, 255, 0])
+        if call == "OUT":
+            return self._color('ball_out', [0, 0, 255])
+        return (255, 255, 255)
+
+    def _draw_detection(self, frame: np.ndarray, detection: BallDetection,
+                        call: str) -> None:
+        """Cercle et label de la balle de jeu"""
+        x, y = int(detection.x), int(detection.y)
+        color = self._call_color(call)
+        cv2.circle(frame, (x, y), 10, color, 2)
+        label = call
+        if self.config.get('visualization.show_confidence', True):
+            label = f"{call} ({detection.confidence:.2f})"
+        cv2.putText(frame, label, (x + 15, y - 15),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+    def _draw_trajectory(self, frame: np.ndarray,
+                         trajectory: Sequence[Tuple[float, float]]) -> None:
+        """Trajectoire lissée en une seule polyligne"""
+        if not self.config.get('visualization.show_trajectory', True) or len(trajectory) < 2:
+            return
+        points = np.asarray(trajectory, dtype=np.float64).astype(np.int32)
+        cv2.polylines(frame, [points], False, self._color('trajectory', [255, 255, 0]), 1)
+
+    def _draw_call_banner(self, frame: np.ndarray, last_call: BounceEvent) -> None:
+        """Bandeau du dernier appel en bas de la frame"""
+        if not self.config.get('visualization.show_call_banner', True):
+            return
+        text = f"{last_call.call} - {last_call.timestamp:.2f}s"
+        cv2.putText(frame, text, (10, frame.shape[0] - 15),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, self._call_color(last_call.call), 2)
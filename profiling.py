@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Instrumentation des étapes de traitement
+========================================
+
+Chronométrage à faible coût des étapes du pipeline (décodage, inférence,
+suivi, classification, dessin, encodage) avec percentiles glissants,
+résumé JSON et export optionnel au format Chrome trace.
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class StageProfiler:
+    """Chronomètres par étape basés sur perf_counter_ns"""
+
+    def __init__(self, window: int = 1000, enabled: bool = True,
+                 trace: bool = False, max_trace_events: int = 200000):
+        self.enabled = enabled
+        self.window = window
+        self.trace = trace
+        self.max_trace_events = max_trace_events
+        self.durations: Dict[str, Deque[int]] = {}
+        self.totals: Dict[str, int] = {}
+        self.counts: Dict[str, int] = {}
+        self.trace_events: List[Dict[str, Any]] = []
+        self._origin_ns = time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, stage: str):
+        """Chronomètre le bloc encadré pour l'étape donnée"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(stage, start, time.perf_counter_ns())
+
+    def record(self, stage: str, start_ns: int, end_ns: int) -> None:
+        """Enregistre une durée mesurée entre deux instants perf_counter_ns"""
+        duration = end_ns - start_ns
+        samples = self.durations.get(stage)
+        if samples is None:
+            samples = self.durations[stage] = deque(maxlen=self.window)
+            self.totals[stage] = 0
+            self.counts[stage] = 0
+        samples.append(duration)
+        self.totals[stage] += duration
+        self.counts[stage] += 1
+
+        if self.trace and len(self.trace_events) < self.max_trace_events:
+            self.trace_events.append({
+                "name": stage,
+                "ph": "X",
+                "ts": (start_ns - self._origin_ns) / 1000,
+                "dur": duration / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident()
+            })
+
+    def get_summary(self) -> Dict[str, Dict[str, float]]:
+        """Retourne p50/p95/p99 glissants et totaux par étape, en millisecondes"""
+        summary = {}
+        for stage, samples in self.durations.items():
+            values = np.fromiter(samples, dtype=np.float64) / 1e6
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            summary[stage] = {
+                "count": self.counts[stage],
+                "total_ms": self.totals[stage] / 1e6,
+                "mean_ms": self.totals[stage] / 1e6 / self.counts[stage],
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99)
+            }
+        return summary
+
+    def write_summary(self, path: str) -> None:
+        """Écrit le résumé JSON des étapes"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.get_summary(), f, indent=4)
+        logger.info(f"Résumé de profilage écrit: {path}")
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Exporte les spans au format Chrome trace (chrome://tracing, Perfetto)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": self.trace_events,
+                       "displayTimeUnit": "ms"}, f)
+        logger.info(f"Trace Chrome écrite: {path} ({len(self.trace_events)} événements)")
+
+    def reset(self) -> None:
+        """Efface toutes les mesures"""
+        self.durations.clear()
+        self.totals.clear()
+        self.counts.clear()
+        self.trace_events.clear()
+        self._origin_ns = time.perf_counter_ns()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Image de référence extraite de la vidéo du match
+================================================
+
+Aucune frame isolée ne montre toutes les lignes: les joueurs et les
+ramasseurs en masquent toujours une partie. L'image de référence est donc
+une médiane temporelle:
+
+1. un réservoir borné de frames réduites est échantillonné dans la vidéo
+   (accès direct aux frames si leur nombre est connu, sinon échantillonnage
+   par réservoir en flux, sans décoder les frames écartées);
+2. la médiane des frames réduites sert à choisir le sous-ensemble de frames
+   les moins occultées;
+3. seules ces frames sont relues en pleine résolution et leur médiane
+   donne l'image de référence.
+"""
+
+import logging
+import random
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from tennis_hawkeye import ConfigManager
+
+logger = logging.getLogger(__name__)
+
+def temporal_median(frames: np.ndarray) -> np.ndarray:
+    """Médiane pixel à pixel d'une pile (N, H, W, C) en uint8, sans conversion flottante"""
+    middle = (len(frames) - 1) // 2
+    return np.partition(frames, middle, axis=0)[middle]
+
+class ReferenceFrameBuilder:
+    """Construit une image de référence sans joueurs à partir d'une vidéo"""
+
+    def __init__(self, config: ConfigManager):
+        self.reservoir_size = max(int(config.get('reference.reservoir_size', 48)), 1)
+        self.preview_width = config.get('reference.preview_width', 320)
+        # Taille impaire: la médiane est un pixel réel de la pile
+        self.subset_size = max(int(config.get('reference.subset_size', 9)) | 1, 1)
+        self.random = random.Random(config.get('reference.seed', 0))
+        self.reset()
+
+    def reset(self) -> None:
+        """Vide le réservoir"""
+        self.samples: List[np.ndarray] = []
+        self.frame_numbers: List[int] = []
+        self.seen = 0
+
+    def offer(self) -> Optional[int]:
+        """Décision d'échantillonnage par réservoir pour la frame suivante
+
+        Retourne l'emplacement du réservoir à remplir, ou None si la frame est
+        écartée (elle n'a alors pas besoin d'être décodée).
+        """
+        self.seen += 1
+        if len(self.samples) < self.reservoir_size:
+            return len(self.samples)
+        slot = self.random.randrange(self.seen)
+        return slot if slot < self.reservoir_size else None
+
+    def add(self, frame: np.ndarray, frame_number: int, slot: Optional[int] = None) -> None:
+        """Ajoute une version réduite de la frame au réservoir"""
+        if slot is None:
+            slot = self.offer()
+            if slot is None:
+                return
+        small = self._downscale(frame)
+        if slot == len(self.samples):
+            self.samples.append(small)
+            self.frame_numbers.append(frame_number)
+        else:
+            self.samples[slot] = small
+            self.frame_numbers[slot] = frame_number
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        """Frame réduite à la largeur d'aperçu"""
+        scale = min(1.0, self.preview_width / frame.shape[1])
+        if scale >= 1.0:
+            return frame.copy()
+        return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    def preview_median(self) -> Optional[np.ndarray]:
+        """Médiane temporelle des frames réduites du réservoir"""
+        if not self.samples:
+            return None
+        return temporal_median(np.stack(self.samples))
+
+    def select_subset(self) -> List[int]:
+        """Numéros des frames les plus proches de la médiane (les moins occultées)"""
+        median = self.preview_median()
+        if median is None:
+            return []
+        stack = np.stack(self.samples).astype(np.int16)
+        distances = np.abs(stack - median.astype(np.int16)).mean(axis=(1, 2, 3))
+        chosen = np.argsort(distances, kind='stable')[:self.subset_size]
+        return sorted(self.frame_numbers[i] for i in chosen)
+
+    def sample_video(self, capture: cv2.VideoCapture) -> None:
+        """Remplit le réservoir depuis une vidéo ouverte"""
+        self.reset()
+        total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if total_frames > 0:
+            # Nombre de frames connu: accès direct à des positions réparties
+            count = min(self.reservoir_size, total_frames)
+            positions = np.linspace(0, total_frames - 1, count).round().astype(int)
+            for frame_number in dict.fromkeys(positions.tolist()):
+                capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+                ret, frame = capture.read()
+                if ret:
+                    self.add(frame, frame_number, len(self.samples))
+            return
+
+        # Flux de longueur inconnue: seules les frames retenues sont décodées
+        frame_number = 0
+        while capture.grab():
+            slot = self.offer()
+            if slot is not None:
+                ret, frame = capture.retrieve()
+                if ret:
+                    self.add(frame, frame_number, slot)
+            frame_number += 1
+
+    def build(self, video_path: str) -> Optional[np.ndarray]:
+        """Image de référence pleine résolution extraite de la vidéo"""
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            logger.error(f"Impossible d'ouvrir la vidéo: {video_path}")
+            return None
+        try:
+            self.sample_video(capture)
+            subset = self.select_subset()
+            if not subset:
+                logger.error(f"Aucune frame lisible dans {video_path}")
+                return None
+
+            frames, stack = [], None
+            for frame_number in subset:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+                ret, frame = capture.read()
+                if not ret:
+                    continue
+                if stack is None:
+                    stack = np.empty((len(subset),) + frame.shape, dtype=frame.dtype)
+                stack[len(frames)] = frame
+                frames.append(frame_number)
+            if not frames:
+                logger.error(f"Relecture des frames de référence impossible: {video_path}")
+                return None
+        finally:
+            capture.release()
+
+        logger.info(f"Image de référence: médiane de {len(frames)} frames "
+                    f"sur {len(self.samples)} échantillonnées")
+        return temporal_median(stack[:len(frames)])
+
+def extract_reference_frame(video_path: str, config: ConfigManager,
+                            output_path: str = "") -> Optional[np.ndarray]:
+    """Construit l'image de référence d'une vidéo et l'enregistre si demandé"""
+    reference = ReferenceFrameBuilder(config).build(video_path)
+    if reference is not None and output_path:
+        cv2.imwrite(output_path, reference)
+        logger.info(f"Image de référence enregistrée: {output_path}")
+    return reference
@@ -29,11 +29,6 @@ from typing import List, Tuple, Optional, Dict, Any
 from dataclasses import dataclass
 from pathlib import Path
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -58,6 +53,28 @@ class CourtGeometry:
                 len(self.service_box_corners) == 4 and
                 len(self.baseline_corners) == 4)
 
+@dataclass
+class BounceEvent:
+    """Rebond détecté avec l'appel IN/OUT associé"""
+    x: float
+    y: float
+    timestamp: float
+    frame_number: int
+    call: str
+    line_distance: float
+    uncertainty: Optional[float] = None
+    refined: bool = False
+    zone: Optional[str] = None
+
+@dataclass
+class RefinedPosition:
+    """Position sous-pixel de la balle et point de contact au sol estimé"""
+    x: float
+    y: float
+    contact_x: float
+    contact_y: float
+    sigma: float
+
 class ConfigManager:
     """Gestionnaire de configuration pour le système Hawk-Eye"""
     
@@ -96,13 +113,47 @@ class ConfigManager:
                 "project": "tennis-misz2",
                 "version": 3,
                 "confidence": 0.3,
-                "overlap": 0.6
+                "overlap": 0.6,
+                "api_url": "https://detect.roboflow.com",
+                "timeout_seconds": 2.0,
+                "max_retries": 2,
+                "retry_backoff_seconds": 0.1,
+                "circuit_failure_threshold": 5,
+                "circuit_reset_seconds": 30.0,
+                "pool_size": 4,
+                "jpeg_quality": 90
             },
             "detection": {
+                "backend": "hybrid",
                 "min_ball_confidence": 0.3,
                 "max_tracking_distance": 50,
                 "bounce_detection_threshold": 0.8,
-                "trajectory_smoothing": 0.7
+                "bounce_debounce_seconds": 0.3,
+                "trajectory_smoothing": 0.7,
+                "max_track_misses": 5,
+                "min_track_hits": 3,
+                "static_ball_speed": 2.0,
+                "reference_fps": 30.0,
+                "min_ball_area_ratio": 3.3e-05,
+                "max_ball_area_ratio": 0.0016,
+                "min_circularity": 0.3,
+                "fallback_scale": 1.0,
+                "fallback_max_width": 1280,
+                "refine_patch_radius": 12,
+                "color_filter": {
+                    "enabled": False,
+                    "hsv_lower": [25, 60, 80],
+                    "hsv_upper": [45, 255, 255],
+                    "hsv_tolerance": [8, 70, 70],
+                    "auto_learn": True,
+                    "learning_rate": 0.05
+                },
+                "arbiter": {
+                    "health_window": 30,
+                    "escalation_confidence": 0.5,
+                    "min_primary_recall": 0.2,
+                    "probe_interval": 30
+                }
             }
         }
     
@@ -127,6 +178,74 @@ class ConfigManager:
             config_ref = config_ref[key]
         config_ref[keys[-1]] = value
 
+class FrameBufferPool:
+    """Pool de buffers préalloués réutilisés d'une frame à l'autre"""
+    
+    def __init__(self):
+        self._buffers: Dict[str, np.ndarray] = {}
+        self.allocations = 0
+        self.reuses = 0
+    
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Retourne le buffer nommé, réalloué seulement si la forme ou le type change"""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+            self.allocations += 1
+        else:
+            self.reuses += 1
+        return buffer
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Retourne les compteurs d'allocation du pool"""
+        return {
+            "allocations": self.allocations,
+            "reuses": self.reuses,
+            "buffers": len(self._buffers),
+            "bytes": sum(b.nbytes for b in self._buffers.values())
+        }
+    
+    def clear(self) -> None:
+        """Libère tous les buffers du pool"""
+        self._buffers.clear()
+
+class FrameClock:
+    """Horodatage des frames depuis les timestamps du conteneur vidéo
+
+    Après chaque lecture, CAP_PROP_POS_MSEC donne l'instant de présentation de
+    la frame lue, cadence variable comprise. S'il est indisponible (nul après
+    la première frame) ou non croissant, l'instant est extrapolé à la cadence
+    nominale depuis la frame précédente.
+    """
+
+    def __init__(self, fps: float):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.last: Optional[float] = None
+
+    def timestamp(self, capture, frame_number: int) -> float:
+        """Instant en secondes de la frame qui vient d'être lue"""
+        t = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        invalid = not np.isfinite(t) or (t <= 0 and frame_number > 0)
+        if invalid or (self.last is not None and t <= self.last):
+            t = frame_number / self.fps if self.last is None else self.last + 1.0 / self.fps
+        self.last = t
+        return t
+
+def elapsed_frames(previous: BallDetection, current: BallDetection,
+                   reference_fps: float) -> float:
+    """Intervalle entre deux détections, en frames à la cadence de référence
+
+    Les seuils en pixels par frame (rebond, balle immobile) sont définis à
+    `detection.reference_fps`: à 120 ou 240 FPS, un même mouvement de balle
+    garde la même vitesse. Sans horodatage croissant, l'écart des numéros de
+    frame est utilisé.
+    """
+    dt = current.timestamp - previous.timestamp
+    if dt > 0:
+        return dt * reference_fps
+    return float(max(current.frame_number - previous.frame_number, 1))
+
 class BallTracker:
     """Système de suivi de balle avec filtrage temporel"""
     
@@ -138,10 +257,16 @@ class BallTracker:
         self.velocity: Optional[Tuple[float, float]] = None
         self.max_tracking_distance = config.get('detection.max_tracking_distance', 50)
         self.smoothing_factor = config.get('detection.trajectory_smoothing', 0.7)
+        self.reference_fps = config.get('detection.reference_fps', 30.0)
     
-    def add_detection(self, detection: BallDetection) -> bool:
-        """Ajoute une nouvelle détection et met à jour la trajectoire"""
-        if self._is_valid_detection(detection):
+    def add_detection(self, detection: BallDetection, associated: bool = False) -> bool:
+        """Ajoute une nouvelle détection et met à jour la trajectoire
+
+        Une détection déjà associée à la piste par le tracker multi-objets
+        (`associated`) n'est pas revalidée contre la position lissée, qui est
+        en retard sur la balle rapide.
+        """
+        if associated or self._is_valid_detection(detection):
             self.detections.append(detection)
             self._update_trajectory(detection)
             return True
@@ -171,9 +296,9 @@ class BallTracker:
                          (1 - self.smoothing_factor) * detection.y)
             new_position = (smoothed_x, smoothed_y)
             
-            # Calcul de la vélocité
+            # Vélocité en pixels par frame de référence (intervalle réel)
             if len(self.trajectory) > 0:
-                dt = 1.0  # Assumons 1 frame = 1 unité de temps
+                dt = elapsed_frames(self.detections[-2], detection, self.reference_fps)
                 self.velocity = (
                     (new_position[0] - self.last_position[0]) / dt,
                     (new_position[1] - self.last_position[1]) / dt
@@ -190,11 +315,14 @@ class BallTracker:
         # Analyse des 3 dernières positions pour détecter un changement de direction
         recent_positions = self.trajectory[-3:]
         
-        # Calcul des vecteurs de direction
-        v1 = (recent_positions[1][0] - recent_positions[0][0],
-              recent_positions[1][1] - recent_positions[0][1])
-        v2 = (recent_positions[2][0] - recent_positions[1][0],
-              recent_positions[2][1] - recent_positions[1][1])
+        # Calcul des vecteurs de direction, ramenés à une frame de référence
+        recent_detections = self.detections[-3:]
+        dt1 = elapsed_frames(recent_detections[0], recent_detections[1], self.reference_fps)
+        dt2 = elapsed_frames(recent_detections[1], recent_detections[2], self.reference_fps)
+        v1 = ((recent_positions[1][0] - recent_positions[0][0]) / dt1,
+              (recent_positions[1][1] - recent_positions[0][1]) / dt1)
+        v2 = ((recent_positions[2][0] - recent_positions[1][0]) / dt2,
+              (recent_positions[2][1] - recent_positions[1][1]) / dt2)
         
         # Détection du changement de direction (particulièrement en Y pour les rebonds)
         if abs(v1[1]) > 0 and abs(v2[1]) > 0:
@@ -205,6 +333,12 @@ class BallTracker:
         
         return False
     
+    def get_bounce_point(self) -> Optional[Tuple[Tuple[float, float], BallDetection]]:
+        """Retourne la position et la détection du sommet du dernier changement de direction"""
+        if len(self.trajectory) < 3:
+            return None
+        return self.trajectory[-2], self.detections[-2]
+    
     def get_current_position(self) -> Optional[Tuple[float, float]]:
         """Retourne la position actuelle de la balle"""
         return self.last_position
@@ -216,6 +350,183 @@ class BallTracker:
         self.last_position = None
         self.velocity = None
 
+@dataclass
+class BallTrack:
+    """Piste candidate suivie par le tracker multi-objets"""
+    track_id: int
+    last_detection: BallDetection
+    velocity: Tuple[float, float] = (0.0, 0.0)
+    hits: int = 1
+    misses: int = 0
+    score: float = 0.0
+    total_motion: float = 0.0
+
+    def predict(self, dt: float) -> Tuple[float, float]:
+        """Prédit la position de la piste après dt frames de référence"""
+        return (self.last_detection.x + self.velocity[0] * dt,
+                self.last_detection.y + self.velocity[1] * dt)
+
+    @property
+    def mean_speed(self) -> float:
+        """Vitesse moyenne en pixels par frame de référence depuis la création de la piste"""
+        return self.total_motion / max(self.hits - 1, 1)
+
+def linear_sum_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Affectation hongroise de coût minimal (boucle interne vectorisée)"""
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.size == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)    # ligne affectée à chaque colonne (1-indexée)
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            improve = free & (reduced < minv[1:])
+            minv[1:][improve] = reduced[improve]
+            way[1:][improve] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+class MultiBallTracker:
+    """Suivi multi-hypothèses pour isoler la balle de l'échange des balles de rechange"""
+
+    GATE_COST = 1e9
+
+    def __init__(self, config: ConfigManager):
+        self.config = config
+        self.max_tracking_distance = config.get('detection.max_tracking_distance', 50)
+        self.max_misses = config.get('detection.max_track_misses', 5)
+        self.min_hits = config.get('detection.min_track_hits', 3)
+        self.static_speed = config.get('detection.static_ball_speed', 2.0)
+        self.reference_fps = config.get('detection.reference_fps', 30.0)
+        self.tracks: List[BallTrack] = []
+        self.active_track_id: Optional[int] = None
+        self._next_id = 0
+
+    def update(self, detections: List[BallDetection],
+               frame_number: int) -> Optional[BallDetection]:
+        """Associe les détections aux pistes et retourne celle de la balle de jeu"""
+        matched_tracks, matched_detections = self._assign(detections, frame_number)
+
+        updated = set()
+        for track_index, detection_index in zip(matched_tracks, matched_detections):
+            self._update_track(self.tracks[track_index], detections[detection_index])
+            updated.add(track_index)
+
+        for index, track in enumerate(self.tracks):
+            if index not in updated:
+                track.misses += 1
+                track.score *= 0.8
+
+        assigned = set(matched_detections.tolist())
+        for index, detection in enumerate(detections):
+            if index not in assigned:
+                self._create_track(detection)
+
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        active = self._select_active_track()
+        if active is None or active.last_detection.frame_number != frame_number:
+            return None
+        return active.last_detection
+
+    def _assign(self, detections: List[BallDetection],
+                frame_number: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Affectation hongroise vectorisée pistes/détections avec fenêtre de distance"""
+        if not self.tracks or not detections:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+        # Les détections d'une frame partagent son instant
+        current = detections[0]
+        predicted = np.array([
+            t.predict(elapsed_frames(t.last_detection, current, self.reference_fps))
+            for t in self.tracks
+        ])
+        observed = np.array([(d.x, d.y) for d in detections])
+        distances = np.linalg.norm(predicted[:, None, :] - observed[None, :, :], axis=2)
+        cost = np.where(distances <= self.max_tracking_distance, distances, self.GATE_COST)
+
+        rows, cols = linear_sum_assignment(cost)
+        valid = cost[rows, cols] < self.GATE_COST
+        return rows[valid], cols[valid]
+
+    def _update_track(self, track: BallTrack, detection: BallDetection) -> None:
+        """Met à jour une piste avec la détection associée"""
+        previous = track.last_detection
+        dt = elapsed_frames(previous, detection, self.reference_fps)
+        dx, dy = detection.x - previous.x, detection.y - previous.y
+        track.velocity = (dx / dt, dy / dt)
+        track.total_motion += np.hypot(dx, dy) / dt
+        track.last_detection = detection
+        track.hits += 1
+        track.misses = 0
+        track.score += detection.confidence
+
+    def _create_track(self, detection: BallDetection) -> None:
+        """Ouvre une nouvelle piste pour une détection non associée"""
+        self.tracks.append(BallTrack(
+            track_id=self._next_id,
+            last_detection=detection,
+            score=detection.confidence
+        ))
+        self._next_id += 1
+
+    def _is_rally_candidate(self, track: BallTrack) -> bool:
+        """Une piste confirmée et en mouvement peut être la balle de jeu"""
+        return track.hits >= self.min_hits and track.mean_speed >= self.static_speed
+
+    def _select_active_track(self) -> Optional[BallTrack]:
+        """Choisit la piste de la balle de jeu en privilégiant la piste active"""
+        candidates = [t for t in self.tracks if self._is_rally_candidate(t)]
+        if not candidates:
+            self.active_track_id = None
+            return None
+
+        for track in candidates:
+            if track.track_id == self.active_track_id:
+                return track
+
+        best = max(candidates, key=lambda t: t.score)
+        self.active_track_id = best.track_id
+        return best
+
+    def reset(self) -> None:
+        """Supprime toutes les pistes"""
+        self.tracks.clear()
+        self.active_track_id = None
+
 class CourtCalibrator:
     """Système de calibration du terrain de tennis"""
 
@@ -287,6 +598,46 @@ class InOutDetector:
         else:
             return "OUT"
 
+    # Nom de la ligne portée par chaque côté des polygones (coins dans l'ordre
+    # haut-gauche, haut-droit, bas-droit, bas-gauche)
+    LINE_ZONES = {
+        "court_corners": ("baseline", "sideline", "baseline", "sideline"),
+        "service_box_corners": ("service_line",) * 4,
+        "baseline_corners": ("baseline", "sideline", "baseline", "sideline")
+    }
+
+    def distance_to_nearest_line(self, position: Tuple[float, float]) -> float:
+        """Distance en pixels entre une position et la ligne la plus proche"""
+        return self.nearest_line(position)[1]
+
+    def nearest_line(self, position: Tuple[float, float]) -> Tuple[Optional[str], float]:
+        """Ligne la plus proche (baseline, sideline, service_line) et sa distance"""
+        point = np.asarray(position, dtype=np.float64)
+        best_zone, best_distance = None, float('inf')
+        for name, zones in self.LINE_ZONES.items():
+            polygon = getattr(self.court_geometry, name)
+            if len(polygon) < 2:
+                continue
+            distances = self._edge_distances(point, polygon)
+            edge = int(np.argmin(distances))
+            if distances[edge] < best_distance:
+                best_distance = float(distances[edge])
+                best_zone = zones[edge] if edge < len(zones) else zones[-1]
+        return best_zone, best_distance
+
+    def _edge_distances(self, point: np.ndarray,
+                        polygon: List[Tuple[int, int]]) -> np.ndarray:
+        """Distance d'un point à chaque côté d'un polygone (vectorisée)"""
+        starts = np.asarray(polygon, dtype=np.float64)
+        ends = np.roll(starts, -1, axis=0)
+        segments = ends - starts
+        lengths_sq = np.einsum('ij,ij->i', segments, segments)
+        # Projection du point sur chaque segment, bornée aux extrémités
+        t = np.einsum('ij,ij->i', point - starts, segments) / np.where(lengths_sq > 0, lengths_sq, 1.0)
+        t = np.clip(t, 0.0, 1.0)
+        projections = starts + t[:, None] * segments
+        return np.linalg.norm(projections - point, axis=1)
+
     def _point_in_polygon(self, point: Tuple[float, float],
                          polygon: List[Tuple[int, int]]) -> bool:
         """Algorithme ray casting pour déterminer si un point est dans un polygone"""
@@ -308,6 +659,141 @@ class InOutDetector:
 
         return inside
 
+class SubPixelRefiner:
+    """Localisation sous-pixel de la balle dans un petit patch (ellipse des moments)"""
+
+    def __init__(self, config: ConfigManager):
+        self.patch_radius = config.get('detection.refinement.patch_radius', 16)
+
+    def refine(self, frame: np.ndarray,
+               position: Tuple[float, float]) -> Optional[RefinedPosition]:
+        """Affine la position de la balle et estime son point de contact au sol"""
+        height, width = frame.shape[:2]
+        cx, cy = int(round(position[0])), int(round(position[1]))
+        x0, y0 = max(cx - self.patch_radius, 0), max(cy - self.patch_radius, 0)
+        x1 = min(cx + self.patch_radius + 1, width)
+        y1 = min(cy + self.patch_radius + 1, height)
+        if x1 - x0 < 5 or y1 - y0 < 5:
+            return None
+
+        patch = frame[y0:y1, x0:x1]
+        if patch.ndim == 3:
+            patch = cv2.cvtColor(patch, cv2.COLOR_BGR2GRAY)
+        gray = patch.astype(np.float32)
+
+        # Fond et bruit estimés sur le bord du patch
+        border = np.concatenate([gray[0], gray[-1], gray[1:-1, 0], gray[1:-1, -1]])
+        background = np.median(border)
+        noise = 1.4826 * np.median(np.abs(border - background)) + 1.0
+        contrast = np.abs(gray - background)
+        if contrast.max() < 3 * noise:
+            return None
+
+        # Composante la plus contrastée au-dessus de la mi-hauteur du pic,
+        # élargie d'un pixel pour inclure les bords anticrénelés
+        mask = (contrast >= 0.5 * contrast.max()).astype(np.uint8)
+        count, labels = cv2.connectedComponents(mask)
+        sums = np.bincount(labels.ravel(), weights=contrast.ravel(), minlength=count)
+        sums[0] = 0
+        blob = (labels == np.argmax(sums)).astype(np.uint8)
+        support = cv2.dilate(blob, np.ones((3, 3), np.uint8)).astype(bool)
+
+        # Ellipse des moments pondérés par le contraste: centre et extension verticale
+        weights = np.where(support, contrast, 0.0)
+        total = weights.sum()
+        ys, xs = np.indices(weights.shape, dtype=np.float64)
+        mean_x = (weights * xs).sum() / total
+        mean_y = (weights * ys).sum() / total
+        dy2 = (ys - mean_y) ** 2
+        var_y = max((weights * dy2).sum() / total, 1e-6)
+        # Disque ou ellipse uniforme: demi-étendue verticale = 2 * écart-type
+        half_height = 2 * np.sqrt(var_y)
+
+        # Propagation du bruit de fond au centre et au point de contact
+        center_error = noise * np.sqrt(((xs - mean_x) ** 2 + dy2)[support].sum() / 2) / total
+        var_error = noise * np.sqrt(((dy2 - var_y) ** 2)[support].sum()) / total
+        radius_error = var_error / np.sqrt(var_y)
+        sigma = float(np.hypot(center_error, radius_error))
+
+        return RefinedPosition(
+            x=float(x0 + mean_x),
+            y=float(y0 + mean_y),
+            contact_x=float(x0 + mean_x),
+            contact_y=float(y0 + mean_y + half_height),
+            sigma=sigma
+        )
+
+class LineCallEngine:
+    """Moteur d'appels IN/OUT évalués uniquement aux points de rebond"""
+
+    def __init__(self, config: ConfigManager, in_out_detector: InOutDetector):
+        self.config = config
+        self.in_out_detector = in_out_detector
+        self.debounce_seconds = config.get('detection.bounce_debounce_seconds', 0.3)
+        self.bounce_events: List[BounceEvent] = []
+        self.last_call: Optional[BounceEvent] = None
+
+        # Affinage sous-pixel réservé aux rebonds proches d'une ligne
+        self.refiner = None
+        if config.get('detection.refinement.enabled', True):
+            self.refiner = SubPixelRefiner(config)
+        self.refinement_distance = config.get('detection.refinement.trigger_distance', 4.0)
+
+    def evaluate_bounce(self, position: Tuple[float, float],
+                        timestamp: float, frame_number: int,
+                        frame: Optional[np.ndarray] = None,
+                        detection: Optional[BallDetection] = None) -> Optional[BounceEvent]:
+        """Classifie un rebond, ou retourne None s'il est dans la fenêtre anti-rebond"""
+        if (self.last_call is not None and
+                timestamp - self.last_call.timestamp < self.debounce_seconds):
+            return None
+
+        zone, line_distance = self.in_out_detector.nearest_line(position)
+        event = BounceEvent(
+            x=float(position[0]),
+            y=float(position[1]),
+            timestamp=timestamp,
+            frame_number=frame_number,
+            call=self.in_out_detector.is_ball_in_court(position),
+            line_distance=line_distance,
+            zone=zone
+        )
+        if frame is not None and self.needs_refinement(position, detection):
+            self._refine_event(event, frame, detection)
+        self.bounce_events.append(event)
+        self.last_call = event
+        return event
+
+    def needs_refinement(self, position: Tuple[float, float],
+                         detection: Optional[BallDetection] = None) -> bool:
+        """Indique si un rebond est assez près d'une ligne pour être affiné"""
+        if self.refiner is None:
+            return False
+        # Déclenchement sur la détection brute du rebond: la position lissée
+        # en ligne est en retard sur la balle
+        trigger = (detection.x, detection.y) if detection is not None else position
+        return self.in_out_detector.distance_to_nearest_line(trigger) <= self.refinement_distance
+
+    def _refine_event(self, event: BounceEvent, frame: np.ndarray,
+                      detection: Optional[BallDetection]) -> None:
+        """Réévalue un appel serré au point de contact sous-pixel"""
+        seed = (detection.x, detection.y) if detection else (event.x, event.y)
+        refined = self.refiner.refine(frame, seed)
+        if refined is None:
+            return
+        contact = (refined.contact_x, refined.contact_y)
+        event.x, event.y = contact
+        event.call = self.in_out_detector.is_ball_in_court(contact)
+        event.zone, event.line_distance = self.in_out_detector.nearest_line(contact)
+        # Demi-largeur de l'intervalle de confiance à 95 %, en pixels
+        event.uncertainty = 1.96 * refined.sigma
+        event.refined = True
+
+    def reset(self) -> None:
+        """Oublie les rebonds déjà évalués"""
+        self.bounce_events.clear()
+        self.last_call = None
+
 if __name__ == "__main__":
     print("Tennis Hawk-Eye System v2.0")
     print("============================")
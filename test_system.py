@@ -11,15 +11,51 @@ import numpy as np
 import cv2
 import tempfile
 import os
+import json
+import threading
+import time
+import sqlite3
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 # Imports des modules à tester
 from tennis_hawkeye import (
     ConfigManager, BallTracker, CourtCalibrator, 
-    InOutDetector, BallDetection, CourtGeometry
+    InOutDetector, BallDetection, CourtGeometry, LineCallEngine, BounceEvent,
+    MultiBallTracker, linear_sum_assignment, FrameBufferPool, SubPixelRefiner, FrameClock
 )
 from ball_detector import HybridBallDetector, FallbackBallDetector
+from inference_client import (
+    ResilientInferenceClient, HostedInferenceTransport, CircuitBreaker,
+    CircuitOpenError, InferenceError, decode_ball_predictions
+)
 from court_setup import InteractiveCourtSetup
+from profiling import StageProfiler
+from demo import SyntheticRally
+from line_call_evaluation import score_calls, choose_fastest
+from frame_cache import FrameCache
+from checkpoint import CheckpointManager
+from event_store import EventStore
+from highlights import HighlightWriter
+from offline_smoothing import OfflineBounceDetector, affine_scan, rts_smooth, split_segments
+from reference_frame import ReferenceFrameBuilder, temporal_median
+from batch_runner import JobManifest, discover_jobs, job_key, run_batch
+from challenge_review import ChallengeReviewer
+from multi_camera import (
+    CameraCalibration, MultiCameraSystem, SINGLES_COURT_CORNERS, triangulate
+)
+
+def render_disc(shape, center, radius, background=60, value=220):
+    """Balle rendue par couverture exacte des pixels (sur-échantillonnage 16x)"""
+    scale = 16
+    big = np.full((shape[0] * scale, shape[1] * scale), background, dtype=np.uint8)
+    # Centre du pixel (i, j) en (i + 0.5) * scale - 0.5 dans l'image sur-échantillonnée
+    cv2.circle(big, (int(round((center[0] + 0.5) * scale - 0.5)),
+                     int(round((center[1] + 0.5) * scale - 0.5))),
+               int(round(radius * scale)), value, -1)
+    small = cv2.resize(big, (shape[1], shape[0]), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_GRAY2BGR)
 
 class TestConfigManager:
     """Tests pour le gestionnaire de configuration"""
@@ -93,6 +129,66 @@ class TestCourtGeometry:
         
         assert not geometry.is_valid()
 
+class TestFrameBufferPool:
+    """Tests pour le pool de buffers"""
+    
+    def test_buffer_reuse(self):
+        """Test de la réutilisation d'un buffer de même forme"""
+        pool = FrameBufferPool()
+        first = pool.get("output", (48, 64, 3))
+        second = pool.get("output", (48, 64, 3))
+        
+        assert first is second
+        assert pool.get_stats()["allocations"] == 1
+        assert pool.get_stats()["reuses"] == 1
+    
+    def test_buffer_reallocated_on_shape_change(self):
+        """Test de la réallocation quand la résolution change"""
+        pool = FrameBufferPool()
+        pool.get("fg_mask", (48, 64))
+        mask = pool.get("fg_mask", (96, 128))
+        
+        assert mask.shape == (96, 128)
+        assert pool.get_stats()["allocations"] == 2
+
+class TestFrameClock:
+    """Tests pour l'horodatage des frames"""
+    
+    def test_container_timestamps_at_ntsc_rate(self):
+        """Test des instants du conteneur à 29.97 FPS (pas de troncature à 29)"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "ntsc.mp4")
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 29.97, (64, 48))
+            for i in range(10):
+                writer.write(np.full((48, 64, 3), 20 * i, dtype=np.uint8))
+            writer.release()
+            
+            capture = cv2.VideoCapture(path)
+            clock = FrameClock(capture.get(cv2.CAP_PROP_FPS))
+            times = []
+            while capture.read()[0]:
+                times.append(clock.timestamp(capture, len(times)))
+            capture.release()
+        
+        assert len(times) == 10
+        assert times == pytest.approx([i / 29.97 for i in range(10)], abs=1e-3)
+    
+    def test_nominal_rate_without_container_timestamps(self):
+        """Test de l'extrapolation quand POS_MSEC est absent ou non croissant"""
+        class FakeCapture:
+            msec = 0.0
+            def get(self, prop):
+                return self.msec
+        
+        capture = FakeCapture()
+        clock = FrameClock(120.0)
+        assert [clock.timestamp(capture, i) for i in range(3)] == pytest.approx(
+            [0.0, 1 / 120, 2 / 120])
+        capture.msec = 100.0
+        assert clock.timestamp(capture, 3) == pytest.approx(0.1)
+        capture.msec = 50.0
+        assert clock.timestamp(capture, 4) == pytest.approx(0.1 + 1 / 120)
+
 class TestBallTracker:
     """Tests pour le tracker de balles"""
     
@@ -143,6 +239,77 @@ class TestBallTracker:
         # Le rebond devrait être détecté après 3 points
         bounce = self.tracker.detect_bounce()
         # Note: Le test peut nécessiter des ajustements selon l'algorithme exact
+    
+    def test_velocity_independent_of_frame_rate(self):
+        """Test d'une même vitesse physique à 30 et à 240 FPS"""
+        velocities = []
+        for fps in (30.0, 240.0):
+            tracker = BallTracker(self.config)
+            for i in range(int(fps)):
+                t = i / fps
+                tracker.add_detection(BallDetection(x=300.0 * t, y=100.0, confidence=0.9,
+                                                    timestamp=t, frame_number=i))
+            velocities.append(tracker.velocity[0])
+        
+        # 300 px/s, soit 10 px par frame de référence (30 FPS), au lissage près
+        assert velocities[1] == pytest.approx(10.0, rel=0.05)
+        assert velocities[0] == pytest.approx(10.0, rel=0.05)
+
+class TestMultiBallTracker:
+    """Tests pour le suivi multi-objets"""
+    
+    def setup_method(self):
+        """Configuration pour chaque test"""
+        self.config = ConfigManager()
+        self.config.set('detection.max_tracking_distance', 50)
+        self.config.set('detection.min_track_hits', 3)
+        self.config.set('detection.static_ball_speed', 2.0)
+        self.tracker = MultiBallTracker(self.config)
+    
+    def test_linear_sum_assignment_optimal(self):
+        """Test de l'affectation hongroise contre une recherche exhaustive"""
+        from itertools import permutations
+        rng = np.random.default_rng(0)
+        for shape in [(3, 3), (3, 5), (5, 3)]:
+            cost = rng.random(shape)
+            rows, cols = linear_sum_assignment(cost)
+            k = min(shape)
+            if shape[0] <= shape[1]:
+                best = min(cost[range(k), list(p)].sum()
+                           for p in permutations(range(shape[1]), k))
+            else:
+                best = min(cost[list(p), range(k)].sum()
+                           for p in permutations(range(shape[0]), k))
+            assert len(rows) == k
+            assert cost[rows, cols].sum() == pytest.approx(best)
+    
+    def test_rally_ball_preferred_over_spare_ball(self):
+        """Test que la balle immobile ne vole pas la piste de la balle de jeu"""
+        rally = None
+        for frame in range(6):
+            detections = [
+                BallDetection(x=10.0 + 10 * frame, y=100.0, confidence=0.6,
+                              timestamp=frame / 30, frame_number=frame),
+                BallDetection(x=30.0, y=105.0, confidence=0.9,
+                              timestamp=frame / 30, frame_number=frame)
+            ]
+            rally = self.tracker.update(detections, frame)
+        
+        assert rally is not None
+        assert rally.x == pytest.approx(60.0)
+        assert len(self.tracker.tracks) == 2
+    
+    def test_rally_ball_not_static_at_high_frame_rate(self):
+        """Test qu'une balle lente à 240 FPS (1.25 px par frame) reste en jeu"""
+        rally = None
+        for frame in range(8):
+            t = frame / 240
+            detections = [BallDetection(x=10.0 + 300.0 * t, y=100.0, confidence=0.9,
+                                        timestamp=t, frame_number=frame)]
+            rally = self.tracker.update(detections, frame)
+        
+        assert rally is not None
+        assert self.tracker.tracks[0].mean_speed == pytest.approx(10.0)
 
 class TestInOutDetector:
     """Tests pour le détecteur IN/OUT"""
@@ -181,6 +348,239 @@ class TestInOutDetector:
         # Point sur le bord (peut varier selon l'implémentation)
         border_result = self.detector._point_in_polygon((10, 5), polygon)
         assert isinstance(border_result, bool)
+    
+    def test_nearest_line_zone(self):
+        """Test de la ligne la plus proche et de sa zone"""
+        assert self.detector.nearest_line((50.0, -2.0)) == ("baseline", 2.0)
+        assert self.detector.nearest_line((102.0, 25.0)) == ("sideline", 2.0)
+        assert self.detector.nearest_line((50.0, 11.0)) == ("service_line", 1.0)
+
+class TestLineCallEngine:
+    """Tests pour le moteur d'appels aux rebonds"""
+    
+    def setup_method(self):
+        """Configuration pour chaque test"""
+        self.config = ConfigManager()
+        self.config.set('detection.bounce_debounce_seconds', 0.3)
+        geometry = CourtGeometry(
+            court_corners=[(0, 0), (100, 0), (100, 50), (0, 50)],
+            service_box_corners=[(20, 10), (80, 10), (80, 40), (20, 40)],
+            baseline_corners=[(10, 5), (90, 5), (90, 45), (10, 45)]
+        )
+        self.detector = InOutDetector(geometry)
+        self.engine = LineCallEngine(self.config, self.detector)
+    
+    def test_bounce_call_and_line_distance(self):
+        """Test de l'appel attaché au rebond avec la distance à la ligne"""
+        event = self.engine.evaluate_bounce((50.0, 25.0), 1.0, 30)
+        
+        assert event is not None
+        assert event.call == "IN"
+        assert event.line_distance == pytest.approx(15.0)
+        assert self.engine.last_call is event
+    
+    def test_bounce_debounce(self):
+        """Test de l'anti-rebond dans la fenêtre temporelle"""
+        assert self.engine.evaluate_bounce((50.0, 25.0), 1.0, 30) is not None
+        assert self.engine.evaluate_bounce((52.0, 25.0), 1.1, 33) is None
+        
+        event = self.engine.evaluate_bounce((150.0, 25.0), 1.5, 45)
+        assert event is not None
+        assert event.call == "OUT"
+        assert len(self.engine.bounce_events) == 2
+    
+    def test_distance_outside_court(self):
+        """Test de la distance pour un point hors du terrain"""
+        assert self.detector.distance_to_nearest_line((110.0, 25.0)) == pytest.approx(10.0)
+    
+    def test_close_call_refined(self):
+        """Test de l'affinage sous-pixel réservé aux rebonds proches d'une ligne"""
+        frame = render_disc((60, 120), (30.5, 42.0), 3.0)
+        
+        event = self.engine.evaluate_bounce((30.5, 42.0), 1.0, 30, frame=frame)
+        far = self.engine.evaluate_bounce((50.0, 25.0), 2.0, 60, frame=frame)
+        
+        assert event.refined
+        assert event.y == pytest.approx(45.0, abs=0.15)
+        assert 0 < event.uncertainty < 2.0
+        assert not far.refined
+        assert far.uncertainty is None
+    
+    def test_refinement_triggered_by_raw_detection(self):
+        """Test du déclenchement de l'affinage sur la détection brute, pas la position lissée"""
+        frame = render_disc((60, 120), (30.5, 42.0), 3.0)
+        raw = BallDetection(x=30.5, y=42.0, confidence=0.9, timestamp=1.0, frame_number=30)
+        lagged = BallDetection(x=50.0, y=25.0, confidence=0.9, timestamp=2.0, frame_number=60)
+        
+        # Position lissée loin des lignes, détection brute sur la ligne
+        close = self.engine.evaluate_bounce((36.0, 34.0), 1.0, 30, frame=frame, detection=raw)
+        # Position lissée près d'une ligne, détection brute au milieu du carré
+        far = self.engine.evaluate_bounce((50.0, 42.0), 2.0, 60, frame=frame, detection=lagged)
+        
+        assert close.refined
+        assert close.y == pytest.approx(45.0, abs=0.15)
+        assert not far.refined
+
+class TestSubPixelRefiner:
+    """Tests pour la localisation sous-pixel de la balle"""
+    
+    def test_subpixel_center_and_contact(self):
+        """Test du centre sous-pixel et du point de contact au sol"""
+        center = (40.3, 37.6)
+        frame = render_disc((80, 80), center, 5.0)
+        
+        refined = SubPixelRefiner(ConfigManager()).refine(frame, (41.0, 38.0))
+        
+        assert refined.x == pytest.approx(center[0], abs=0.1)
+        assert refined.y == pytest.approx(center[1], abs=0.1)
+        assert refined.contact_y == pytest.approx(center[1] + 5.0, abs=0.15)
+        assert refined.sigma < 1.0
+    
+    def test_flat_patch_not_refined(self):
+        """Test d'un patch sans balle"""
+        frame = np.full((80, 80, 3), 60, dtype=np.uint8)
+        
+        assert SubPixelRefiner(ConfigManager()).refine(frame, (40.0, 40.0)) is None
+
+class TestInteractiveCourtSetup:
+    """Tests pour l'aperçu réduit et la loupe de configuration du terrain"""
+    
+    def setup_method(self):
+        """Image 4K de référence avec un coin marqué"""
+        self.setup = InteractiveCourtSetup(ConfigManager())
+        self.setup.image = np.zeros((2160, 3840, 3), dtype=np.uint8)
+        self.setup.image[1234, 2345] = (255, 255, 255)
+        self.setup._prepare_preview()
+    
+    def test_preview_at_display_resolution(self):
+        """Test de l'aperçu réduit et du retour aux coordonnées complètes"""
+        assert self.setup.preview.shape[:2] == (900, 1600)
+        assert self.setup.display_scale == pytest.approx(1600 / 3840)
+        
+        x, y = self.setup._to_full_resolution(1599, 899)
+        assert 3837 <= x <= 3839 and 2157 <= y <= 2159
+        x, y = self.setup._to_full_resolution(977, 514)
+        assert abs(x - 2345) <= 2 and abs(y - 1234) <= 2
+        
+        zone = self.setup.zones["court_boundary"]
+        zone["points"] = [(0, 0), (3839, 0), (3839, 2159), (0, 2159)]
+        preview = self.setup._render_preview("court_boundary")
+        assert preview.shape == self.setup.preview.shape
+    
+    def test_loupe_click_is_pixel_accurate(self):
+        """Test de la loupe pleine résolution et d'un clic au pixel près"""
+        zone = self.setup.zones["court_boundary"]
+        loupe = self.setup._render_loupe((2343, 1236), zone)
+        zoom, radius = self.setup.loupe_zoom, self.setup.loupe_radius
+        assert loupe.shape[:2] == ((2 * radius + 1) * zoom,) * 2
+        
+        # Le pixel marqué est à (+2, -2) du curseur dans la loupe
+        cx, cy = (radius + 2) * zoom + 1, (radius - 2) * zoom + 1
+        assert loupe[cy, cx].tolist() == [255, 255, 255]
+        assert self.setup._loupe_to_full_resolution(cx, cy) == (2345, 1234)
+        
+        # Loupe au bord de l'image: zone hors image en noir
+        border = self.setup._render_loupe((0, 0), zone)
+        assert border.shape == loupe.shape
+
+class TestReferenceFrameBuilder:
+    """Tests pour l'image de référence extraite de la vidéo"""
+    
+    def make_video(self, path, frames=60):
+        """Terrain fixe traversé par un « joueur » (rectangle sombre mobile)"""
+        background = np.full((240, 320, 3), (60, 120, 60), dtype=np.uint8)
+        cv2.rectangle(background, (40, 30), (280, 210), (255, 255, 255), 2)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (320, 240))
+        for i in range(frames):
+            frame = background.copy()
+            x = 20 + (i * 7) % 260
+            cv2.rectangle(frame, (x, 20), (x + 30, 120), (20, 20, 20), -1)
+            writer.write(frame)
+        writer.release()
+        return background
+    
+    def test_reference_removes_moving_occluders(self):
+        """Test de la médiane temporelle sur un sous-ensemble de frames"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "match.avi")
+            background = self.make_video(path)
+            config = ConfigManager(str(Path(tmp) / "config.json"))
+            config.set('reference.reservoir_size', 20)
+            config.set('reference.preview_width', 160)
+            builder = ReferenceFrameBuilder(config)
+            reference = builder.build(path)
+        
+        assert reference.shape == background.shape
+        assert len(builder.samples) == 20
+        assert builder.samples[0].shape == (120, 160, 3)
+        error = np.abs(reference.astype(int) - background.astype(int))
+        assert np.percentile(error, 99) < 20
+    
+    def test_streaming_reservoir_is_bounded(self):
+        """Test de l'échantillonnage par réservoir sur un flux de longueur inconnue"""
+        config = ConfigManager()
+        config.set('reference.reservoir_size', 8)
+        builder = ReferenceFrameBuilder(config)
+        for i in range(200):
+            builder.add(np.full((4, 4, 3), i % 256, dtype=np.uint8), i)
+        assert len(builder.samples) == 8
+        assert builder.seen == 200
+        assert max(builder.frame_numbers) > 8
+        
+        stack = np.stack([np.full((2, 2, 3), v, np.uint8) for v in (5, 200, 7)])
+        assert temporal_median(stack)[0, 0, 0] == 7
+
+class TestOfflineSmoothing:
+    """Tests pour le lissage hors ligne des trajectoires"""
+    
+    def test_rts_has_no_lag(self):
+        """Test de l'absence de retard du lisseur sur un mouvement uniforme"""
+        rng = np.random.default_rng(0)
+        times = np.arange(60) / 30
+        truth = np.stack([100 + 300 * times, 50 + 150 * times], axis=1)
+        smoothed, velocity = rts_smooth(times, truth + rng.normal(0, 1.5, truth.shape),
+                                        1.0e4, 1.5)
+        
+        error = smoothed - truth
+        assert np.abs(error.mean(axis=0)).max() < 0.5
+        assert np.sqrt((error ** 2).mean()) < 1.0
+        assert np.allclose(velocity[30], [300, 150], atol=15)
+    
+    def test_affine_scan_matches_recurrence(self):
+        """Test du balayage préfixe contre la récurrence pas à pas"""
+        rng = np.random.default_rng(1)
+        A = rng.uniform(-0.9, 0.9, (37, 2, 2)) / 2
+        B = rng.normal(0, 1, (37, 2, 2))
+        X0 = rng.normal(0, 1, (2, 2))
+        scanned_A, scanned_B = affine_scan(A, B)
+        
+        X = X0
+        for i in range(len(A)):
+            X = A[i] @ X + B[i]
+            assert np.allclose(scanned_A[i] @ X0 + scanned_B[i], X)
+    
+    def test_segments_split_on_gaps_and_tracks(self):
+        """Test du découpage aux trous et aux changements de piste"""
+        times = np.array([0.0, 0.1, 0.2, 0.8, 0.9, 1.0])
+        ids = np.array([1, 1, 1, 1, 2, 2])
+        segments = split_segments(times, 0.2, ids)
+        assert [(s.start, s.stop) for s in segments] == [(0, 3), (3, 4), (4, 6)]
+    
+    def test_bounces_from_noisy_stream_with_gaps(self):
+        """Test des rebonds sur un flux bruité avec des frames manquantes"""
+        rally = SyntheticRally(duration=6, seed=5)
+        rng = np.random.default_rng(5)
+        detections = [
+            BallDetection(x=float(x + rng.normal(0, 1)), y=float(y + rng.normal(0, 1)),
+                          confidence=0.9, timestamp=i / rally.fps, frame_number=i)
+            for i, (x, y) in enumerate(rally.positions) if rng.random() > 0.15
+        ]
+        found = OfflineBounceDetector(ConfigManager()).detect(detections)
+        
+        for truth in rally.bounces:
+            matches = [p for p, d in found if abs(d.frame_number - truth["frame_number"]) <= 2]
+            assert matches
+            assert np.hypot(matches[0][0] - truth["x"], matches[0][1] - truth["y"]) < 5.0
 
 class TestFallbackBallDetector:
     """Tests pour le détecteur de secours OpenCV"""
@@ -205,6 +605,1135 @@ class TestFallbackBallDetector:
         
         # Le détecteur peut ou peut ne pas détecter selon les paramètres
         assert isinstance(detections, list)
+    
+    def test_processing_scale(self):
+        """Test du facteur de réduction selon la largeur de la frame"""
+        self.detector.scale = 1.0
+        self.detector.max_width = 1280
+        
+        assert self.detector.get_processing_scale(1280) == 1.0
+        assert self.detector.get_processing_scale(3840) == pytest.approx(1 / 3)
+    
+    def test_downscaled_detection_refined_at_full_resolution(self):
+        """Test de la détection réduite avec affinage à pleine résolution"""
+        self.config.set('detection.fallback_scale', 0.25)
+        detector = FallbackBallDetector(self.config)
+        background = np.full((960, 1280, 3), 60, dtype=np.uint8)
+        for frame_number in range(5):
+            detector.detect_balls_in_frame(background, frame_number, 0.0)
+        
+        frame = background.copy()
+        cv2.circle(frame, (641, 403), 12, (0, 255, 255), -1)
+        detections = detector.detect_balls_in_frame(frame, 5, 0.2)
+        
+        assert len(detections) == 1
+        assert detections[0].x == pytest.approx(641, abs=1.0)
+        assert detections[0].y == pytest.approx(403, abs=1.0)
+
+class FakeDetector:
+    """Détecteur factice retournant une réponse programmée"""
+    
+    def __init__(self, confidence=None):
+        self.confidence = confidence
+        self.calls = 0
+    
+    def is_available(self):
+        return True
+    
+    def get_stats(self):
+        return {}
+    
+    def detect_balls_in_frame(self, frame, frame_number, timestamp):
+        self.calls += 1
+        if self.confidence is None:
+            return []
+        return [BallDetection(x=10.0, y=10.0, confidence=self.confidence,
+                              timestamp=timestamp, frame_number=frame_number)]
+
+class TestHybridBallDetector:
+    """Tests pour l'arbitrage du détecteur hybride"""
+    
+    def setup_method(self):
+        """Configuration pour chaque test"""
+        self.config = ConfigManager()
+        self.config.set('detection.arbiter.health_window', 4)
+        self.config.set('detection.arbiter.probe_interval', 10)
+        self.detector = HybridBallDetector(self.config)
+        self.frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    
+    def test_no_escalation_while_tracking_confidently(self):
+        """Test que le détecteur coûteux n'est pas appelé pendant le suivi"""
+        self.detector.fallback_detector = FakeDetector(confidence=0.9)
+        self.detector.roboflow_detector = FakeDetector(confidence=0.9)
+        self.detector.notify_tracking(True)
+        
+        for frame_number in range(5):
+            self.detector.detect_balls_in_frame(self.frame, frame_number, 0.0)
+        
+        assert self.detector.roboflow_detector.calls == 0
+    
+    def test_escalation_when_tracking_lost(self):
+        """Test de l'escalade quand le suivi est perdu"""
+        self.detector.fallback_detector = FakeDetector(confidence=None)
+        self.detector.roboflow_detector = FakeDetector(confidence=0.8)
+        self.detector.notify_tracking(False)
+        
+        detections = self.detector.detect_balls_in_frame(self.frame, 0, 0.0)
+        
+        assert len(detections) == 1
+        assert self.detector.escalations == 1
+    
+    def test_primary_model_initialised_lazily(self):
+        """Test que la construction ne fait aucun appel réseau"""
+        detector = HybridBallDetector(self.config)
+        
+        assert detector.roboflow_detector._initialized is False
+        assert detector.roboflow_detector.client is None
+    
+    def test_hosted_client_built_without_sdk(self):
+        """Test que l'API hébergée n'a besoin que du client HTTP (SDK roboflow absent)"""
+        self.config.set('roboflow.api_key', 'cle-de-test')
+        self.config.set('roboflow.api_url', 'https://detect.roboflow.com')
+        detector = HybridBallDetector(self.config)
+        
+        assert detector.roboflow_detector.is_available()
+        assert detector.roboflow_detector.client is not None
+        assert not hasattr(detector.roboflow_detector, "model")
+        detector.roboflow_detector.cleanup()
+    
+    def test_fallback_backend_never_escalates(self):
+        """Test du mode secours seul"""
+        self.config.set('detection.backend', 'fallback')
+        detector = HybridBallDetector(self.config)
+        detector.fallback_detector = FakeDetector(confidence=None)
+        detector.roboflow_detector = FakeDetector(confidence=0.9)
+        
+        detector.detect_balls_in_frame(self.frame, 0, 0.0)
+        
+        assert detector.roboflow_detector.calls == 0
+    
+    def test_unhealthy_primary_is_probed_periodically(self):
+        """Test que le détecteur principal défaillant est sondé puis peut revenir"""
+        self.detector.fallback_detector = FakeDetector(confidence=None)
+        self.detector.roboflow_detector = FakeDetector(confidence=None)
+        
+        for frame_number in range(20):
+            self.detector.detect_balls_in_frame(self.frame, frame_number, 0.0)
+        
+        # 4 appels pour remplir la fenêtre, puis un sondage toutes les 10 frames
+        assert self.detector.roboflow_detector.calls == 5
+        assert self.detector.get_health_stats()["primary"]["recall"] == 0.0
+
+class FakeInferenceServer:
+    """Serveur d'inférence local injectant délais et erreurs"""
+    
+    def __init__(self, actions):
+        self.actions = list(actions)
+        self.requests = 0
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.requests += 1
+                action = server.actions.pop(0) if server.actions else ("ok", 0.0)
+                kind, value = action
+                if kind == "delay":
+                    time.sleep(value)
+                    kind = "ok"
+                if kind == "status":
+                    self.send_response(value)
+                    self.end_headers()
+                    return
+                body = json.dumps({"predictions": [
+                    {"x": 12.0, "y": 34.0, "confidence": 0.9, "class": "ball"}
+                ]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class TestResilientInferenceClient:
+    """Tests du client d'inférence contre un serveur local"""
+    
+    def make_client(self, server, **kwargs):
+        transport = HostedInferenceTransport(server.url, "tennis", 3, "key", 30, 60)
+        kwargs.setdefault("backoff", 0.0)
+        return ResilientInferenceClient(transport, **kwargs)
+    
+    def test_retry_after_server_error(self):
+        """Test d'une nouvelle tentative après une erreur 500"""
+        server = FakeInferenceServer([("status", 500)])
+        try:
+            client = self.make_client(server, max_retries=2)
+            result = client.predict(b"jpeg")
+            
+            assert result == [(12.0, 34.0, 0.9)]
+            assert server.requests == 2
+            stats = client.get_stats()["latency_by_status"]
+            assert stats["http_500"]["count"] == 1
+            assert stats["ok"]["count"] == 1
+        finally:
+            server.close()
+    
+    def test_timeout_is_not_retried_beyond_limit(self):
+        """Test du timeout par requête et des tentatives bornées"""
+        server = FakeInferenceServer([("delay", 0.5)] * 3)
+        try:
+            client = self.make_client(server, timeout=0.1, max_retries=1)
+            with pytest.raises(InferenceError) as error:
+                client.predict(b"jpeg")
+            
+            assert error.value.status == "timeout"
+            assert client.get_stats()["latency_by_status"]["timeout"]["count"] == 2
+        finally:
+            server.close()
+    
+    def test_decode_ball_predictions(self):
+        """Test du décodage direct des prédictions de balles"""
+        body = json.dumps({"predictions": [
+            {"x": 1, "y": 2, "confidence": 0.5, "class": "ball"},
+            {"x": 3, "y": 4, "confidence": 0.7, "class": "player"}
+        ]}).encode()
+        
+        assert decode_ball_predictions(body) == [(1.0, 2.0, 0.5)]
+        with pytest.raises(InferenceError):
+            decode_ball_predictions(b"not json")
+    
+    def test_client_error_not_retried(self):
+        """Test qu'une erreur 4xx n'est pas retentée"""
+        server = FakeInferenceServer([("status", 403)])
+        try:
+            client = self.make_client(server, max_retries=3)
+            with pytest.raises(InferenceError):
+                client.predict(b"jpeg")
+            assert server.requests == 1
+        finally:
+            server.close()
+    
+    def test_circuit_breaker_opens_and_recovers(self):
+        """Test de l'ouverture puis du réarmement du disjoncteur"""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0,
+                                 clock=lambda: now[0])
+        server = FakeInferenceServer([("status", 503)] * 2)
+        try:
+            client = self.make_client(server, max_retries=0, breaker=breaker)
+            for _ in range(2):
+                with pytest.raises(InferenceError):
+                    client.predict(b"jpeg")
+            
+            with pytest.raises(CircuitOpenError):
+                client.predict(b"jpeg")
+            assert server.requests == 2
+            
+            now[0] = 11.0
+            assert client.predict(b"jpeg")
+            assert breaker.state == CircuitBreaker.CLOSED
+        finally:
+            server.close()
+
+class TestColorFilter:
+    """Tests pour le filtre couleur du détecteur de secours"""
+    
+    def setup_method(self):
+        """Configuration pour chaque test"""
+        self.config = ConfigManager()
+        self.config.set('detection.color_filter.enabled', True)
+        self.config.set('detection.fallback_scale', 1.0)
+        self.detector = FallbackBallDetector(self.config)
+        background = np.full((480, 640, 3), 60, dtype=np.uint8)
+        for frame_number in range(5):
+            self.detector.detect_balls_in_frame(background, frame_number, 0.0)
+        self.background = background
+    
+    def test_color_gate_keeps_only_ball_colored_blobs(self):
+        """Test que seules les taches jaune-vert restent candidates"""
+        frame = self.background.copy()
+        cv2.circle(frame, (200, 240), 10, (0, 255, 255), -1)    # Balle jaune
+        cv2.circle(frame, (450, 240), 10, (255, 255, 255), -1)  # Tache blanche
+        
+        detections = self.detector.detect_balls_in_frame(frame, 5, 0.2)
+        
+        assert len(detections) == 1
+        assert detections[0].x == pytest.approx(200, abs=1.0)
+    
+    def test_color_range_learned_from_detection(self):
+        """Test de l'apprentissage de la plage HSV"""
+        frame = self.background.copy()
+        cv2.circle(frame, (200, 240), 10, (0, 230, 200), -1)
+        detection = BallDetection(x=200.0, y=240.0, confidence=0.9,
+                                  timestamp=0.2, frame_number=5)
+        lower_before = self.detector.hsv_lower.copy()
+        
+        self.detector.learn_ball_color(frame, detection)
+        
+        assert not np.array_equal(self.detector.hsv_lower, lower_before)
+
+class TestOverlayRenderer:
+    """Tests pour les calques de visualisation"""
+    
+    def setup_method(self):
+        """Configuration et terrain de test"""
+        self.config = ConfigManager()
+        self.geometry = CourtGeometry(
+            court_corners=[(20, 20), (300, 20), (300, 220), (20, 220)],
+            service_box_corners=[(60, 60), (260, 60), (260, 180), (60, 180)],
+            baseline_corners=[(40, 40), (280, 40), (280, 200), (40, 200)]
+        )
+    
+    def test_static_layer_matches_direct_drawing(self):
+        """Test du calque statique mis en cache contre le dessin direct"""
+        from overlay import OverlayRenderer
+        self.config.set('visualization.show_legend', False)
+        renderer = OverlayRenderer(self.config)
+        frame = np.full((240, 320, 3), 50, dtype=np.uint8)
+        
+        expected = frame.copy()
+        thickness = self.config.get('visualization.line_thickness', 2)
+        for polygon, color in ((self.geometry.court_corners, (0, 255, 0)),
+                               (self.geometry.service_box_corners, (0, 0, 255)),
+                               (self.geometry.baseline_corners, (255, 0, 0))):
+            cv2.polylines(expected, [np.array(polygon, np.int32)], True, color, thickness)
+        
+        for _ in range(3):
+            result = frame.copy()
+            renderer.render(result, self.geometry, None, "UNKNOWN", [])
+        assert np.array_equal(result, expected)
+        assert renderer.static_builds == 1
+        
+        # Nouvelle géométrie: calque reconstruit
+        self.geometry.court_corners = [(10, 10), (310, 10), (310, 230), (10, 230)]
+        renderer.render(frame.copy(), self.geometry, None, "UNKNOWN", [])
+        assert renderer.static_builds == 2
+    
+    def test_layers_toggled_by_config(self):
+        """Test de l'activation des calques par les clés visualization.*"""
+        from overlay import OverlayRenderer
+        for key in ('show_court_lines', 'show_legend', 'show_trajectory', 'show_call_banner'):
+            self.config.set(f'visualization.{key}', False)
+        renderer = OverlayRenderer(self.config)
+        frame = np.full((240, 320, 3), 50, dtype=np.uint8)
+        last_call = BounceEvent(x=100.0, y=100.0, timestamp=1.0, frame_number=30,
+                                call="IN", line_distance=5.0)
+        renderer.render(frame, self.geometry, None, "IN",
+                        [(30.0, 30.0), (90.0, 90.0)], last_call)
+        assert np.all(frame == 50)
+        
+        detection = BallDetection(x=160.0, y=120.0, confidence=0.9, timestamp=1.0,
+                                  frame_number=30)
+        renderer.render(frame, self.geometry, detection, "IN", [])
+        assert frame[120, 170].tolist() == [0, 255, 0]
+
+class TestStageProfiler:
+    """Tests pour l'instrumentation par étape"""
+    
+    def test_percentiles_per_stage(self):
+        """Test des percentiles glissants calculés par étape"""
+        profiler = StageProfiler(window=100)
+        for duration_ms in range(1, 101):
+            profiler.record("inference", 0, duration_ms * 1_000_000)
+        
+        summary = profiler.get_summary()["inference"]
+        assert summary["count"] == 100
+        assert summary["p50_ms"] == pytest.approx(50.5)
+        assert summary["p99_ms"] == pytest.approx(99.01)
+    
+    def test_span_and_chrome_trace(self):
+        """Test des spans et de l'export Chrome trace"""
+        profiler = StageProfiler(trace=True)
+        with profiler.span("drawing"):
+            pass
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_path = os.path.join(tmp, "trace.json")
+            profiler.write_chrome_trace(trace_path)
+            with open(trace_path) as f:
+                events = json.load(f)["traceEvents"]
+        
+        assert events[0]["name"] == "drawing"
+        assert events[0]["ph"] == "X"
+    
+    def test_disabled_profiler_records_nothing(self):
+        """Test du profilage désactivé"""
+        profiler = StageProfiler(enabled=False)
+        with profiler.span("decode"):
+            pass
+        assert profiler.get_summary() == {}
+
+class TestSyntheticRally:
+    """Tests pour le générateur d'échanges synthétiques"""
+    
+    def test_bounces_at_lowest_image_point(self):
+        """Test que chaque rebond est un minimum local de hauteur (maximum en y)"""
+        rally = SyntheticRally(duration=4, fps=30, seed=3)
+        
+        assert rally.bounces
+        for bounce in rally.bounces:
+            frame = bounce["frame_number"]
+            y = rally.positions[:, 1]
+            assert y[frame] >= y[frame - 1]
+            assert y[frame] >= y[frame + 1]
+            assert bounce["call"] in ("IN", "OUT")
+    
+    def test_resolution_scaling(self):
+        """Test de la mise à l'échelle de la géométrie et du rendu"""
+        rally = SyntheticRally(width=1200, height=800, duration=1, noise=3.0)
+        frame = rally.render_frame(0)
+        
+        assert frame.shape == (800, 1200, 3)
+        assert rally.geometry.court_corners[2] == (1100, 700)
+
+class TestLineCallEvaluation:
+    """Tests pour l'évaluation des appels contre la vérité terrain"""
+    
+    def test_score_calls(self):
+        """Test de l'association des rebonds et des métriques"""
+        truth = [
+            {"timestamp": 1.0, "x": 100.0, "y": 100.0, "call": "IN"},
+            {"timestamp": 2.0, "x": 200.0, "y": 100.0, "call": "OUT"},
+            {"timestamp": 3.0, "x": 300.0, "y": 100.0, "call": "IN"}
+        ]
+        predicted = [
+            BounceEvent(x=103.0, y=104.0, timestamp=1.05, frame_number=31,
+                        call="IN", line_distance=5.0),
+            BounceEvent(x=200.0, y=100.0, timestamp=2.1, frame_number=63,
+                        call="IN", line_distance=1.0),
+            BounceEvent(x=0.0, y=0.0, timestamp=5.0, frame_number=150,
+                        call="OUT", line_distance=9.0)
+        ]
+        
+        scores = score_calls(predicted, truth, max_dt=0.2)
+        
+        assert scores["matched_bounces"] == 2
+        assert scores["call_accuracy"] == pytest.approx(1 / 3)
+        assert scores["matched_call_accuracy"] == pytest.approx(0.5)
+        assert scores["timing_error_ms"] == pytest.approx(75.0)
+        assert scores["pixel_error_mean"] == pytest.approx(2.5)
+    
+    def test_choose_fastest_without_losing_calls(self):
+        """Test du choix du réglage le plus rapide à précision égale"""
+        report = [
+            {"name": "full", "fps": 20.0, "call_accuracy": 0.9, "bounce_recall": 0.9},
+            {"name": "downscaled", "fps": 60.0, "call_accuracy": 0.9, "bounce_recall": 0.9},
+            {"name": "aggressive", "fps": 120.0, "call_accuracy": 0.7, "bounce_recall": 0.8}
+        ]
+        
+        assert choose_fastest(report)["name"] == "downscaled"
+        assert choose_fastest(report, max_accuracy_loss=0.25)["name"] == "aggressive"
+    
+    def test_no_recommendation_without_correct_calls(self):
+        """Test du refus de recommander un réglage quand aucun appel n'est correct"""
+        report = [
+            {"name": "full", "fps": 20.0, "call_accuracy": 0.0, "bounce_recall": 0.0},
+            {"name": "downscaled", "fps": 60.0, "call_accuracy": 0.0, "bounce_recall": 0.2}
+        ]
+        
+        assert choose_fastest(report) is None
+
+class TestFrameCache:
+    """Tests pour le cache disque de frames décodées"""
+    
+    def _write_video(self, directory, name, frames=10):
+        """Écrit une courte vidéo synthétique"""
+        rally = SyntheticRally(width=160, height=120, duration=frames / 30, noise=0.0)
+        path = str(Path(directory) / name)
+        rally.write_video(path)
+        return path
+    
+    def test_second_pass_served_from_cache(self):
+        """Test du remplissage puis de la relecture sans décodage"""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = self._write_video(tmp, "a.mp4")
+            cache = FrameCache(str(Path(tmp) / "cache"), quota_bytes=10 * 1024 ** 2)
+            
+            capture = cache.open_capture(video)
+            first = []
+            while True:
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                first.append(frame.copy())
+            capture.release()
+            
+            capture = cache.open_capture(video)
+            assert capture.cached_frames == len(first)
+            capture.set(cv2.CAP_PROP_POS_FRAMES, 5)
+            ret, frame = capture.read()
+            
+            assert ret
+            assert np.array_equal(frame, first[5])
+            assert not frame.flags.writeable
+            assert np.shares_memory(frame, capture.frames)
+            assert capture._capture is None
+            
+            # Tampon de l'appelant: copie modifiable, comme cv2.VideoCapture
+            buffer = np.zeros_like(first[6])
+            ret, frame = capture.read(image=buffer)
+            assert frame is buffer and frame.flags.writeable
+            assert np.array_equal(buffer, first[6])
+            capture.release()
+    
+    def test_entry_follows_real_frame_count(self):
+        """Test d'une estimation du nombre de frames trop basse puis trop haute"""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = self._write_video(tmp, "a.mp4")
+            cache = FrameCache(str(Path(tmp) / "cache"), quota_bytes=10 * 1024 ** 2)
+            cache.open_capture(video).release()
+            entry_dir, index = cache.entries()[0]
+            frame_bytes = 160 * 120 * 3
+            
+            for estimate in (6, 14):
+                index.update(capacity=estimate, frames_cached=0, complete=False)
+                cache.write_index(entry_dir, index)
+                with open(entry_dir / "frames.raw", "r+b") as f:
+                    f.truncate(estimate * frame_bytes)
+                cache.create_timestamps(entry_dir, estimate)
+                
+                capture = cache.open_capture(video)
+                frames = 0
+                while capture.read()[0]:
+                    frames += 1
+                capture.release()
+                
+                capture = cache.open_capture(video)
+                assert frames == 10
+                assert capture.index["complete"]
+                assert capture.cached_frames == capture.index["capacity"] == 10
+                assert (entry_dir / "frames.raw").stat().st_size == 10 * frame_bytes
+                assert capture.get(cv2.CAP_PROP_FRAME_COUNT) == 10
+                capture.release()
+    
+    def test_container_timestamps_served_from_cache(self):
+        """Test des instants de présentation conservés avec les frames"""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = self._write_video(tmp, "a.mp4")
+            cache = FrameCache(str(Path(tmp) / "cache"), quota_bytes=10 * 1024 ** 2)
+            
+            capture = cache.open_capture(video)
+            decoded = []
+            while capture.read()[0]:
+                decoded.append(capture.get(cv2.CAP_PROP_POS_MSEC))
+            capture.release()
+            
+            capture = cache.open_capture(video)
+            capture.set(cv2.CAP_PROP_POS_FRAMES, 4)
+            capture.read()
+            
+            assert decoded == pytest.approx([i * 1000 / 30 for i in range(len(decoded))])
+            assert capture.get(cv2.CAP_PROP_POS_MSEC) == pytest.approx(decoded[4])
+            assert capture._capture is None
+            capture.release()
+    
+    def test_lru_eviction_within_quota(self):
+        """Test de l'éviction de la vidéo la moins récemment utilisée"""
+        with tempfile.TemporaryDirectory() as tmp:
+            first = self._write_video(tmp, "a.mp4")
+            second = self._write_video(tmp, "b.mp4")
+            cache = FrameCache(str(Path(tmp) / "cache"), quota_bytes=10 * 160 * 120 * 3 + 1)
+            
+            cache.open_capture(first).release()
+            cache.open_capture(second).release()
+            
+            sources = [index["source"] for _, index in cache.entries()]
+            assert sources == [os.path.abspath(second)]
+    
+    def test_video_over_quota_not_cached(self):
+        """Test du repli sur cv2.VideoCapture au-delà du quota"""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = self._write_video(tmp, "a.mp4")
+            cache = FrameCache(str(Path(tmp) / "cache"), quota_bytes=1024)
+            
+            capture = cache.open_capture(video)
+            
+            assert isinstance(capture, cv2.VideoCapture)
+            capture.release()
+
+class TestChallengeReviewer:
+    """Tests pour la revue de challenge autour d'un rebond"""
+    
+    def test_find_bounces_at_lowest_point(self):
+        """Test de la détection hors ligne du rebond au point le plus bas"""
+        rally = SyntheticRally(duration=2, seed=3)
+        reviewer = ChallengeReviewer(ConfigManager(), rally.geometry)
+        track = [
+            BallDetection(x=float(x), y=float(y), confidence=0.9,
+                          timestamp=i / 30, frame_number=i)
+            for i, (x, y) in enumerate(rally.positions)
+        ]
+        
+        found = reviewer._find_bounces(track)
+        
+        assert [d.frame_number for _, d in found] == [b["frame_number"] for b in rally.bounces]
+        for (x, y), truth in zip((p for p, _ in found), rally.bounces):
+            assert np.hypot(x - truth["x"], y - truth["y"]) < 2.0
+    
+    def test_review_decodes_only_window(self):
+        """Test de l'accès direct et du replay ralenti de la fenêtre"""
+        with tempfile.TemporaryDirectory() as tmp:
+            rally = SyntheticRally(width=320, height=240, duration=6, noise=0.0)
+            video = str(Path(tmp) / "rally.mp4")
+            rally.write_video(video)
+            replay = str(Path(tmp) / "replay.mp4")
+            config = ConfigManager()
+            config.set('roboflow.api_key', '')
+            bounce = rally.bounces[-1]
+            event = BounceEvent(x=bounce["x"], y=bounce["y"], timestamp=bounce["timestamp"],
+                                frame_number=bounce["frame_number"], call="IN",
+                                line_distance=0.0)
+            
+            result = ChallengeReviewer(config, rally.geometry).review(video, event, replay)
+            
+            assert result["frames_decoded"] <= 2 * 30 + 15 + 1
+            assert result["original_call"] == "IN"
+            assert result["call"] in ("IN", "OUT", "UNKNOWN")
+            capture = cv2.VideoCapture(replay)
+            assert capture.get(cv2.CAP_PROP_FPS) == pytest.approx(30 / 4)
+            assert capture.get(cv2.CAP_PROP_FRAME_WIDTH) == 320
+            capture.release()
+
+def look_at_camera(center, focal=1000.0, size=(1280, 720)):
+    """Caméra synthétique placée en center et visant le centre du terrain"""
+    center = np.asarray(center, dtype=np.float64)
+    forward = -center / np.linalg.norm(center)
+    right = np.cross(forward, [0.0, 0.0, 1.0])
+    right /= np.linalg.norm(right)
+    rotation = np.vstack([right, np.cross(forward, right), forward])
+    camera_matrix = np.array([[focal, 0, size[0] / 2], [0, focal, size[1] / 2], [0, 0, 1]])
+    return CameraCalibration("synthetic", camera_matrix,
+                             cv2.Rodrigues(rotation)[0].ravel(), -rotation @ center)
+
+class TestMultiCamera:
+    """Tests pour la fusion multi-caméras et la triangulation"""
+    
+    def setup_method(self):
+        """Deux caméras synthétiques calibrées sur les coins du terrain"""
+        self.cameras = [look_at_camera((0, -25, 8)), look_at_camera((18, 2, 6))]
+        corners = np.array([(x, y, 0.0) for x, y in SINGLES_COURT_CORNERS])
+        self.config = ConfigManager()
+        self.config.set('multi_camera.cameras', [
+            {"name": f"cam{i}", "court_corners": camera.project(corners).tolist(),
+             "image_size": [1280, 720], "time_offset": 0.0}
+            for i, camera in enumerate(self.cameras)
+        ])
+        self.system = MultiCameraSystem(self.config)
+    
+    def _trajectory(self, times, bounce_time=0.8, bounce_xy=(3.9, 4.0)):
+        """Vol parabolique avec rebond au sol à bounce_time"""
+        dt = np.asarray(times) - bounce_time
+        vz = np.where(dt >= 0, 4.0, -5.0)
+        z = 0.033 + vz * dt - 0.5 * 9.81 * dt ** 2
+        return np.column_stack([bounce_xy[0] + 1.5 * dt, bounce_xy[1] + 12.0 * dt, z])
+    
+    def test_calibration_from_court_corners(self):
+        """Test de la focale et de la pose retrouvées depuis quatre coins"""
+        assert self.system.calibrate()
+        points = np.random.default_rng(0).uniform([-5, -12, 0], [5, 12, 3], (50, 3))
+        
+        for camera, calibration in zip(self.cameras, self.system.calibrations):
+            assert calibration.camera_matrix[0, 0] == pytest.approx(1000.0, rel=1e-3)
+            assert np.abs(camera.project(points) - calibration.project(points)).max() < 0.01
+    
+    def test_triangulation_with_missing_views(self):
+        """Test de la DLT vectorisée avec une vue manquante"""
+        points_3d = self._trajectory(np.linspace(0, 1.5, 20))
+        projections = np.stack([c.projection for c in self.cameras])
+        observed = np.stack([c.project(points_3d) for c in self.cameras], axis=1)
+        observed[5, 1] = np.nan
+        
+        positions, valid = triangulate(projections, observed)
+        
+        assert not valid[5]
+        assert np.abs(positions[valid] - points_3d[valid]).max() < 1e-6
+    
+    def test_time_aligned_bounce_uses_height(self):
+        """Test de l'alignement temporel et du rebond détecté sur la hauteur"""
+        self.system.cameras[1]["time_offset"] = 0.013
+        assert self.system.calibrate()
+        
+        # La caméra 2 déclenche 10 ms plus tard et son horloge retarde de 13 ms
+        times = np.arange(0, 1.6, 1 / 50)
+        frames = 100 + np.arange(len(times))
+        confidence = np.full(len(times), 0.9)
+        streams = [
+            np.column_stack([times, self.cameras[0].project(self._trajectory(times)),
+                             confidence, frames]),
+            np.column_stack([times + 0.01 - 0.013,
+                             self.cameras[1].project(self._trajectory(times + 0.01)),
+                             confidence, frames])
+        ]
+        
+        fused_times, frame_numbers, positions, valid = self.system.fuse(streams)
+        events = self.system.detect_bounces(fused_times, frame_numbers, positions, valid)
+        
+        truth = self._trajectory(fused_times[valid])
+        assert np.abs(positions[valid] - truth).max() < 0.05
+        assert len(events) == 1
+        assert events[0].timestamp == pytest.approx(0.8, abs=0.021)
+        # Numéro de frame de la vidéo de référence, pas l'indice de l'échantillon
+        assert abs(events[0].frame_number - 140) <= 1
+        assert events[0].call == "IN"
+        assert events[0].line_distance == pytest.approx(0.215, abs=0.05)
+    
+    def test_noisy_height_gives_one_bounce(self):
+        """Test de l'anti-rebond sur une hauteur triangulée bruitée près du sol"""
+        times = np.arange(0, 1.6, 1 / 100)
+        positions = self._trajectory(times)
+        positions[:, 2] += np.random.default_rng(0).normal(0, 0.03, len(times))
+        frames = np.arange(len(times))
+        
+        events = self.system.detect_bounces(times, frames, positions,
+                                            np.ones(len(times), dtype=bool))
+        
+        assert len(events) == 1
+        assert events[0].timestamp == pytest.approx(0.8, abs=0.05)
+    
+    def test_events_stored_in_metres(self):
+        """Test de l'enregistrement des rebonds multi-caméras dans la base"""
+        event = BounceEvent(x=3.9, y=4.0, timestamp=0.8, frame_number=140,
+                            call="IN", line_distance=0.215, zone="sideline")
+        with tempfile.TemporaryDirectory() as tmp:
+            self.config.set('event_store.path', str(Path(tmp) / "events.db"))
+            match_id = self.system.store_events([event])
+            
+            store = EventStore(str(Path(tmp) / "events.db"))
+            stored = store.query_bounces(match_id=match_id)
+            assert [(b["frame_number"], b["distance_unit"], b["source"]) for b in stored] == \
+                [(140, "m", "multi_camera")]
+            assert store.match_stats(match_id)["in_calls"] == 1.0
+            store.close()
+
+class TestRallyLineCalls:
+    """Tests de bout en bout des appels au rebond sur un échange synthétique"""
+    
+    def test_bounces_called_through_process_frame(self):
+        """Test que les rebonds de l'échange produisent des appels IN/OUT"""
+        from main_hawkeye import TennisHawkEyeSystem
+        from line_call_evaluation import make_offline_config
+        
+        class NoTimestampCapture:
+            """Capture sans timestamps de conteneur: instants à la cadence nominale"""
+            def get(self, prop):
+                return 0.0
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            rally = SyntheticRally(duration=10, noise=0.0, seed=0)
+            config = make_offline_config({})
+            config.config_path = str(Path(tmp) / "config.json")
+            config.save_config()
+            system = TennisHawkEyeSystem(config.config_path)
+            system.set_court_geometry(rally.geometry)
+            system.video_capture = NoTimestampCapture()
+            
+            for frame_number in range(rally.total_frames):
+                system.frame_count = frame_number
+                system._process_frame(rally.render_frame(frame_number))
+        
+        scores = score_calls(system.line_call_engine.bounce_events, rally.bounces)
+        assert system.stats["bounces_detected"] > 0
+        assert scores["bounce_recall"] >= 0.5
+        assert scores["call_accuracy"] >= 0.4
+
+    def test_offline_close_calls_refined_on_bounce_frame(self):
+        """Test de l'affinage des appels hors ligne serrés sur l'image relue du rebond"""
+        from main_hawkeye import TennisHawkEyeSystem
+        from line_call_evaluation import make_offline_config
+        
+        rally = SyntheticRally(duration=10, noise=0.0, seed=0)
+        
+        class RallyCapture:
+            """Capture synthétique qui mémorise les images relues"""
+            def __init__(self):
+                self.position = 0
+                self.reads = []
+            def set(self, prop, value):
+                self.position = int(value)
+            def read(self, image=None):
+                self.reads.append(self.position)
+                frame = rally.render_frame(self.position)
+                self.position += 1
+                return True, frame
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            config = make_offline_config({})
+            config.config_path = str(Path(tmp) / "config.json")
+            config.save_config()
+            system = TennisHawkEyeSystem(config.config_path)
+        system.set_court_geometry(rally.geometry)
+        system.video_capture = RallyCapture()
+        system.rally_detections = [
+            (1, BallDetection(x=float(x), y=float(y), confidence=0.9,
+                              timestamp=i / rally.fps, frame_number=i))
+            for i, (x, y) in enumerate(rally.positions)
+        ]
+        system._offline_line_calls()
+        
+        refined = [e.frame_number for e in system.offline_events if e.refined]
+        assert refined
+        # Seules les images des appels serrés sont relues
+        assert system.video_capture.reads == refined
+        assert len(refined) < len(system.offline_events)
+
+class TestCheckpoint:
+    """Tests pour les points de reprise du traitement vidéo"""
+    
+    def test_resume_after_crash(self):
+        """Test de la reprise au dernier point sauvegardé et de l'assemblage final"""
+        from main_hawkeye import TennisHawkEyeSystem
+        from line_call_evaluation import make_offline_config
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            rally = SyntheticRally(width=320, height=240, duration=4, noise=0.0)
+            video = str(Path(tmp) / "rally.mp4")
+            output = str(Path(tmp) / "output.mp4")
+            rally.write_video(video)
+            config = make_offline_config({"checkpoint.enabled": True,
+                                          "checkpoint.interval_seconds": 1.0})
+            config.config_path = str(Path(tmp) / "config.json")
+            config.save_config()
+            
+            # Interruption à la frame 70: dernier point de reprise à la frame 60
+            crashed = TennisHawkEyeSystem(config.config_path)
+            crashed.set_court_geometry(rally.geometry)
+            process_frame = crashed._process_frame
+            def failing_process_frame(frame):
+                if crashed.frame_count == 70:
+                    raise RuntimeError("interruption")
+                return process_frame(frame)
+            crashed._process_frame = failing_process_frame
+            
+            assert not crashed.process_video(video, output)
+            state = CheckpointManager(output).load()
+            assert state["frame_count"] == 60
+            assert len(state["segments"]) == 2
+            # Détections ajoutées au fichier annexe, pas réécrites dans l'état
+            assert "rally_detections" not in state
+            assert Path(f"{output}.detections").stat().st_size == state["detections_size"]
+            
+            resumed = TennisHawkEyeSystem(config.config_path)
+            assert resumed.resume_video(output)
+            
+            uninterrupted = TennisHawkEyeSystem(config.config_path)
+            uninterrupted.set_court_geometry(rally.geometry)
+            assert uninterrupted.process_video(video, str(Path(tmp) / "full.mp4"))
+            
+            assert resumed.stats["total_frames"] == 120
+            # Détections relues du fichier annexe avant le point de reprise, et
+            # identiques après grâce au réchauffage du détecteur
+            assert ([(d.frame_number, d.x, d.y) for _, d in resumed.rally_detections] ==
+                    [(d.frame_number, d.x, d.y) for _, d in uninterrupted.rally_detections])
+            assert resumed.stats["balls_detected"] == uninterrupted.stats["balls_detected"]
+            def calls(events):
+                return [(e.frame_number, e.call) for e in events]
+            assert (calls(resumed.line_call_engine.bounce_events) ==
+                    calls(uninterrupted.line_call_engine.bounce_events))
+            assert calls(resumed.offline_events) == calls(uninterrupted.offline_events)
+            assert uninterrupted.offline_events
+            assert not Path(f"{output}.detections").exists()
+            # Profilage par étape sur demande seulement
+            assert not Path(f"{output}.profile.json").exists()
+            assert not Path(f"{output}.checkpoint").exists()
+            assert not Path(f"{output}.segments").exists()
+            capture = cv2.VideoCapture(output)
+            assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 120
+            capture.release()
+
+    def test_detections_after_checkpoint_are_truncated(self):
+        """Test de la troncature des détections écrites après le dernier point"""
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = CheckpointManager(str(Path(tmp) / "output.mp4"))
+            size = checkpoint.append_detections([1, 2])
+            assert checkpoint.append_detections([3]) > size
+            
+            assert checkpoint.load_detections(size) == [1, 2]
+            assert checkpoint.append_detections([4]) > size
+            assert checkpoint.load_detections(checkpoint.detections_path.stat().st_size) == [1, 2, 4]
+
+class TestHighlightWriter:
+    """Tests pour la sortie en mode résumé"""
+    
+    def test_clips_around_bounces_with_index(self):
+        """Test du pré-roll, du post-roll et de la fusion des rebonds rapprochés"""
+        def bounce(frame_number):
+            return BounceEvent(x=10.0, y=10.0, timestamp=frame_number / 10,
+                               frame_number=frame_number, call="IN", line_distance=3.0)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            output = str(Path(tmp) / "match.mp4")
+            writer = HighlightWriter(output, 10.0, (64, 48), pre_roll_seconds=1.0,
+                                     post_roll_seconds=1.0, video_path="match_src.mp4")
+            # Rebonds confirmés avec quelques frames de retard, comme le tracker
+            confirmations = {33: 30, 40: 38, 83: 80}
+            for n in range(100):
+                if n in confirmations:
+                    writer.trigger(bounce(confirmations[n]))
+                writer.write(np.full((48, 64, 3), 50 + 2 * n, dtype=np.uint8), n)
+            writer.close()
+            
+            with open(writer.index_path) as f:
+                index = json.load(f)
+            clips = index["clips"]
+            assert [(c["start_frame"], c["end_frame"]) for c in clips] == [(20, 48), (70, 90)]
+            assert [len(c["events"]) for c in clips] == [2, 1]
+            assert index["frames_written"] == 50
+            assert index["video"] == "match_src.mp4"
+            
+            capture = cv2.VideoCapture(str(writer.directory / clips[0]["file"]))
+            frames = []
+            while True:
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                frames.append((frame.mean() - 50) / 2)
+            capture.release()
+            assert len(frames) == 29
+            assert abs(frames[0] - 20) < 2 and abs(frames[-1] - 48) < 2
+    
+    def test_4k_pre_roll_stays_within_memory_limit(self):
+        """Test du tampon de pré-roll 4K: encodé et borné en octets"""
+        import tracemalloc
+        
+        width, height, fps = 3840, 2160, 30.0
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        frame[:] = np.linspace(40, 120, width, dtype=np.uint8)[None, :, None]
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = HighlightWriter(str(Path(tmp) / "match.mp4"), fps, (width, height),
+                                     pre_roll_seconds=1.0, max_ring_mb=8)
+            raw_ring = writer.capacity * frame.nbytes
+            
+            tracemalloc.start()
+            for n in range(writer.capacity + 5):
+                frame[height // 2 - 20:height // 2 + 20, :] = n * 5
+                writer.write(frame, n)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            
+            # Tampon brut: ~1 Go; limite d'un processus de lot bien en dessous
+            assert raw_ring > 900 * 1024 * 1024
+            assert writer.ring_bytes <= 8 * 1024 * 1024
+            assert peak < 64 * 1024 * 1024
+            assert writer.ring[-1][0] == writer.capacity + 4
+
+def crashing_job(key, job):
+    """Tâche de test: le processus de travail meurt sur les vidéos 'crash'"""
+    if "crash" in Path(job["video"]).name:
+        os._exit(1)
+    return {"key": key, "status": "done", "elapsed": 0.0}
+
+def dying_case():
+    """Cas de benchmark de test: le processus meurt sans résultat"""
+    os._exit(3)
+
+def stalled_case():
+    """Cas de benchmark de test: le processus ne rend jamais la main"""
+    time.sleep(60)
+    return {}
+
+class TestBenchmarks:
+    """Tests pour l'isolation des cas de benchmark"""
+    
+    def setup_method(self):
+        """Import du script de benchmarks"""
+        import sys
+        sys.path.insert(0, str(Path(__file__).resolve().parent / "benchmarks"))
+        import run_benchmarks
+        self.benchmarks = run_benchmarks
+    
+    def test_dead_case_recorded_as_error(self):
+        """Test qu'un processus de cas mort est signalé au lieu de bloquer la suite"""
+        result = self.benchmarks.run_case(dying_case, timeout=60)
+        assert "code 3" in result["error"]
+    
+    def test_stalled_case_terminated(self):
+        """Test de l'arrêt d'un cas qui dépasse son délai, compté comme régression"""
+        start = time.monotonic()
+        result = {"name": "in_out", "kind": "in_out",
+                  **self.benchmarks.run_case(stalled_case, timeout=2)}
+        assert time.monotonic() - start < 30
+        assert "error" in result
+        
+        baseline = {"results": [{"name": "in_out", "classify_per_second": 1000.0}]}
+        assert self.benchmarks.compare({"results": [result]}, baseline, 0.1) == ["in_out"]
+
+class TestBatchRunner:
+    """Tests pour le traitement par lots"""
+    
+    def test_outputs_mirror_relative_paths(self):
+        """Test que deux vidéos de même nom dans deux jours ont des sorties distinctes"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for day in ("day1", "day2"):
+                (Path(tmp) / "videos" / day).mkdir(parents=True)
+                (Path(tmp) / "videos" / day / "match1.mp4").write_bytes(b"")
+            
+            jobs = discover_jobs(str(Path(tmp) / "videos"), "profile.json", "out")
+            
+            assert sorted(job["output"] for job in jobs) == [
+                str(Path("out") / "day1" / "match1_hawkeye.mp4"),
+                str(Path("out") / "day2" / "match1_hawkeye.mp4")
+            ]
+    
+    def test_killed_worker_fails_only_its_job(self, caplog):
+        """Test qu'un processus tué marque sa tâche en échec sans bloquer le lot"""
+        with tempfile.TemporaryDirectory() as tmp:
+            jobs = []
+            for name in ("a.mp4", "crash.mp4", "b.mp4", "c.mp4", "d.mp4", "e.mp4"):
+                video = Path(tmp) / name
+                video.write_bytes(b"")
+                jobs.append({"video": str(video), "profile": "profile.json",
+                             "output": str(Path(tmp) / f"{video.stem}_out.mp4")})
+            manifest = JobManifest(str(Path(tmp) / "manifest.json"))
+            
+            with caplog.at_level(logging.WARNING, logger="batch_runner"):
+                summary = run_batch(jobs, manifest, workers=2, runner=crashing_job)
+            
+            assert summary == {"done": 5, "failed": 1}
+            assert manifest.jobs[job_key(jobs[1])]["status"] == "failed"
+            # Seules les tâches en cours lors de la casse du pool sont relancées seules
+            isolated = [r for r in caplog.records if "relance isolée" in r.getMessage()]
+            assert 1 <= len(isolated) <= 2
+    
+    def test_batch_records_and_skips_done_jobs(self):
+        """Test du manifeste des tâches et de l'absence de retraitement"""
+        from line_call_evaluation import make_offline_config
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            videos = Path(tmp) / "videos"
+            videos.mkdir()
+            for seed in (0, 1):
+                rally = SyntheticRally(width=160, height=120, duration=1, seed=seed)
+                rally.write_video(str(videos / f"rally_{seed}.mp4"))
+            (videos / "notes.txt").write_text("ignoré")
+            profile = make_offline_config({
+                "court.court_corners": rally.geometry.court_corners,
+                "court.service_box_corners": rally.geometry.service_box_corners,
+                "court.baseline_corners": rally.geometry.baseline_corners
+            })
+            profile.config_path = str(Path(tmp) / "profile.json")
+            profile.save_config()
+            
+            jobs = discover_jobs(str(videos), profile.config_path, str(Path(tmp) / "out"))
+            manifest = JobManifest(str(Path(tmp) / "out" / "manifest.json"))
+            summary = run_batch(jobs, manifest, workers=2)
+            
+            assert len(jobs) == 2
+            assert summary == {"done": 2}
+            for job in jobs:
+                entry = manifest.jobs[job_key(job)]
+                assert entry["frames"] == 30
+                assert entry["elapsed"] > 0
+                assert Path(job["output"]).exists()
+            
+            reloaded = JobManifest(manifest.path)
+            started = {k: v["started"] for k, v in reloaded.jobs.items()}
+            assert run_batch(jobs, reloaded, workers=2) == {"done": 2}
+            assert {k: v["started"] for k, v in reloaded.jobs.items()} == started
+
+class TestEventStore:
+    """Tests pour la base d'événements de match"""
+    
+    def test_store_closed_after_processing(self):
+        """Test que le thread d'écriture et la connexion sont fermés en fin de traitement"""
+        from main_hawkeye import TennisHawkEyeSystem
+        from line_call_evaluation import make_offline_config
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            rally = SyntheticRally(width=160, height=120, duration=1, noise=0.0)
+            video = str(Path(tmp) / "rally.mp4")
+            rally.write_video(video)
+            config = make_offline_config({"event_store.enabled": True,
+                                          "event_store.path": str(Path(tmp) / "events.db")})
+            config.config_path = str(Path(tmp) / "config.json")
+            config.save_config()
+            system = TennisHawkEyeSystem(config.config_path)
+            system.set_court_geometry(rally.geometry)
+            
+            assert system.process_video(video, str(Path(tmp) / "output.mp4"))
+            
+            assert system.event_store is None
+            assert not any(t.name == "event-store-writer" and t.is_alive()
+                           for t in threading.enumerate())
+            store = EventStore(str(Path(tmp) / "events.db"))
+            assert store.match_stats(system.match_id)["total_frames"] == 30.0
+            store.close()
+    
+    def test_batched_writes_and_indexed_queries(self):
+        """Test des écritures en file et des requêtes filtrées"""
+        with tempfile.TemporaryDirectory() as tmp:
+            store = EventStore(str(Path(tmp) / "events.db"), batch_size=16)
+            match_2023 = store.start_match("finale", season="2023")
+            match_2024 = store.start_match("demi", season="2024")
+            for match_id in (match_2023, match_2024):
+                for i in range(100):
+                    store.add_bounce(match_id, BounceEvent(
+                        x=float(i), y=0.0, timestamp=i / 30, frame_number=i,
+                        call="OUT" if i % 2 else "IN", line_distance=i / 10,
+                        zone="baseline" if i % 3 else "sideline"
+                    ))
+            store.add_track_segment(match_2024, 3, [(0, 0.0, 1.0, 2.0), (5, 0.2, 3.0, 4.0)])
+            store.set_stats(match_2024, {"in_calls": 50, "out_calls": 50})
+            store.flush()
+            
+            close_outs = store.query_bounces(call="OUT", zone="baseline",
+                                             max_line_distance=5.0, season="2024")
+            expected = [i for i in range(51) if i % 2 and i % 3]
+            assert [b["frame_number"] for b in close_outs] == expected
+            assert all(b["match_id"] == match_2024 for b in close_outs)
+            
+            plan = store._fetch("EXPLAIN QUERY PLAN SELECT * FROM bounces "
+                                "WHERE call = 'OUT' AND zone = 'baseline' "
+                                "AND line_distance <= 5", [])
+            assert any("idx_bounces_call_zone" in row["detail"] for row in plan)
+            
+            segments = store.track_segments(match_2024)
+            assert segments[0]["start_frame"] == 0 and segments[0]["end_frame"] == 5
+            assert segments[0]["points"][1] == [5, 0.2, 3.0, 4.0]
+            assert store.match_stats(match_2024) == {"in_calls": 50.0, "out_calls": 50.0}
+            
+            store.truncate_match(match_2024, 50)
+            assert len(store.query_bounces(match_id=match_2024)) == 50
+            assert len(store.query_bounces(match_id=match_2023)) == 100
+            store.close()
+    
+    def test_distance_units_and_migration(self):
+        """Test du filtrage par unité de distance et de la migration d'une base ancienne"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "events.db")
+            connection = sqlite3.connect(path)
+            connection.executescript(
+                "CREATE TABLE bounces (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "match_id INTEGER NOT NULL, timestamp REAL NOT NULL, "
+                "frame_number INTEGER NOT NULL, x REAL NOT NULL, y REAL NOT NULL, "
+                "call TEXT NOT NULL, zone TEXT, line_distance REAL, uncertainty REAL, "
+                "refined INTEGER NOT NULL DEFAULT 0, source TEXT NOT NULL DEFAULT 'online');"
+                "INSERT INTO bounces (match_id, timestamp, frame_number, x, y, call, "
+                "line_distance) VALUES (1, 0.0, 0, 1.0, 1.0, 'OUT', 3.0);"
+            )
+            connection.close()
+            
+            store = EventStore(path)
+            match_id = store.start_match("ancien")
+            store._connection.execute("UPDATE bounces SET match_id = ?", (match_id,))
+            store.add_bounce(match_id, BounceEvent(x=0.5, y=11.9, timestamp=1.0, frame_number=30,
+                                                   call="OUT", line_distance=0.02),
+                             source="multi_camera", distance_unit="m")
+            store.flush()
+            
+            assert [b["line_distance"] for b in store.query_bounces(max_line_distance=5.0)] == [3.0]
+            metres = store.query_bounces(max_line_distance=0.05, distance_unit="m")
+            assert [(b["source"], b["frame_number"]) for b in metres] == [("multi_camera", 30)]
+            store.close()
 
 class TestIntegration:
     """Tests d'intégration du système complet"""